@@ -0,0 +1,114 @@
+"""
+Benchmark + parity check: indicator kernels vs library `ta`
+
+Contoh:
+    python scripts/benchmark_indicators.py --bars 100000 --symbols 11
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+import ta
+
+from src.features.kernels import compute_indicators
+from src.features.technical_indicators import INDICATOR_COLS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def synthetic_ohlc(n_symbols: int, n_bars: int, seed: int = 42):
+    """Random walk OHLC float32, shape (symbols, bars)"""
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 1e-3, (n_symbols, n_bars)), axis=1))
+    spread = np.abs(rng.normal(0, 5e-4, (2, n_symbols, n_bars)))
+    high = close * (1 + spread[0])
+    low = close * (1 - spread[1])
+    return close.astype(np.float32), high.astype(np.float32), low.astype(np.float32)
+
+
+def ta_indicators(close: pd.Series, high: pd.Series, low: pd.Series) -> dict:
+    """Implementasi lama (per symbol, object `ta`)"""
+    macd = ta.trend.MACD(close)
+    bb = ta.volatility.BollingerBands(close)
+    return {
+        'rsi_14': ta.momentum.RSIIndicator(close, window=14).rsi(),
+        'macd': macd.macd(),
+        'macd_signal': macd.macd_signal(),
+        'macd_histogram': macd.macd_diff(),
+        'bb_upper': bb.bollinger_hband(),
+        'bb_middle': bb.bollinger_mavg(),
+        'bb_lower': bb.bollinger_lband(),
+        'ema_20': ta.trend.EMAIndicator(close, window=20).ema_indicator(),
+        'ema_50': ta.trend.EMAIndicator(close, window=50).ema_indicator(),
+        'ema_200': ta.trend.EMAIndicator(close, window=200).ema_indicator(),
+        'atr_14': ta.volatility.AverageTrueRange(high, low, close, window=14).average_true_range(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicator kernels benchmark")
+    parser.add_argument("--bars", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=11)
+    parser.add_argument("--rtol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    close, high, low = synthetic_ohlc(args.symbols, args.bars)
+
+    logger.info("="*70)
+    logger.info(f"INDICATOR BENCHMARK: {args.symbols} symbols x {args.bars} bars")
+    logger.info("="*70)
+
+    # `ta`: 1 symbol per panggilan
+    start = time.perf_counter()
+    reference = [
+        ta_indicators(
+            pd.Series(close[i].astype(np.float64)),
+            pd.Series(high[i].astype(np.float64)),
+            pd.Series(low[i].astype(np.float64))
+        )
+        for i in range(args.symbols)
+    ]
+    ta_time = time.perf_counter() - start
+
+    # Kernels: semua symbol dalam 1 panggilan
+    start = time.perf_counter()
+    result = compute_indicators(close, high, low)
+    kernel_time = time.perf_counter() - start
+
+    logger.info(f"ta:      {ta_time:.3f}s")
+    logger.info(f"kernels: {kernel_time:.3f}s")
+    logger.info(f"Speedup: {ta_time / kernel_time:.1f}x")
+
+    # Parity
+    failed = []
+    for name in INDICATOR_COLS:
+        expected = np.stack([ref[name].to_numpy() for ref in reference])
+        got = result[name].astype(np.float64)
+
+        nan_match = np.array_equal(np.isnan(expected), np.isnan(got))
+        valid = ~np.isnan(expected)
+        scale = np.abs(expected[valid]).max() if valid.any() else 1.0
+        err = np.abs(expected[valid] - got[valid]).max() / scale if valid.any() else 0.0
+
+        ok = nan_match and err <= args.rtol
+        logger.info(f"  {name:15s} max rel err {err:.2e} {'✅' if ok else '❌'}")
+        if not ok:
+            failed.append(name)
+
+    if failed:
+        logger.error(f"Parity failed: {', '.join(failed)}")
+        sys.exit(1)
+
+    logger.info("✅ Parity OK")
+
+
+if __name__ == "__main__":
+    main()
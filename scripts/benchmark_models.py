@@ -0,0 +1,144 @@
+"""
+Benchmark model backends: waktu training, latency inference dan akurasi
+
+Semua backend dilatih di split yang sama dan di-serve lewat bundle
+(build_inference_model), sama seperti generate_predictions.py.
+
+Contoh:
+    python scripts/benchmark_models.py --backends lstm,gbm --bars 20000
+    python scripts/benchmark_models.py --symbol EURUSD   # WindowDataset di DATASET_DIR
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+
+from src.features.kernels import compute_indicators
+from src.features.labels import make_labels
+from src.models.backends import BACKENDS, get_backend
+from src.models.lstm_model import FEATURE_COLS, build_scaler, make_windows
+from src.models.window_dataset import WindowDataset
+from src.utils.config import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def synthetic_windows(n_bars: int, sequence_length: int, seed: int = 42):
+    """Random walk OHLC -> indicators -> windows ter-scale + label; returns (X, y, scaler)"""
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 1e-3, n_bars)))
+    spread = np.abs(rng.normal(0, 5e-4, (2, n_bars)))
+    high = close * (1 + spread[0])
+    low = close * (1 - spread[1])
+
+    indicators = compute_indicators(close, high, low)
+    columns = {'close': close, **{k: np.ravel(v) for k, v in indicators.items()}}
+    data = np.stack([columns[f] for f in FEATURE_COLS], axis=1)
+    valid = ~np.isnan(data).any(axis=1)
+    data, close, high, low = data[valid], close[valid], high[valid], low[valid]
+
+    scaler = build_scaler(data.min(axis=0), data.max(axis=0), n_samples=len(data))
+    scaled = scaler.transform(data).astype(np.float32)
+    labels = make_labels(config.LABEL_METHOD, close, high, low, data[:, FEATURE_COLS.index('atr_14')],
+                         horizon=config.LABEL_HORIZON, threshold=config.LABEL_THRESHOLD)
+    X, y = make_windows(scaled, labels, sequence_length)
+    return X, y, scaler
+
+
+def latency_ms(model, X, repeats: int) -> float:
+    """Median latency model.predict(X) dalam ms"""
+    model.predict(X, verbose=0)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X, verbose=0)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1000)
+
+
+def benchmark(name: str, X_train, y_train, X_test, y_test, scaler, epochs: int, repeats: int) -> dict:
+    model = get_backend(name)(sequence_length=X_train.shape[1])
+    model.scaler = scaler
+
+    start = time.perf_counter()
+    iterations = model.fit(X_train, y_train, X_test, y_test, epochs=epochs)
+    train_seconds = time.perf_counter() - start
+
+    test_loss, test_acc = model.evaluate(X_test, y_test)
+
+    # Latency lewat bundle, sama dengan jalur serving
+    inference = model.to_bundle().build_inference_model()
+    batch = np.ascontiguousarray(X_test[:1000])
+
+    return {
+        'backend': name,
+        'inference': type(inference).__name__,
+        'train_seconds': round(train_seconds, 2),
+        'iterations': iterations,
+        'test_accuracy': round(float(test_acc), 4),
+        'test_loss': round(float(test_loss), 4),
+        'single_ms': round(latency_ms(inference, batch[:1], repeats), 3),
+        'batch_ms': round(latency_ms(inference, batch, max(repeats // 20, 3)), 2),
+        'batch_size': len(batch),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model backends benchmark")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--symbol", help="Pakai WindowDataset symbol ini (default: data sintetis)")
+    parser.add_argument("--bars", type=int, default=20_000)
+    parser.add_argument("--epochs", type=int, default=5, help="Epoch LSTM")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--output", help="Tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+
+    if args.symbol:
+        dataset = WindowDataset(config.DATASET_DIR, args.symbol)
+        if not dataset.exists:
+            logger.error(f"No dataset for {args.symbol} in {config.DATASET_DIR} (run train_model.py first)")
+            sys.exit(1)
+        X_train, X_test, y_train, y_test = dataset.split(test_size=0.2)
+        scaler = dataset.build_scaler()
+        source = f"{args.symbol} dataset"
+    else:
+        X, y, scaler = synthetic_windows(args.bars, config.SEQUENCE_LENGTH)
+        n_train = len(X) - int(np.ceil(0.2 * len(X)))
+        X_train, X_test, y_train, y_test = X[:n_train], X[n_train:], y[:n_train], y[n_train:]
+        source = f"synthetic {args.bars} bars"
+
+    logger.info("="*70)
+    logger.info(f"MODEL BENCHMARK: {source}, Train: {len(X_train)}, Test: {len(X_test)}")
+    logger.info("="*70)
+
+    results = []
+    for name in backends:
+        logger.info(f"\n--- {name} ---")
+        results.append(benchmark(name, X_train, y_train, X_test, y_test, scaler, args.epochs, args.repeats))
+
+    logger.info("\n" + "="*70)
+    logger.info(f"{'backend':8s} {'train s':>9s} {'iter':>5s} {'acc':>7s} {'loss':>7s} "
+                f"{'1 win ms':>9s} {'1k win ms':>10s}  inference")
+    for r in results:
+        logger.info(f"{r['backend']:8s} {r['train_seconds']:9.2f} {r['iterations']:5d} "
+                    f"{r['test_accuracy']*100:6.2f}% {r['test_loss']:7.4f} "
+                    f"{r['single_ms']:9.3f} {r['batch_ms']:10.2f}  {r['inference']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'source': source, 'results': results}, f, indent=2)
+        logger.info(f"Results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
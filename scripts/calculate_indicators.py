@@ -6,43 +6,50 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
 import logging
+import numpy as np
 import pandas as pd
-from src.data.supabase_client import SupabaseClient
-from src.features.technical_indicators import calculate_indicators
+from typing import Dict, List, Optional
+from src.data.panel import OHLCPanel
+from src.data.supabase_client import OHLC_COLUMNS, SupabaseClient
+from src.features.registry import FeatureCache
+from src.features.technical_indicators import INDICATOR_COLS, calculate_panel_indicators
 from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols, shard_label
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def update_indicators_for_symbol(symbol: str, supabase: SupabaseClient):
-    """Update indicators for one symbol"""
+def update_indicators_for_symbol(symbol: str, df: pd.DataFrame, panel: OHLCPanel, supabase: SupabaseClient) -> int:
+    """Update indicators for one symbol; returns jumlah row yang di-update"""
     
     logger.info(f"\n{'='*70}")
     logger.info(f"Updating indicators: {symbol}")
     logger.info(f"{'='*70}")
     
-    # Get OHLC data
-    response = supabase.client.table("ohlc_data").select("*").eq(
-        "symbol", symbol
-    ).eq(
-        "timeframe", "H1"
-    ).order("timestamp").execute()
+    # Indicators dari panel, di-join balik ke rows asli (butuh 'id')
+    indicators = panel.to_frame(symbol, INDICATOR_COLS)
     
-    if not response.data:
-        logger.warning(f"No data for {symbol}")
-        return
-    
-    df = pd.DataFrame(response.data)
-    logger.info(f"Loaded {len(df)} rows")
+    if indicators[INDICATOR_COLS].isna().all().all():
+        logger.warning("No data after calculating indicators")
+        return 0
     
-    # Calculate indicators
-    df = calculate_indicators(df)
+    ts = pd.to_datetime(df['timestamp'])
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert(None)
     
-    if df.empty:
-        logger.warning("No data after calculating indicators")
-        return
+    # Nilai yang sudah ada di database (float32) vs hasil hitung ulang:
+    # hanya baris baru / berubah yang ditulis, bukan seluruh history tiap run
+    stored = df[INDICATOR_COLS].to_numpy(np.float64)
+    df = df.drop(columns=INDICATOR_COLS)
+    df = df.assign(timestamp=ts).merge(indicators, on='timestamp', how='left')
+    computed = df[INDICATOR_COLS].to_numpy(np.float64)
+    changed = ~np.isclose(computed, stored, rtol=1e-5, atol=0, equal_nan=True).all(axis=1)
+    df = df[changed]
+    logger.info(f"{symbol}: {len(df)} new / changed rows, {int((~changed).sum())} unchanged")
     
     # Update database
     updated = 0
@@ -63,9 +70,7 @@ def update_indicators_for_symbol(symbol: str, supabase: SupabaseClient):
                 'atr_14': float(row['atr_14']) if pd.notna(row['atr_14']) else None,
             }
             
-            supabase.client.table("ohlc_data").update(update_data).eq(
-                'id', row['id']
-            ).execute()
+            supabase.update_rows("ohlc_data", update_data, {'id': int(row['id'])})
             
             updated += 1
             
@@ -77,34 +82,54 @@ def update_indicators_for_symbol(symbol: str, supabase: SupabaseClient):
             continue
     
     logger.info(f"✅ {symbol}: Updated {updated} rows with indicators")
+    return updated
+
+
+def run_indicators(symbols: List[str], supabase: SupabaseClient, cache: Optional[FeatureCache] = None) -> Dict[str, int]:
+    """
+    Hitung + tulis indicators semua symbol (body main, dipakai juga oleh replay_pipeline)
+    
+    Returns:
+        symbol -> jumlah row yang di-update
+    """
+    # Load semua symbol, hitung indicators sekaligus di panel
+    # id untuk update per row; indicators lama untuk skip baris yang tidak berubah
+    frames = supabase.get_ohlc_frames(symbols, columns=('id',) + OHLC_COLUMNS + tuple(INDICATOR_COLS))
+    panel = OHLCPanel.from_frames(frames)
+    calculate_panel_indicators(panel, cache if cache is not None else FeatureCache(config.FEATURE_CACHE_DIR))
+    
+    results = {}
+    for symbol, df in frames.items():
+        try:
+            results[symbol] = update_indicators_for_symbol(symbol, df, panel, supabase)
+        except Exception as e:
+            logger.error(f"Error processing {symbol}: {e}")
+            results[symbol] = 0
+    return results
 
 
+@profile_main("calculate_indicators")
 def main():
+    parser = argparse.ArgumentParser(description="Calculate technical indicators")
+    add_symbol_args(parser)
+    args = parser.parse_args()
+    symbols = resolve_symbols(args)
+    
     logger.info("="*70)
     logger.info("CALCULATE TECHNICAL INDICATORS")
     logger.info("="*70)
-    
-    # Hardcoded semua 11 pairs
-    ALL_SYMBOLS = [
-        'EURUSD', 'GBPUSD', 'XAUUSD',
-        'USDJPY', 'AUDUSD', 'USDCHF',
-        'USDCAD', 'NZDUSD', 'EURGBP',
-        'EURJPY', 'GBPJPY'
-    ]
-    
-    logger.info(f"Symbols: {', '.join(ALL_SYMBOLS)}")
-    logger.info(f"Total: {len(ALL_SYMBOLS)} pairs")
+    logger.info(f"Symbols: {', '.join(symbols)}")
+    logger.info(f"Total: {len(symbols)} pairs, shard: {shard_label(args)}")
     logger.info("="*70)
     
     config.validate()
     supabase = SupabaseClient()
+    if config.OUTBOX_ENABLED:
+        supabase.start_outbox()
     
-    for symbol in ALL_SYMBOLS:
-        try:
-            update_indicators_for_symbol(symbol.strip(), supabase)
-        except Exception as e:
-            logger.error(f"Error processing {symbol}: {e}")
+    run_indicators(symbols, supabase)
     
+    supabase.close()
     logger.info("\n✅ Indicators calculation complete!")
 
 if __name__ == "__main__":
@@ -1,68 +1,89 @@
 """
-One-time historical data download
+Historical data backfill (resumable, paralel)
+
+Contoh:
+    python scripts/download_historical.py --start 2020-01-01 --end 2024-12-31 --workers 8
+    python scripts/download_historical.py --days 30
+    python scripts/download_historical.py --days 30 --shard 1/3
 """
 
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
 import logging
 from datetime import datetime, timedelta
-from src.data.dukascopy_downloader import DukascopyH1Downloader
-from src.data.supabase_client import SupabaseClient
+from src.data.backfill import BackfillJob, parse_date
 from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols, shard_label
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Historical H1 backfill")
+    parser.add_argument("--start", help="Start date UTC (YYYY-MM-DD)")
+    parser.add_argument("--end", help="End date UTC (YYYY-MM-DD), default: sekarang")
+    parser.add_argument("--days", type=int, default=30, help="Dipakai kalau --start kosong")
+    parser.add_argument("--workers", type=int, default=config.BACKFILL_WORKERS, help="Unit (symbol x bulan) paralel")
+    parser.add_argument("--io-workers", type=int, default=config.DOWNLOAD_IO_WORKERS, help="Thread fetch")
+    parser.add_argument("--decode-workers", type=int, default=config.DOWNLOAD_DECODE_WORKERS,
+                        help="Process decompress + parse (0 = di thread fetch)")
+    parser.add_argument("--manifest", default=config.BACKFILL_MANIFEST)
+    add_symbol_args(parser)
+    return parser.parse_args()
+
+
+@profile_main("download_historical")
 def main():
+    args = parse_args()
+
     logger.info("="*70)
     logger.info("HISTORICAL DATA DOWNLOAD")
     logger.info("="*70)
-    
-    # HARDCODED: Download semua 11 pairs
-    symbols_to_download = [
-        'EURUSD', 'GBPUSD', 'XAUUSD', 
-        'USDJPY', 'AUDUSD', 'USDCHF', 
-        'USDCAD', 'NZDUSD', 'EURGBP', 
-        'EURJPY', 'GBPJPY'
-    ]
-    
-    logger.info(f"Total symbols to download: {len(symbols_to_download)}")
+
+    symbols_to_download = resolve_symbols(args)
+
+    logger.info(f"Total symbols to download: {len(symbols_to_download)} (shard: {shard_label(args)})")
     logger.info(f"Symbols: {', '.join(symbols_to_download)}")
-    
+
     config.validate()
-    supabase = SupabaseClient()
-    
-    # Download 30 hari terakhir
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=30)
-    
+
+    end_date = parse_date(args.end) or datetime.utcnow()
+    start_date = parse_date(args.start) or end_date - timedelta(days=args.days)
+
     logger.info(f"Downloading from {start_date} to {end_date}")
+    logger.info(f"Manifest: {args.manifest}")
     logger.info("="*70)
-    
-    for symbol in symbols_to_download:
-        logger.info(f"\n{'='*70}")
-        logger.info(f"Downloading {symbol}")
-        logger.info(f"{'='*70}")
-        
-        try:
-            downloader = DukascopyH1Downloader(symbol)
-            df = downloader.download_range(start_date, end_date)
-            
-            if not df.empty:
-                uploaded = supabase.upload_ohlc(df, symbol, 'H1')
-                logger.info(f"✅ {symbol}: {uploaded} candles uploaded")
-            else:
-                logger.warning(f"⚠️  {symbol}: No data downloaded")
-        
-        except Exception as e:
-            logger.error(f"❌ {symbol}: Error - {e}")
-            continue
-    
+
+    job = BackfillJob(
+        symbols_to_download,
+        start_date,
+        end_date,
+        manifest_path=args.manifest,
+        workers=args.workers,
+        calendar_dir=config.CALENDAR_DIR,
+        archive_dir=config.TICK_ARCHIVE_DIR if config.TICK_ARCHIVE else None,
+        io_workers=args.io_workers,
+        decode_workers=args.decode_workers
+    )
+    summary = job.run()
+
     logger.info("\n" + "="*70)
-    logger.info("✅ Historical download complete!")
+    logger.info("BACKFILL SUMMARY")
+    logger.info("="*70)
+    logger.info(f"  Units done: {summary['done']}")
+    logger.info(f"  Units empty (no data): {summary['empty']}")
+    logger.info(f"  Units failed / incomplete: {summary['failed']}")
+    logger.info(f"  Candles uploaded: {summary['rows']}")
+
+    if summary['failed']:
+        logger.warning("⚠️  Some units incomplete - rerun to resume")
+    else:
+        logger.info("✅ Historical download complete!")
     logger.info("="*70)
 
 
@@ -6,24 +6,39 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
 import logging
+from typing import Dict, List, Optional
+
+import numpy as np
 import pandas as pd
-from datetime import datetime
 
-from src.data.supabase_client import SupabaseClient
+from src.data.panel import OHLCPanel
+from src.data.supabase_client import OHLC_COLUMNS, SupabaseClient
+from src.features.registry import MODEL_FEATURES, FeatureCache, registry
+from src.models.global_model import GLOBAL_SYMBOL
+from src.models.model_registry import ModelRegistry
+from src.prediction.portfolio import (PREDICTION_KEY, build_predictions, conversion_symbols, prediction_rows,
+                                      return_correlation)
 from src.prediction.predictor import TradingPredictor
 from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols, shard_label, universe
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def generate_for_symbol(symbol: str, supabase: SupabaseClient):
-    """Generate prediction untuk 1 symbol"""
+def load_predictor(symbol: str, model_registry: ModelRegistry):
+    """Load TradingPredictor untuk 1 symbol (None kalau model belum ada)"""
     
-    logger.info(f"\n{'='*70}")
-    logger.info(f"Generating prediction: {symbol}")
-    logger.info(f"{'='*70}")
+    # Bundle dari registry (fallback ke .h5 + .pkl lama)
+    try:
+        bundle = model_registry.load(ModelRegistry.key(symbol, 'H1'))
+        if bundle is not None:
+            return TradingPredictor(symbol, bundle=bundle)
+    except Exception as e:
+        logger.error(f"Failed to load bundle for {symbol}: {e}")
     
     # Model paths
     model_path = f"models/saved/{symbol}_H1_model.h5"
@@ -34,104 +49,167 @@ def generate_for_symbol(symbol: str, supabase: SupabaseClient):
         logger.warning(f"Model not found: {model_path}")
         return None
     
-    # Get latest data
-    response = supabase.client.table("ohlc_data").select("*").eq(
-        "symbol", symbol
-    ).eq(
-        "timeframe", "H1"
-    ).order("timestamp", desc=False).execute()
-    
-    if not response.data:
-        logger.warning(f"No data for {symbol}")
-        return None
-    
-    df = pd.DataFrame(response.data)
-    logger.info(f"Loaded {len(df)} candles")
-    
     # Initialize predictor
     try:
-        predictor = TradingPredictor(symbol, model_path, scaler_path)
+        return TradingPredictor(symbol, model_path, scaler_path)
     except Exception as e:
         logger.error(f"Failed to initialize predictor: {e}")
         return None
+
+
+def load_global_predictors(symbols, model_registry: ModelRegistry):
+    """Predictor untuk semua symbol dari 1 model global (model di-build sekali)"""
     
-    # Generate prediction
-    prediction = predictor.predict(df)
+    try:
+        bundle = model_registry.load(ModelRegistry.key(GLOBAL_SYMBOL, 'H1'))
+    except Exception as e:
+        logger.error(f"Failed to load global bundle: {e}")
+        return {}
     
-    if prediction is None:
-        logger.error("Prediction failed")
-        return None
+    if bundle is None:
+        logger.warning("Global model not found")
+        return {}
     
-    # Log prediction
-    logger.info(f"Signal: {prediction['signal']}")
-    logger.info(f"Confidence: {prediction['confidence']:.2%}")
-    logger.info(f"Entry: {prediction['entry_price']}")
-    
-    if prediction['signal'] != 'HOLD':
-        logger.info(f"TP: {prediction['tp_price']}")
-        logger.info(f"SL: {prediction['sl_price']}")
-    
-    # Save to database (hanya jika confidence tinggi dan bukan HOLD)
-    if prediction['confidence'] >= config.MIN_CONFIDENCE and prediction['signal'] != 'HOLD':
-        
-        # Prepare data untuk database
-        db_prediction = {
-            'symbol': prediction['symbol'],
-            'timeframe': prediction['timeframe'],
-            'signal': prediction['signal'],
-            'confidence': prediction['confidence'],
-            'entry_price': prediction['entry_price'],
-            'tp_price': prediction['tp_price'],
-            'sl_price': prediction['sl_price'],
-            'lot_size': prediction['lot_size'],
-            'valid_until': prediction['valid_until'],
-            'model_version': prediction['model_version'],
-            'algorithm': prediction['algorithm'],
-            'status': 'pending'
-        }
-        
-        try:
-            supabase.client.table("predictions").insert(db_prediction).execute()
-            logger.info(f"✅ Prediction saved to database")
-        except Exception as e:
-            logger.error(f"Failed to save prediction: {e}")
+    model = bundle.build_inference_model()
+    predictors = {}
+    for symbol in symbols:
+        if symbol in bundle.metadata.get('symbols', []):
+            predictors[symbol] = TradingPredictor(symbol, bundle=bundle, model=model)
     
-    else:
-        logger.info(f"Skipped saving (confidence: {prediction['confidence']:.2%}, signal: {prediction['signal']})")
+    logger.info(f"Global model {bundle.version}: {len(predictors)} symbols")
+    return predictors
+
+
+def load_conversion_prices(source, symbols) -> dict:
+    """Close terakhir pair kurs untuk sizing lot yang tidak ada di symbols (mis. GBPUSD untuk EURGBP)"""
+    needed = conversion_symbols(symbols, available=universe())
+    if not needed:
+        return {}
+    frames = source.get_ohlc_frames(needed, columns=('timestamp', 'close'), tail=1)
+    return {s: float(df['close'].iloc[-1]) for s, df in frames.items()}
+
+
+def build_batch(symbols, predictors: dict, probabilities: dict, latest: dict, panel: OHLCPanel,
+                prices: dict = None) -> list:
+    """Prediction semua symbol sekaligus: gating + TP/SL + lot + cap exposure berkorelasi"""
+    predictions = build_predictions(
+        symbols, predictors, np.stack([probabilities[s] for s in symbols]), latest,
+        prices=prices, correlation=return_correlation(panel, symbols)
+    )
+    
+    for prediction in predictions:
+        logger.info(f"{prediction['symbol']}: {prediction['signal']} ({prediction['confidence']:.2%}), "
+                    f"entry {prediction['entry_price']}, TP {prediction['tp_price']}, SL {prediction['sl_price']}, "
+                    f"lot {prediction['lot_size']} (risk {prediction['risk']:.2%})")
+    return predictions
+
+
+def save_predictions(predictions: list, supabase: SupabaseClient) -> int:
+    """
+    Signal yang lolos gating + sizing -> 1 bulk insert tabel predictions
+
+    Insert idempotent (signal_key), jadi retry outbox tidak membuat signal
+    dobel; entry outbox yang belum terkirim sampai valid_until dibuang
+    """
+    rows = prediction_rows(predictions)
+    skipped = [p['symbol'] for p in predictions if not p['accepted']]
+    if skipped:
+        logger.info(f"Skipped saving (HOLD / confidence < {config.MIN_CONFIDENCE} / lot < {config.MIN_LOT}): "
+                    f"{', '.join(skipped)}")
+    if not rows:
+        return 0
+    
+    try:
+        expires_at = min(pd.Timestamp(r['valid_until'], tz='UTC') for r in rows).timestamp()
+        supabase.insert_rows("predictions", rows, on_conflict=PREDICTION_KEY, expires_at=expires_at)
+        logger.info(f"✅ {len(rows)} predictions saved")
+        return len(rows)
+    except Exception as e:
+        logger.error(f"Failed to save predictions: {e}")
+        return 0
+
+
+def run_predictions(symbols: List[str], supabase: SupabaseClient, model_registry: Optional[ModelRegistry] = None,
+                    cache: Optional[FeatureCache] = None) -> Dict[str, Optional[dict]]:
+    """
+    Load model -> features -> prediksi -> sizing -> simpan, untuk semua symbol
+    (body main, dipakai juga oleh replay_pipeline)
+    
+    Returns:
+        symbol -> prediction (None kalau gagal / model tidak ada)
+    """
+    model_registry = model_registry or ModelRegistry(config.MODEL_REGISTRY_DIR)
+    predictors = {}
+    if config.MODEL_SCOPE == 'global':
+        predictors = load_global_predictors(symbols, model_registry)
+    
+    # Model per symbol (atau symbol yang belum ada di model global)
+    for symbol in symbols:
+        if symbol in predictors:
+            continue
+        predictor = load_predictor(symbol, model_registry)
+        if predictor is not None:
+            predictors[symbol] = predictor
+    
+    # Load N bar terakhir (kolom OHLC saja) + prepare sequences semua symbol sekaligus
+    frames = supabase.get_ohlc_frames(list(predictors), columns=OHLC_COLUMNS, tail=config.PREDICT_HISTORY_BARS)
+    panel = OHLCPanel.from_frames(frames)
+    registry.compute(panel, MODEL_FEATURES, cache if cache is not None else FeatureCache(config.FEATURE_CACHE_DIR))
+    ready, X, latest = TradingPredictor.prepare_panel_sequences(panel, predictors)
+    
+    # 1 forward pass per model (model global: 1 untuk semua symbol)
+    probabilities = {}
+    try:
+        if ready:
+            probabilities = TradingPredictor.predict_panel(ready, predictors, X)
+    except Exception as e:
+        logger.error(f"Batch prediction failed, predicting per symbol: {e}")
     
-    return prediction
+    # Batch gagal: fallback 1 forward pass per symbol
+    for i, symbol in enumerate(ready):
+        if symbol in probabilities:
+            continue
+        try:
+            predictor = predictors[symbol]
+            probabilities[symbol] = predictor.model.predict(predictor.model_input(X[i:i + 1]), verbose=0)[0]
+        except Exception as e:
+            logger.error(f"Error generating prediction for {symbol}: {e}", exc_info=True)
+    ready = [s for s in ready if s in probabilities]
+    
+    # Post-processing semua symbol sekaligus + 1 bulk insert
+    results = {symbol: None for symbol in symbols}
+    if ready:
+        prices = load_conversion_prices(supabase, ready)
+        predictions = build_batch(ready, predictors, probabilities, latest, panel, prices)
+        results.update({p['symbol']: p for p in predictions})
+        save_predictions(predictions, supabase)
+    return results
 
 
+@profile_main("generate_predictions")
 def main():
+    parser = argparse.ArgumentParser(description="Generate trading predictions")
+    add_symbol_args(parser)
+    args = parser.parse_args()
+    selected = resolve_symbols(args)
+    
     logger.info("="*70)
     logger.info("GENERATE TRADING PREDICTIONS")
     logger.info("="*70)
     logger.info(f"Min Confidence: {config.MIN_CONFIDENCE}")
+    logger.info(f"Risk: {config.RISK_PER_TRADE:.1%}/trade, balance {config.ACCOUNT_BALANCE:.0f} {config.ACCOUNT_CURRENCY}")
+    logger.info(f"Model scope: {config.MODEL_SCOPE}")
     
-    # Hardcoded semua 11 pairs
-    ALL_SYMBOLS = [
-        'EURUSD', 'GBPUSD', 'XAUUSD',
-        'USDJPY', 'AUDUSD', 'USDCHF',
-        'USDCAD', 'NZDUSD', 'EURGBP',
-        'EURJPY', 'GBPJPY'
-    ]
-    
-    logger.info(f"Symbols: {', '.join(ALL_SYMBOLS)}")
-    logger.info(f"Total: {len(ALL_SYMBOLS)} pairs")
+    logger.info(f"Symbols: {', '.join(selected)}")
+    logger.info(f"Total: {len(selected)} pairs, shard: {shard_label(args)}")
     logger.info("="*70)
     
     config.validate()
     supabase = SupabaseClient()
+    if config.OUTBOX_ENABLED:
+        supabase.start_outbox()
     
-    # Generate predictions
-    results = {}
-    
-    for symbol in ALL_SYMBOLS:
-        try:
-            prediction = generate_for_symbol(symbol, supabase)
-            results[symbol] = prediction
-        except Exception as e:
-            logger.error(f"Error generating prediction for {symbol}: {e}", exc_info=True)
+    results = run_predictions(selected, supabase)
     
     # Summary
     logger.info("\n" + "="*70)
@@ -140,10 +218,13 @@ def main():
     
     for symbol, prediction in results.items():
         if prediction:
-            logger.info(f"{symbol}: {prediction['signal']} ({prediction['confidence']:.2%})")
+            saved = "saved" if prediction['accepted'] else "not saved"
+            logger.info(f"{symbol}: {prediction['signal']} ({prediction['confidence']:.2%}, "
+                        f"lot {prediction['lot_size']}, {saved})")
         else:
             logger.info(f"{symbol}: Failed")
     
+    supabase.close()
     logger.info("\n✅ Prediction generation complete!")
 
 
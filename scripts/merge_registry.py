@@ -0,0 +1,41 @@
+"""
+Gabungkan registry hasil training per shard ke MODEL_REGISTRY_DIR
+
+Setiap shard hanya publish key symbol miliknya, jadi key yang current-nya
+berubah di registry shard diambil apa adanya.
+
+Usage:
+    python scripts/merge_registry.py shards/registry-0 shards/registry-1
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import logging
+
+from src.models.model_registry import ModelRegistry
+from src.utils.config import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge sharded model registries")
+    parser.add_argument("sources", nargs="+", help="Direktori registry per shard")
+    parser.add_argument("--target", default=config.MODEL_REGISTRY_DIR)
+    args = parser.parse_args()
+
+    target = ModelRegistry(args.target)
+    for source in args.sources:
+        if not os.path.exists(os.path.join(source, "manifest.json")):
+            logger.warning(f"{source}: No manifest, skip")
+            continue
+        merged = target.merge(ModelRegistry(source))
+        logger.info(f"{source}: {len(merged)} keys merged {merged}")
+
+
+if __name__ == "__main__":
+    main()
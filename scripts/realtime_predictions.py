@@ -0,0 +1,202 @@
+"""
+Realtime predictions: candle H1 parsial dari tick jam berjalan
+
+Setiap REALTIME_INTERVAL_SECONDS: poll file tick jam berjalan semua
+symbol, update candle parsial (hanya tick baru), hitung ulang indicator di
+history + candle parsial, lalu prediksi. Signal untuk jam H tersedia
+beberapa detik setelah tick masuk, tanpa menunggu bar tutup + sync :05 +
+predict :15.
+
+History bar tutup dibaca sekali dari Supabase dan di-reload setiap jam
+setelah menit REALTIME_RELOAD_MINUTE (sync_h1_data sudah jalan). Sampai
+itu, candle jam sebelumnya dari poller dipakai sebagai bar tutup.
+
+Prediksi semua symbol di-post-process sekaligus (build_batch: sizing +
+cap exposure berkorelasi), tapi hanya disimpan kalau signal symbol untuk
+jam itu berubah, jadi tabel predictions tidak terisi tiap polling.
+
+Usage:
+    python scripts/realtime_predictions.py --interval 30 --minutes 55
+    python scripts/realtime_predictions.py --shard 0/2   # 1 dari 2 runner
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import logging
+import time
+from datetime import datetime
+
+import pandas as pd
+import requests
+
+from scripts.generate_predictions import (build_batch, load_conversion_prices, load_global_predictors, load_predictor,
+                                         save_predictions)
+from src.data.panel import OHLCPanel
+from src.data.realtime import PartialCandlePoller
+from src.data.supabase_client import OHLC_COLUMNS, SupabaseClient
+from src.features.registry import MODEL_FEATURES, registry
+from src.models.model_registry import ModelRegistry
+from src.prediction.predictor import TradingPredictor
+from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols, shard_label
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OHLC_COLS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _closed_frame(df: pd.DataFrame, bars: int) -> pd.DataFrame:
+    """N bar terakhir, timestamp naive UTC"""
+    df = df[OHLC_COLS].tail(bars).copy()
+    df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True).dt.tz_convert(None)
+    return df.reset_index(drop=True)
+
+
+class RealtimeRunner:
+    """Polling + indicator + prediksi untuk semua symbol"""
+
+    def __init__(self, supabase: SupabaseClient, predictors: dict, base_url: str = None):
+        self.supabase = supabase
+        self.predictors = predictors
+        session = requests.Session()
+        self.pollers = {s: PartialCandlePoller(s, session=session, base_url=base_url) for s in predictors}
+        self.changed = []
+        self.history = {}
+        self.closed_rows = {s: [] for s in predictors}
+        self.loaded_hour = None
+        self.saved = {}
+        self.prices = {}
+
+    def load_history(self, hour_start: datetime):
+        frames = self.supabase.get_ohlc_frames(list(self.predictors), columns=OHLC_COLUMNS,
+                                               tail=config.REALTIME_HISTORY_BARS)
+        self.history = {s: _closed_frame(df, config.REALTIME_HISTORY_BARS) for s, df in frames.items()}
+        self.loaded_hour = hour_start
+        # Kurs konversi lot (pair di luar runner ini), cukup per jam
+        self.prices = load_conversion_prices(self.supabase, list(self.predictors))
+
+        # Candle lokal yang sudah masuk database tidak dipakai lagi
+        for symbol, rows in self.closed_rows.items():
+            if symbol in self.history and len(self.history[symbol]):
+                last = self.history[symbol]['timestamp'].iloc[-1]
+                self.closed_rows[symbol] = [r for r in rows if r['timestamp'] > last]
+
+    def frames(self) -> dict:
+        """History + candle tutup lokal + candle parsial per symbol"""
+        frames = {}
+        for symbol, history in self.history.items():
+            candle = self.pollers[symbol].candle
+            rows = list(self.closed_rows[symbol])
+            if candle is not None and not candle.empty:
+                rows.append(candle.to_row())
+            frames[symbol] = pd.concat([history, pd.DataFrame(rows, columns=OHLC_COLS)], ignore_index=True) \
+                if rows else history
+        return frames
+
+    def cycle(self, now: datetime = None) -> dict:
+        """1 putaran polling; returns timing (ms) + jumlah symbol yang berubah"""
+        now = now or datetime.utcnow()
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+
+        start = time.perf_counter()
+        changed = [s for s, poller in self.pollers.items() if poller.poll(now)]
+        self.changed = changed
+
+        # Candle jam sebelumnya jadi bar tutup sampai database ter-sync
+        for symbol, poller in self.pollers.items():
+            if poller.closed is not None:
+                self.closed_rows[symbol].append(poller.closed.to_row())
+                poller.closed = None
+
+        if self.loaded_hour is None or (hour_start > self.loaded_hour
+                                        and now.minute >= config.REALTIME_RELOAD_MINUTE):
+            self.load_history(hour_start)
+        polled = time.perf_counter()
+
+        timing = {'changed': len(changed), 'poll_ms': round((polled - start) * 1000, 1)}
+        if not changed:
+            return timing
+
+        panel = OHLCPanel.from_frames(self.frames())
+        registry.compute(panel, MODEL_FEATURES)
+        computed = time.perf_counter()
+
+        symbols, X, latest = TradingPredictor.prepare_panel_sequences(panel, self.predictors)
+        if not symbols:
+            return timing
+        probabilities = TradingPredictor.predict_panel(symbols, self.predictors, X)
+        predicted = time.perf_counter()
+
+        predictions = build_batch(symbols, self.predictors, probabilities, latest, panel, self.prices)
+        keys = {p['symbol']: (hour_start, p['signal'], p['accepted']) for p in predictions}
+        fresh = [p for p in predictions if p['symbol'] in changed and self.saved.get(p['symbol']) != keys[p['symbol']]]
+        if fresh:
+            save_predictions(fresh, self.supabase)
+            self.saved.update({p['symbol']: keys[p['symbol']] for p in fresh})
+
+        timing.update({
+            'features_ms': round((computed - polled) * 1000, 1),
+            'predict_ms': round((predicted - computed) * 1000, 1),
+        })
+        return timing
+
+
+@profile_main("realtime_predictions")
+def main():
+    parser = argparse.ArgumentParser(description="Realtime predictions dari candle parsial")
+    parser.add_argument("--interval", type=float, default=config.REALTIME_INTERVAL_SECONDS,
+                        help="Detik antar polling")
+    parser.add_argument("--minutes", type=float, default=0, help="Berhenti setelah N menit (0 = terus)")
+    add_symbol_args(parser)
+    args = parser.parse_args()
+    symbols = resolve_symbols(args)
+
+    logger.info("="*70)
+    logger.info("REALTIME PREDICTIONS")
+    logger.info("="*70)
+    logger.info(f"Interval: {args.interval}s, Min Confidence: {config.MIN_CONFIDENCE}")
+    logger.info(f"Symbols: {', '.join(symbols)} (shard: {shard_label(args)})")
+
+    config.validate()
+    supabase = SupabaseClient()
+    if config.OUTBOX_ENABLED:
+        supabase.start_outbox()
+
+    model_registry = ModelRegistry(config.MODEL_REGISTRY_DIR)
+    predictors = {}
+    if config.MODEL_SCOPE == 'global':
+        predictors = load_global_predictors(symbols, model_registry)
+    for symbol in symbols:
+        if symbol not in predictors:
+            predictor = load_predictor(symbol, model_registry)
+            if predictor is not None:
+                predictors[symbol] = predictor
+
+    if not predictors:
+        logger.error("No models available")
+        sys.exit(1)
+
+    runner = RealtimeRunner(supabase, predictors)
+    deadline = time.monotonic() + args.minutes * 60 if args.minutes else None
+
+    while deadline is None or time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            timing = runner.cycle()
+            if timing['changed']:
+                logger.info(f"Cycle: {timing}")
+        except Exception as e:
+            logger.error(f"Cycle failed: {e}", exc_info=True)
+        time.sleep(max(args.interval - (time.monotonic() - started), 0))
+
+    supabase.close()
+    logger.info("\n✅ Realtime predictions stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Replay tick lokal lewat pipeline lengkap + latency tick -> signal
+
+File .bi5 rekaman dilayani TickReplayServer (pengganti BASE_URL
+Dukascopy) dengan waktu simulasi real time / dipercepat; Supabase diganti
+MemoryStore yang di-seed dari jam rekaman sebelum --start.
+
+Mode:
+    batch     per jam: run_sync (sync_h1_data) di menit --sync-minute, lalu
+              run_indicators (calculate_indicators), run_predictions
+              (generate_predictions) di menit --predict-minute (default =
+              jadwal workflow); fungsi yang sama dengan main() produksi
+    realtime  RealtimeRunner (candle parsial) setiap --interval detik simulasi
+
+Yang TIDAK ikut diukur (lihat NOT_MEASURED, juga ditulis di report):
+outbox (MemoryStore menulis langsung, tidak lewat SQLite + flusher),
+round-trip network ke Supabase / Dukascopy (server lokal) dan start-up
+runner GitHub Actions (checkout, pip install, import).
+
+Latency = jeda jadwal (waktu simulasi, dari tick terakhir yang dipakai)
++ durasi proses (wall time), jadi angkanya setara real time berapa pun
+--speed. Dilaporkan per stage: p50 / p90 / p99 / max.
+
+Usage:
+    python scripts/replay_pipeline.py --record --symbols EURUSD,GBPUSD --start 2024-03-01 --end 2024-03-20
+    python scripts/replay_pipeline.py --symbols EURUSD,GBPUSD --start 2024-03-18 --hours 24 --speed 600
+    python scripts/replay_pipeline.py --mode realtime --interval 30 --start 2024-03-18 --hours 4 --speed 60
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from scripts.calculate_indicators import run_indicators
+from scripts.generate_predictions import load_global_predictors, load_predictor, run_predictions
+from scripts.realtime_predictions import RealtimeRunner
+from scripts.sync_h1_data import run_sync
+from src.data.replay import MemoryStore, ReplayClock, TickReplayServer, record_hours, recorded_hours
+from src.features.registry import FeatureCache
+from src.models.model_registry import ModelRegistry
+from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+NOT_MEASURED = [
+    "outbox: MemoryStore writes synchronously, no SQLite outbox / flusher",
+    "network round-trips to Supabase and Dukascopy (local replay server)",
+    "GitHub Actions runner start-up (checkout, pip install, imports)",
+]
+
+
+def summarize(latencies: dict) -> dict:
+    """stage -> {n, p50, p90, p99, max} dalam detik"""
+    summary = {}
+    for stage, values in latencies.items():
+        if not values:
+            continue
+        arr = np.asarray(values)
+        summary[stage] = {'n': len(arr), **{f"p{p}": round(float(np.percentile(arr, p)), 3) for p in PERCENTILES},
+                          'max': round(float(arr.max()), 3)}
+    return summary
+
+
+def run_batch(server: TickReplayServer, store: MemoryStore, symbols, hours, args, workdir: str) -> dict:
+    """
+    Per jam: run_sync -> run_indicators -> run_predictions (fungsi yang sama
+    dengan main() script produksi), dengan Supabase diganti MemoryStore
+
+    workdir: state calendar + feature cache selama replay (tidak menyentuh
+    data/calendar / data/features produksi)
+    """
+    latencies = {'sync': [], 'indicators': [], 'signal': []}
+    sync_offset = args.sync_minute * 60
+    predict_offset = args.predict_minute * 60
+    calendar_dir = os.path.join(workdir, "calendar")
+    cache = FeatureCache(os.path.join(workdir, "features"))
+
+    for hour_start in hours:
+        hour_end = hour_start + timedelta(hours=1)
+        last_ticks = {s: server.last_tick_at(s, hour_start) for s in symbols}
+        last_ticks = {s: t for s, t in last_ticks.items() if t is not None}
+        if not last_ticks:
+            continue
+        # Detik dari tick terakhir sampai akhir jam (waktu simulasi)
+        tail = {s: (hour_end - t).total_seconds() for s, t in last_ticks.items()}
+
+        # Sync (cron sync_h1_data): symbol berurutan seperti loop run_sync
+        sync_at = hour_end + timedelta(seconds=sync_offset)
+        server.clock.sleep_until(sync_at)
+        start = time.perf_counter()
+        for symbol in symbols:
+            uploaded = run_sync([symbol], store, now=server.clock.now(), base_url=server.base_url,
+                                calendar_dir=calendar_dir)
+            if symbol in tail and uploaded.get(symbol):
+                latencies['sync'].append(tail[symbol] + sync_offset + time.perf_counter() - start)
+        synced = time.perf_counter() - start
+
+        # Indicators (workflow_run setelah sync): tulis kolom indicator ohlc_data
+        run_indicators(symbols, store, cache)
+        indicators = time.perf_counter() - start
+        for symbol in tail:
+            latencies['indicators'].append(tail[symbol] + sync_offset + indicators)
+
+        # Prediksi (cron --predict-minute / setelah indicators) tidak bisa mulai sebelum keduanya selesai
+        offset = max(predict_offset, sync_offset + indicators)
+        server.clock.sleep_until(hour_end + timedelta(seconds=offset))
+        start = time.perf_counter()
+        results = run_predictions(symbols, store, cache=cache)
+        signal = time.perf_counter() - start
+
+        for symbol, prediction in results.items():
+            if prediction is not None and symbol in tail:
+                latencies['signal'].append(tail[symbol] + offset + signal)
+
+        logger.info(f"{hour_start}: sync {synced:.2f}s, indicators {indicators - synced:.2f}s, "
+                    f"predictions {signal:.2f}s")
+
+    return latencies
+
+
+def run_realtime(server: TickReplayServer, store: MemoryStore, predictors: dict, hours, args) -> dict:
+    """RealtimeRunner setiap --interval detik simulasi"""
+    latencies = {'poll': [], 'indicators': [], 'predict': []}
+    runner = RealtimeRunner(store, predictors, base_url=server.base_url)
+
+    cycle_at = hours[0]
+    end = hours[-1] + timedelta(hours=1)
+    while cycle_at < end:
+        server.clock.sleep_until(cycle_at)
+        now = server.clock.now()
+        timing = runner.cycle(now)
+
+        for symbol in runner.changed:
+            last_tick = runner.pollers[symbol].candle.last_tick_at
+            # Umur tick terbaru saat dipoll + proses
+            age = (now - last_tick).total_seconds()
+            latencies['poll'].append(age + timing['poll_ms'] / 1000)
+            if 'predict_ms' in timing:
+                latencies['indicators'].append(age + (timing['poll_ms'] + timing['features_ms']) / 1000)
+                latencies['predict'].append(
+                    age + (timing['poll_ms'] + timing['features_ms'] + timing['predict_ms']) / 1000
+                )
+
+        cycle_at += timedelta(seconds=args.interval)
+
+    return latencies
+
+
+def load_predictors(symbols):
+    model_registry = ModelRegistry(config.MODEL_REGISTRY_DIR)
+    predictors = {}
+    if config.MODEL_SCOPE == 'global':
+        predictors = load_global_predictors(symbols, model_registry)
+    for symbol in symbols:
+        if symbol not in predictors:
+            predictor = load_predictor(symbol, model_registry)
+            if predictor is not None:
+                predictors[symbol] = predictor
+    return predictors
+
+
+@profile_main("replay_pipeline")
+def main():
+    parser = argparse.ArgumentParser(description="Replay tick + latency pipeline")
+    parser.add_argument("--root", default=config.REPLAY_DIR, help="Direktori rekaman .bi5")
+    add_symbol_args(parser)
+    parser.add_argument("--start", required=True, help="Jam pertama yang direplay (UTC, ISO)")
+    parser.add_argument("--end", help="Jam terakhir (default: --start + --hours)")
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--record", action="store_true", help="Download rekaman .bi5 ke --root lalu keluar")
+    parser.add_argument("--mode", choices=["batch", "realtime"], default="batch")
+    parser.add_argument("--speed", type=float, default=60.0, help="Kecepatan waktu simulasi (1 = real time)")
+    parser.add_argument("--sync-minute", type=float, default=5, help="Menit sync (cron sync_h1_data)")
+    parser.add_argument("--predict-minute", type=float, default=15, help="Menit prediksi (cron generate_predictions)")
+    parser.add_argument("--interval", type=float, default=config.REALTIME_INTERVAL_SECONDS,
+                        help="Detik simulasi antar polling (mode realtime)")
+    parser.add_argument("--output", help="Tulis hasil ke file JSON")
+    args = parser.parse_args()
+
+    symbols = resolve_symbols(args)
+    start = pd.Timestamp(args.start).floor('h').to_pydatetime()
+    end = pd.Timestamp(args.end).floor('h').to_pydatetime() if args.end else start + timedelta(hours=args.hours - 1)
+
+    if args.record:
+        hours = list(pd.date_range(start, end, freq='h').to_pydatetime())
+        for symbol in symbols:
+            saved = record_hours(args.root, symbol, hours)
+            logger.info(f"{symbol}: {saved} files recorded")
+        return
+
+    hours = sorted({h for s in symbols for h in recorded_hours(args.root, s) if start <= h <= end})
+    if not hours:
+        logger.error(f"No recorded hours in {args.root} between {start} and {end}")
+        sys.exit(1)
+
+    predictors = load_predictors(symbols)
+    if not predictors:
+        logger.error("No models available")
+        sys.exit(1)
+
+    store = MemoryStore()
+    seeded = store.seed(args.root, list(predictors), before=hours[0])
+    if seeded < config.SEQUENCE_LENGTH:
+        logger.warning(f"Only {seeded} history bars before {hours[0]}; record more hours before --start")
+
+    logger.info("="*70)
+    logger.info(f"REPLAY: {args.mode}, {len(hours)} hours, {len(predictors)} symbols, speed {args.speed}x")
+    logger.info("="*70)
+
+    clock = ReplayClock(hours[0], speed=args.speed)
+    server = TickReplayServer(args.root, clock).start()
+    try:
+        if args.mode == 'batch':
+            with tempfile.TemporaryDirectory(prefix="replay-") as workdir:
+                latencies = run_batch(server, store, list(predictors), hours, args, workdir)
+        else:
+            latencies = run_realtime(server, store, predictors, hours, args)
+    finally:
+        server.stop()
+
+    summary = summarize(latencies)
+    logger.info("\n" + "="*70)
+    logger.info(f"TICK -> STAGE LATENCY (seconds, {args.mode})")
+    logger.info("="*70)
+    logger.info(f"{'stage':12s} {'n':>6s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s}")
+    for stage, s in summary.items():
+        logger.info(f"{stage:12s} {s['n']:6d} {s['p50']:9.3f} {s['p90']:9.3f} {s['p99']:9.3f} {s['max']:9.3f}")
+    logger.info(f"Requests: {server.requests} ({server.not_modified} not modified), "
+                f"predictions saved: {len(store.tables.get('predictions', []))}")
+    logger.info(f"Not measured: {'; '.join(NOT_MEASURED)}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'mode': args.mode,
+                'speed': args.speed,
+                'hours': [hours[0].isoformat(), hours[-1].isoformat()],
+                'symbols': list(predictors),
+                'latency': summary,
+                'not_measured': NOT_MEASURED,
+            }, f, indent=2)
+        logger.info(f"Results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
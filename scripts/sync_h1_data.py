@@ -1,92 +1,127 @@
 """
 Sync H1 OHLC data dari Dukascopy ke Supabase
+
+Usage:
+    python scripts/sync_h1_data.py
+    python scripts/sync_h1_data.py --shard 1/4   # 1 dari 4 runner paralel
 """
 
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
 import logging
 import pandas as pd
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
 from src.data.dukascopy_downloader import DukascopyH1Downloader
 from src.data.supabase_client import SupabaseClient
+from src.data.tick_archive import TickArchive
+from src.data.trading_calendar import TradingCalendar
 from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols, shard_label
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# HARDCODED symbols untuk memastikan semua pairs ter-sync
-ALL_SYMBOLS = [
-    'EURUSD', 'GBPUSD', 'XAUUSD',
-    'USDJPY', 'AUDUSD', 'USDCHF',
-    'USDCAD', 'NZDUSD', 'EURGBP',
-    'EURJPY', 'GBPJPY'
-]
-
 
-def sync_symbol(symbol: str, supabase: SupabaseClient) -> int:
-    """Sync data untuk 1 symbol"""
+def fill_gaps(symbol: str, supabase: SupabaseClient, downloader: DukascopyH1Downloader,
+              now: Optional[datetime] = None) -> int:
+    """Download ulang jam buka yang hilang dalam lookback window"""
+    # Batas jam penuh: start di tengah jam membuat bar jam itu tidak ter-query
+    # (gte) padahal open_hours memasukkannya, jadi selalu terlihat sebagai gap
+    end_date = (now or datetime.utcnow()).replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    start_date = end_date - timedelta(hours=config.SYNC_GAP_LOOKBACK_HOURS)
     
-    # Get latest timestamp dari database
-    response = supabase.client.table("ohlc_data").select(
-        "timestamp"
-    ).eq(
-        "symbol", symbol
-    ).eq(
-        "timeframe", "H1"
-    ).order(
-        "timestamp", desc=True
-    ).limit(1).execute()
-    
-    if response.data:
-        latest_ts = response.data[0]['timestamp']
-        latest_ts = pd.to_datetime(latest_ts)
-        if latest_ts.tz is not None:
-            latest_ts = latest_ts.tz_localize(None)
-        start_date = latest_ts + timedelta(hours=1)
-    else:
-        # Tidak ada data, download 7 hari
-        start_date = datetime.utcnow() - timedelta(days=7)
+    existing = supabase.get_timestamps(symbol, start_date, end_date)
+    if not existing:
+        return 0
     
-    end_date = datetime.utcnow()
+    # Hanya gap sebelum data terakhir; sesudahnya ditangani sync biasa
+    last_ts = pd.to_datetime(existing[-1])
+    if last_ts.tz is not None:
+        last_ts = last_ts.tz_localize(None)
     
-    # Skip kalau tidak ada data baru
-    if start_date >= end_date:
-        logger.info(f"{symbol}: Already up to date")
+    gaps = downloader.calendar.find_gaps(existing, start_date, last_ts.to_pydatetime())
+    if len(gaps) == 0:
         return 0
     
-    # Download
-    downloader = DukascopyH1Downloader(symbol)
-    df = downloader.download_range(start_date, end_date)
+    logger.info(f"{symbol}: {len(gaps)} gaps in last {config.SYNC_GAP_LOOKBACK_HOURS}h")
+    df = downloader.download_hours(list(gaps.to_pydatetime()))
     
     if df.empty:
-        logger.warning(f"{symbol}: No new data")
         return 0
     
-    # Upload
-    uploaded = supabase.upload_ohlc(df, symbol, 'H1')
-    return uploaded
+    return supabase.upload_ohlc(df, symbol, 'H1')
 
 
-def main():
-    logger.info("="*70)
-    logger.info("SYNC H1 DATA")
-    logger.info("="*70)
-    logger.info(f"Symbols: {', '.join(ALL_SYMBOLS)}")
-    logger.info(f"Total: {len(ALL_SYMBOLS)} pairs")
-    logger.info("="*70)
+def sync_symbol(symbol: str, supabase: SupabaseClient, now: Optional[datetime] = None,
+                base_url: Optional[str] = None, calendar_dir: Optional[str] = None) -> int:
+    """
+    Sync data untuk 1 symbol
     
-    config.validate()
-    supabase = SupabaseClient()
+    Args:
+        now: waktu sekarang (UTC); replay memakai waktu simulasi
+        base_url / calendar_dir: override datafeed / state calendar (replay)
+    """
+    now = now or datetime.utcnow()
+    calendar = TradingCalendar.for_symbol(symbol, calendar_dir or config.CALENDAR_DIR)
+    archive = TickArchive(config.TICK_ARCHIVE_DIR) if config.TICK_ARCHIVE else None
+    downloader = DukascopyH1Downloader(symbol, calendar=calendar, base_url=base_url, archive=archive)
+    
+    # Get latest timestamp dari database
+    latest_ts = supabase.get_latest_timestamp(symbol, 'H1')
+    
+    if latest_ts is not None:
+        start_date = latest_ts.to_pydatetime() + timedelta(hours=1)
+    else:
+        # Tidak ada data, download 7 hari
+        start_date = now - timedelta(days=7)
     
+    # Lompat ke jam buka berikutnya (weekend/holiday tidak perlu di-request)
+    start_date = calendar.next_open(start_date)
+    # Hanya jam yang sudah tutup: file jam berjalan masih bertambah, dan bar
+    # parsial tidak akan pernah di-download ulang (sync berikutnya mulai dari latest + 1)
+    end_date = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    
+    try:
+        uploaded = fill_gaps(symbol, supabase, downloader, now) if latest_ts is not None else 0
+        
+        # Skip kalau tidak ada data baru
+        if start_date > end_date:
+            logger.info(f"{symbol}: Already up to date")
+            return uploaded
+        
+        # Download
+        df = downloader.download_range(start_date, end_date)
+        
+        if df.empty:
+            logger.warning(f"{symbol}: No new data")
+            return uploaded
+        
+        # Upload
+        uploaded += supabase.upload_ohlc(df, symbol, 'H1')
+        return uploaded
+    finally:
+        calendar.save()
+
+
+def run_sync(symbols: List[str], supabase: SupabaseClient, **kwargs) -> Dict[str, int]:
+    """
+    Sync semua symbol (body main, dipakai juga oleh replay_pipeline)
+    
+    Returns:
+        symbol -> jumlah candle yang di-upload
+    """
     results = {}
     
-    for symbol in ALL_SYMBOLS:
+    for symbol in symbols:
         logger.info(f"\nSyncing {symbol}")
         try:
-            uploaded = sync_symbol(symbol, supabase)
+            uploaded = sync_symbol(symbol, supabase, **kwargs)
             results[symbol] = uploaded
             if uploaded > 0:
                 logger.info(f"✅ {symbol}: {uploaded} candles")
@@ -96,12 +131,39 @@ def main():
             logger.error(f"❌ {symbol}: Error - {e}")
             results[symbol] = 0
     
+    return results
+
+
+@profile_main("sync_h1_data")
+def main():
+    parser = argparse.ArgumentParser(description="Sync H1 data")
+    add_symbol_args(parser)
+    args = parser.parse_args()
+    symbols = resolve_symbols(args)
+
+    logger.info("="*70)
+    logger.info("SYNC H1 DATA")
+    logger.info("="*70)
+    logger.info(f"Symbols: {', '.join(symbols)}")
+    logger.info(f"Total: {len(symbols)} pairs, shard: {shard_label(args)}")
+    logger.info("="*70)
+    
+    config.validate()
+    supabase = SupabaseClient()
+    if config.OUTBOX_ENABLED:
+        supabase.start_outbox()
+    
+    results = run_sync(symbols, supabase)
+    
     # Summary
     logger.info("\n" + "="*70)
     logger.info("SYNC SUMMARY")
     logger.info("="*70)
     for symbol, count in results.items():
         logger.info(f"  {symbol}: {count} new candles")
+    pending = supabase.close()
+    if pending:
+        logger.warning(f"  {pending} outbox entries not yet written (dikirim run berikutnya)")
     logger.info("✅ Sync complete!")
 
 
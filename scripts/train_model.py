@@ -1,117 +1,321 @@
 """
-Train LSTM model
+Train model (backend: --backend lstm | gbm)
+
+Mode:
+    --mode full         retrain semua symbol dari awal
+    --mode incremental  skip symbol yang datanya tidak berubah, fine-tune
+                        dari bundle sebelumnya kalau data bertambah
+                        (fine-tune hanya LSTM; gbm selalu retrain penuh)
 """
 
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
 import logging
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
 
-from src.data.supabase_client import SupabaseClient
-from src.models.lstm_model import TradingLSTM
+from src.data.panel import OHLCPanel
+from src.data.supabase_client import OHLC_COLUMNS, SupabaseClient
+from src.features.registry import MODEL_FEATURES, FeatureCache, registry
+from src.models.backends import BACKENDS, get_backend
+from src.models.global_model import GLOBAL_SYMBOL, GlobalLSTM
+from src.models.incremental import IncrementalTrainer, combine_fingerprints, data_fingerprint
+from src.models.lstm_model import DEFAULT_HPARAMS, TradingLSTM
+from src.models.model_registry import ModelRegistry
+from src.models.performance import write_report
+from src.models.tuning import load_best_hparams
+from src.models.window_dataset import WindowDataset, sync_dataset
 from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols, shard_label
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def train_for_symbol(symbol: str, supabase: SupabaseClient):
-    """Train model untuk 1 symbol"""
-    
+def publish(symbol: str, model, model_registry: ModelRegistry, metadata: dict):
+    """Publish bundle ke registry (model: apa pun yang punya to_bundle)"""
+    bundle = model.to_bundle({
+        'symbol': symbol,
+        'timeframe': 'H1',
+        **metadata,
+    })
+    model_registry.publish(ModelRegistry.key(symbol, 'H1'), bundle, weights_dtype=config.MODEL_WEIGHTS_DTYPE)
+
+
+def train_for_symbol(symbol: str, dataset: WindowDataset, model_registry: ModelRegistry, data_info: dict,
+                     hparams: dict = None, performance: bool = False, backend: str = 'lstm'):
+    """Train model untuk 1 symbol, returns (accuracy, profile)"""
+
     logger.info(f"\n{'='*70}")
-    logger.info(f"Training model: {symbol}")
+    logger.info(f"Training model: {symbol} ({backend})")
     logger.info(f"{'='*70}")
-    
-    # Get data
-    response = supabase.client.table("ohlc_data").select("*").eq(
-        "symbol", symbol
-    ).eq(
-        "timeframe", "H1"
-    ).order("timestamp").execute()
-    
-    if not response.data:
-        logger.warning(f"No data for {symbol}")
-        return
-    
-    df = pd.DataFrame(response.data)
-    logger.info(f"Loaded {len(df)} rows")
-    
+
     # Initialize model
-    lstm = TradingLSTM(sequence_length=60)
-    
-    # Prepare data
-    X, y = lstm.prepare_data(df)
-    
-    if X is None:
-        logger.error("Failed to prepare data")
-        return
-    
-    # Split train/test
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, shuffle=False
-    )
-    
+    model = get_backend(backend)(sequence_length=config.SEQUENCE_LENGTH, hparams=hparams, performance=performance)
+    model.scaler = dataset.build_scaler()
+
+    # Split train/test (urut waktu, dibaca dari dataset memmap)
+    X_train, X_test, y_train, y_test = dataset.split(test_size=0.2)
+
     logger.info(f"Train: {len(X_train)}, Test: {len(X_test)}")
-    
+
     # Train
-    history = lstm.train(X_train, y_train, X_test, y_test, epochs=100)
-    
+    epochs = model.fit(X_train, y_train, X_test, y_test, epochs=config.EPOCHS)
+
     # Evaluate
-    test_loss, test_acc = lstm.model.evaluate(X_test, y_test, verbose=0)
+    test_loss, test_acc = model.evaluate(X_test, y_test)
+    logger.info(f"\n✅ Training complete!")
+    logger.info(f"   Test Accuracy: {test_acc*100:.2f}%")
+    logger.info(f"   Test Loss: {test_loss:.4f}")
+
+    publish(symbol, model, model_registry, {
+        **data_info,
+        'mode': 'full',
+        'n_train': len(X_train),
+        'n_test': len(X_test),
+        'epochs': epochs,
+        'metrics': {'test_accuracy': float(test_acc), 'test_loss': float(test_loss)},
+    })
+
+    return test_acc, model.profile
+
+
+def finetune_for_symbol(symbol: str, dataset: WindowDataset, previous, trainer: IncrementalTrainer,
+                        model_registry: ModelRegistry, data_info: dict, performance: bool = False):
+    """Fine-tune bundle sebelumnya, returns (accuracy, profile); None kalau ditolak (lanjut full retrain)"""
+
+    logger.info(f"\n{'='*70}")
+    logger.info(f"Fine-tuning model: {symbol} (from {previous.version})")
+    logger.info(f"{'='*70}")
+
+    lstm = TradingLSTM(sequence_length=config.SEQUENCE_LENGTH, performance=performance)
+    lstm.load_bundle(previous)
+
+    X_train, X_test, y_train, y_test = dataset.split(test_size=0.2)
+
+    metrics = trainer.finetune(lstm, previous.metadata['n_train'], X_train, y_train, X_test, y_test)
+    if metrics is None:
+        return None
+
+    logger.info(f"\n✅ Fine-tune complete!")
+    logger.info(f"   Test Accuracy: {metrics['test_accuracy']*100:.2f}%")
+    logger.info(f"   Test Loss: {metrics['test_loss']:.4f}")
+
+    publish(symbol, lstm, model_registry, {
+        **data_info,
+        'mode': 'finetune',
+        'parent': previous.hash,
+        'n_train': len(X_train),
+        'n_test': len(X_test),
+        'epochs': metrics.pop('epochs'),
+        'metrics': metrics,
+    })
+
+    return metrics['test_accuracy'], lstm.profile
+
+
+def train_global(panel: OHLCPanel, model_registry: ModelRegistry, args):
+    """Train 1 model global untuk semua symbol, returns (results, report)"""
+
+    logger.info(f"\n{'='*70}")
+    logger.info(f"Training global model: {len(panel.symbols)} symbols")
+    logger.info(f"{'='*70}")
+
+    datasets = {}
+    for symbol in panel.symbols:
+        dataset = sync_dataset(config.DATASET_DIR, panel, symbol, sequence_length=config.SEQUENCE_LENGTH)
+        if dataset is not None and dataset.n_windows:
+            datasets[symbol] = dataset
+    if not datasets:
+        logger.error("No symbol has enough data for the global model")
+        return {}, {}
+
+    symbols = list(datasets)
+    data_info = combine_fingerprints({s: data_fingerprint(panel, s, MODEL_FEATURES) for s in symbols})
+    # tune_model.py hanya men-tune model per symbol; model global pakai default
+    hparams = dict(DEFAULT_HPARAMS)
+
+    if args.mode == 'incremental':
+        try:
+            previous = model_registry.load(ModelRegistry.key(GLOBAL_SYMBOL, 'H1'))
+        except Exception as e:
+            logger.warning(f"Cannot load previous global bundle: {e}")
+            previous = None
+
+        if (previous is not None
+                and previous.metadata.get('data_fingerprint') == data_info['data_fingerprint']
+                and previous.metadata.get('symbols') == symbols
+                and previous.metadata.get('label_method') == config.LABEL_METHOD
+                and previous.metadata.get('sequence_length') == config.SEQUENCE_LENGTH
+                and {**DEFAULT_HPARAMS, **previous.metadata.get('hparams', {})} == hparams):
+            logger.info(f"Global: Data unchanged, skip ({previous.version})")
+            per_symbol = previous.metadata.get('metrics', {}).get('symbols', {})
+            results = {s: ('skip', per_symbol.get(s, {}).get('test_accuracy')) for s in symbols}
+            return results, {GLOBAL_SYMBOL: {'mode': 'skip', 'version': previous.version}}
+
+    lstm = GlobalLSTM(symbols, sequence_length=config.SEQUENCE_LENGTH, hparams=hparams, performance=args.perf)
+    history, test = lstm.fit_datasets(datasets, epochs=config.EPOCHS)
+
+    test_loss, test_acc = lstm.model.evaluate(test, verbose=0)
+    per_symbol = lstm.evaluate_symbols(datasets)
     logger.info(f"\n✅ Training complete!")
     logger.info(f"   Test Accuracy: {test_acc*100:.2f}%")
     logger.info(f"   Test Loss: {test_loss:.4f}")
-    
-    # Save model
-    os.makedirs("models/saved", exist_ok=True)
-    model_path = f"models/saved/{symbol}_H1_model.h5"
-    scaler_path = f"models/saved/{symbol}_H1_scaler.pkl"
-    
-    lstm.save(model_path, scaler_path)
-    
-    return test_acc
 
+    publish(GLOBAL_SYMBOL, lstm, model_registry, {
+        **data_info,
+        'mode': 'full',
+        'n_train': int(sum(ds.n_windows for ds in datasets.values()) - test.n_samples),
+        'n_test': test.n_samples,
+        'epochs': len(history.history['loss']),
+        'metrics': {'test_accuracy': float(test_acc), 'test_loss': float(test_loss), 'symbols': per_symbol},
+    })
+
+    results = {s: ('global', m['test_accuracy']) for s, m in per_symbol.items()}
+    report = {GLOBAL_SYMBOL: {
+        'mode': 'full', 'test_accuracy': float(test_acc), 'symbols': per_symbol, 'profile': lstm.profile
+    }}
+    return results, report
 
+
+@profile_main("train_model")
 def main():
+    parser = argparse.ArgumentParser(description="Train ML models")
+    parser.add_argument("--mode", choices=["full", "incremental"], default=config.TRAIN_MODE)
+    parser.add_argument("--backend", choices=list(BACKENDS), default=config.MODEL_BACKEND)
+    parser.add_argument("--scope", choices=["per_symbol", "global"], default=config.MODEL_SCOPE,
+                        help="global = 1 model untuk semua symbol")
+    parser.add_argument("--perf", action=argparse.BooleanOptionalAction, default=config.TRAIN_PERF_MODE,
+                        help="XLA, thread tuning, float32 dan profiling per epoch (--no-perf untuk mematikan TRAIN_PERF_MODE)")
+    add_symbol_args(parser)
+    args = parser.parse_args()
+    if args.scope == 'global' and args.backend != 'lstm':
+        parser.error("--scope global hanya untuk backend lstm")
+
+    # Model global butuh semua symbol: tidak di-shard, hanya dijalankan shard 0
+    if args.scope == 'global' and args.shard[0] != 0:
+        logger.info(f"Scope global dilatih oleh shard 0, skip shard {shard_label(args)}")
+        return
+    symbols = resolve_symbols(args, shard=args.scope != 'global')
+
     logger.info("="*70)
     logger.info("TRAIN ML MODELS")
     logger.info("="*70)
-    
-    # Hardcoded semua 11 pairs
-    ALL_SYMBOLS = [
-        'EURUSD', 'GBPUSD', 'XAUUSD',
-        'USDJPY', 'AUDUSD', 'USDCHF',
-        'USDCAD', 'NZDUSD', 'EURGBP',
-        'EURJPY', 'GBPJPY'
-    ]
-    
-    logger.info(f"Symbols: {', '.join(ALL_SYMBOLS)}")
-    logger.info(f"Total: {len(ALL_SYMBOLS)} pairs")
+
+    logger.info(f"Symbols: {', '.join(symbols)}")
+    logger.info(f"Total: {len(symbols)} pairs, shard: {shard_label(args)}")
+    logger.info(f"Mode: {args.mode}{' (performance)' if args.perf else ''}, scope: {args.scope}, "
+                f"backend: {args.backend}")
     logger.info("="*70)
-    
+
     config.validate()
     supabase = SupabaseClient()
-    
+
+    # Load semua symbol ke panel, features dihitung sekaligus
+    frames = supabase.get_ohlc_frames(symbols, columns=OHLC_COLUMNS)
+    panel = OHLCPanel.from_frames(frames)
+    registry.compute(panel, MODEL_FEATURES, FeatureCache(config.FEATURE_CACHE_DIR))
+
+    model_registry = ModelRegistry(config.MODEL_REGISTRY_DIR, keep=config.MODEL_REGISTRY_KEEP)
+    trainer = IncrementalTrainer(
+        epochs=config.FINETUNE_EPOCHS,
+        replay=config.FINETUNE_REPLAY,
+        tolerance=config.FINETUNE_TOLERANCE
+    )
+    backend = get_backend(args.backend)
     results = {}
-    
-    for symbol in ALL_SYMBOLS:
-        try:
-            acc = train_for_symbol(symbol.strip(), supabase)
-            results[symbol] = acc
-        except Exception as e:
-            logger.error(f"Error training {symbol}: {e}", exc_info=True)
-    
+    report = {}
+
+    if args.scope == 'global':
+        results, report = train_global(panel, model_registry, args)
+    else:
+        for symbol in panel.symbols:
+            try:
+                data_info = data_fingerprint(panel, symbol, MODEL_FEATURES)
+                # Hasil tuning hanya untuk LSTM
+                tuned = load_best_hparams(config.TUNING_DIR, symbol) if args.backend == 'lstm' else {}
+                hparams = {**backend.DEFAULT_HPARAMS, **tuned}
+
+                previous = None
+                if args.mode == 'incremental':
+                    try:
+                        previous = model_registry.load(ModelRegistry.key(symbol, 'H1'))
+                    except Exception as e:
+                        logger.warning(f"{symbol}: Cannot load previous bundle: {e}")
+
+                if previous is not None and previous.metadata.get('backend', 'lstm') != args.backend:
+                    logger.info(f"{symbol}: Backend changed, full retrain")
+                    previous = None
+                # Hasil tuning baru -> arsitektur berubah, harus full retrain
+                if previous is not None and {**backend.DEFAULT_HPARAMS, **previous.metadata.get('hparams', {})} != hparams:
+                    logger.info(f"{symbol}: Hyperparameters changed, full retrain")
+                    previous = None
+                if previous is not None and previous.metadata.get('label_method', 'next_bar') != config.LABEL_METHOD:
+                    logger.info(f"{symbol}: Label method changed, full retrain")
+                    previous = None
+                if previous is not None and previous.metadata.get('sequence_length') != config.SEQUENCE_LENGTH:
+                    logger.info(f"{symbol}: Sequence length changed, full retrain")
+                    previous = None
+
+                plan = trainer.plan(data_info, previous) if args.mode == 'incremental' else 'full'
+                if plan == 'finetune' and args.backend != 'lstm':
+                    plan = 'full'
+
+                if plan == 'skip':
+                    logger.info(f"{symbol}: Data unchanged, skip ({previous.version})")
+                    results[symbol] = ('skip', previous.metadata.get('metrics', {}).get('test_accuracy'))
+                    report[symbol] = {'mode': 'skip', 'version': previous.version}
+                    continue
+
+                if plan == 'finetune':
+                    # Scaler bundle lama, bar lama di dataset tidak berubah -> cukup append
+                    dataset = sync_dataset(config.DATASET_DIR, panel, symbol, sequence_length=config.SEQUENCE_LENGTH,
+                                           scaler=previous.build_scaler())
+                    if dataset is not None:
+                        outcome = finetune_for_symbol(symbol, dataset, previous, trainer, model_registry,
+                                                      data_info, args.perf)
+                        if outcome is not None:
+                            acc, profile = outcome
+                            results[symbol] = ('finetune', acc)
+                            report[symbol] = {'mode': 'finetune', 'test_accuracy': acc, 'profile': profile}
+                            continue
+
+                dataset = sync_dataset(config.DATASET_DIR, panel, symbol, sequence_length=config.SEQUENCE_LENGTH)
+                if dataset is None:
+                    continue
+
+                acc, profile = train_for_symbol(symbol, dataset, model_registry, data_info,
+                                                hparams, args.perf, args.backend)
+                results[symbol] = ('full', acc)
+                report[symbol] = {'mode': 'full', 'test_accuracy': float(acc), 'profile': profile}
+            except Exception as e:
+                logger.error(f"Error training {symbol}: {e}", exc_info=True)
+
     logger.info("\n" + "="*70)
     logger.info("TRAINING COMPLETE")
     logger.info("="*70)
-    
-    for symbol, acc in results.items():
+
+    for symbol, (mode, acc) in results.items():
         if acc:
-            logger.info(f"  {symbol}: {acc*100:.2f}% accuracy")
+            logger.info(f"  {symbol}: {acc*100:.2f}% accuracy ({mode})")
+        else:
+            logger.info(f"  {symbol}: {mode}")
+
+    write_report(config.TRAIN_REPORT_PATH, report, {
+        'mode': args.mode,
+        'scope': args.scope,
+        'backend': args.backend,
+        'shard': shard_label(args),
+        'label_method': config.LABEL_METHOD,
+        'performance': args.perf,
+        'jit_compile': bool(args.perf and config.TRAIN_JIT_COMPILE),
+        'intra_op_threads': config.TF_INTRA_OP_THREADS,
+        'inter_op_threads': config.TF_INTER_OP_THREADS,
+    })
 
 if __name__ == "__main__":
     main()
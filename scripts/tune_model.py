@@ -0,0 +1,100 @@
+"""
+Hyperparameter search LSTM per symbol (successive halving)
+
+Hasil terbaik disimpan di models/tuning/{symbol}.json dan dipakai
+otomatis oleh train_model.py.
+
+Usage:
+    python scripts/tune_model.py --symbols EURUSD,XAUUSD --trials 12 --workers 2
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import logging
+import tempfile
+
+from src.data.panel import OHLCPanel
+from src.data.supabase_client import OHLC_COLUMNS, SupabaseClient
+from src.features.registry import MODEL_FEATURES, FeatureCache, registry
+from src.models.tuning import SuccessiveHalving, save_best
+from src.models.window_dataset import sync_dataset
+from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@profile_main("tune_model")
+def main():
+    parser = argparse.ArgumentParser(description="Tune LSTM hyperparameters")
+    add_symbol_args(parser)
+    parser.add_argument("--trials", type=int, default=config.TUNE_TRIALS)
+    parser.add_argument("--workers", type=int, default=config.TUNE_WORKERS)
+    parser.add_argument("--min-epochs", type=int, default=2)
+    parser.add_argument("--max-epochs", type=int, default=30)
+    parser.add_argument("--eta", type=int, default=3)
+    args = parser.parse_args()
+
+    symbols = resolve_symbols(args)
+
+    logger.info("="*70)
+    logger.info("TUNE ML MODELS")
+    logger.info("="*70)
+    logger.info(f"Symbols: {', '.join(symbols)}")
+    logger.info(f"Trials: {args.trials}, Workers: {args.workers}, "
+                f"Epochs: {args.min_epochs}..{args.max_epochs} (eta={args.eta})")
+
+    config.validate()
+    supabase = SupabaseClient()
+
+    frames = supabase.get_ohlc_frames(symbols, columns=OHLC_COLUMNS)
+    panel = OHLCPanel.from_frames(frames)
+    registry.compute(panel, MODEL_FEATURES, FeatureCache(config.FEATURE_CACHE_DIR))
+
+    search = SuccessiveHalving(
+        n_trials=args.trials,
+        min_epochs=args.min_epochs,
+        max_epochs=args.max_epochs,
+        eta=args.eta,
+        workers=args.workers
+    )
+    logger.info(f"Rung budgets: {search.budgets()}")
+
+    results = {}
+    for symbol in panel.symbols:
+        logger.info(f"\n{'='*70}")
+        logger.info(f"Tuning: {symbol}")
+        logger.info(f"{'='*70}")
+
+        try:
+            # Dataset yang sama dengan train_model.py (scaler di-fit dari panel)
+            dataset = sync_dataset(config.DATASET_DIR, panel, symbol,
+                                   sequence_length=config.SEQUENCE_LENGTH)
+            if dataset is None:
+                continue
+
+            with tempfile.TemporaryDirectory(prefix=f"tune-{symbol}-") as work_dir:
+                result = search.run(dataset, work_dir, test_size=0.2)
+        except Exception as e:
+            logger.error(f"Error tuning {symbol}: {e}", exc_info=True)
+            continue
+
+        path = save_best(config.TUNING_DIR, symbol, result)
+        results[symbol] = result['best']
+        logger.info(f"✅ {symbol}: best {result['best']['hparams']} -> {path}")
+
+    logger.info("\n" + "="*70)
+    logger.info("TUNING COMPLETE")
+    logger.info("="*70)
+
+    for symbol, best in results.items():
+        logger.info(f"  {symbol}: val_loss={best['val_loss']:.4f} "
+                    f"val_acc={best['val_accuracy']*100:.2f}%")
+
+if __name__ == "__main__":
+    main()
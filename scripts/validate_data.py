@@ -0,0 +1,160 @@
+"""
+Validasi (dan repair opsional) ohlc_data sebelum indicators / training
+
+Per symbol: seluruh history (kolom id + OHLC) dibaca sekali, dicek dalam
+1 pass vectorized (src/data/quality.py), lalu report JSON ditulis ke
+QUALITY_REPORT_PATH. Dengan --repair: baris duplikat / off-grid dihapus,
+jam yang hilang / rusak di-download ulang dan di-upsert (terbaru dulu,
+max QUALITY_MAX_REPAIR_HOURS per symbol per run). Jam yang sudah pernah
+di-download ulang (QUALITY_STATE_DIR) tidak dicoba lagi, hanya dilaporkan.
+
+Usage:
+    python scripts/validate_data.py
+    python scripts/validate_data.py --repair --symbols EURUSD,XAUUSD
+    python scripts/validate_data.py --repair --strict   # exit 1 kalau setelah repair masih ada issue
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from src.data.dukascopy_downloader import DukascopyH1Downloader
+from src.data.quality import RepairLog, validate_ohlc
+from src.data.supabase_client import OHLC_COLUMNS, SupabaseClient
+from src.data.trading_calendar import TradingCalendar
+from src.utils.config import config
+from src.utils.profiling import profile_main
+from src.utils.symbols import add_symbol_args, resolve_symbols, shard_label
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def repair_symbol(symbol: str, report, supabase: SupabaseClient, calendar: TradingCalendar,
+                  log: RepairLog, max_hours: int) -> dict:
+    """Hapus baris duplikat / off-grid, download ulang jam hilang / rusak yang belum pernah dicoba"""
+    deleted = 0
+    ids = report.delete_ids()
+    if ids:
+        deleted = supabase.delete_ids("ohlc_data", ids)
+        logger.info(f"{symbol}: Deleted {deleted} duplicate / off-grid rows")
+    elif report.flagged(('duplicate', 'off_grid')).any():
+        logger.warning(f"{symbol}: Duplicate / off-grid rows without id, not deleted")
+
+    # Terbaru dulu: paling berpengaruh ke state EMA dan window training terakhir
+    candidates = report.repair_hours()
+    pending = log.pending(candidates)
+    hours = pending[::-1][:max_hours]
+    uploaded = 0
+    if len(hours):
+        logger.info(f"{symbol}: Re-downloading {len(hours)}/{len(pending)} hours "
+                    f"({len(candidates) - len(pending)} already tried)")
+        downloader = DukascopyH1Downloader(symbol, calendar=calendar)
+        df = downloader.download_hours(sorted(hours.to_pydatetime()))
+        returned = pd.DatetimeIndex(df['timestamp']) if not df.empty else pd.DatetimeIndex([])
+        if not df.empty:
+            uploaded = supabase.upload_ohlc(df, symbol, 'H1')
+        # Fetch error: jam tanpa data belum tentu memang tidak ada, coba lagi run berikutnya
+        log.record(returned, hours.difference(returned) if not downloader.fetch_errors else [])
+
+    return {
+        'deleted': deleted,
+        'redownloaded': len(hours),
+        'uploaded': uploaded,
+        'already_tried': len(candidates) - len(pending),
+    }
+
+
+@profile_main("validate_data")
+def main():
+    parser = argparse.ArgumentParser(description="Validate / repair ohlc_data")
+    parser.add_argument("--repair", action="store_true", help="Hapus duplikat + download ulang jam hilang / rusak")
+    parser.add_argument("--max-hours", type=int, default=config.QUALITY_MAX_REPAIR_HOURS,
+                        help="Max jam download ulang per symbol")
+    parser.add_argument("--report", default=config.QUALITY_REPORT_PATH)
+    parser.add_argument("--strict", action="store_true", help="Exit 1 kalau masih ada issue")
+    add_symbol_args(parser)
+    args = parser.parse_args()
+    symbols = resolve_symbols(args)
+
+    logger.info("="*70)
+    logger.info("VALIDATE OHLC DATA")
+    logger.info("="*70)
+    logger.info(f"Symbols: {', '.join(symbols)}")
+    logger.info(f"Total: {len(symbols)} pairs, shard: {shard_label(args)}, repair: {args.repair}")
+    logger.info("="*70)
+
+    config.validate()
+    supabase = SupabaseClient()
+
+    summaries = {}
+    for symbol in symbols:
+        try:
+            data = supabase.fetch_ohlc(symbol, ('id',) + OHLC_COLUMNS)
+        except Exception as e:
+            logger.error(f"❌ {symbol}: Error loading - {e}")
+            continue
+        if len(data['timestamp']) == 0:
+            logger.warning(f"{symbol}: No data")
+            continue
+
+        calendar = TradingCalendar.for_symbol(symbol, config.CALENDAR_DIR)
+        start = time.perf_counter()
+        report = validate_ohlc(data, symbol, calendar)
+        elapsed = time.perf_counter() - start
+
+        summary = report.summary()
+        summary['validate_seconds'] = round(elapsed, 3)
+        issues = ', '.join(f"{k}={v}" for k, v in summary['issues'].items() if v)
+        logger.info(f"{'✅' if report.ok else '⚠️'} {symbol}: {report.rows} rows, "
+                    f"{len(report.missing)} missing hours{', ' + issues if issues else ''} ({elapsed:.3f}s)")
+
+        if args.repair and not report.ok:
+            log = RepairLog.for_symbol(symbol, config.QUALITY_STATE_DIR)
+            try:
+                summary['repair'] = repair_symbol(symbol, report, supabase, calendar, log, args.max_hours)
+                # Cek ulang: jam yang memang tidak ada di Dukascopy tetap tercatat
+                report = validate_ohlc(supabase.fetch_ohlc(symbol, ('id',) + OHLC_COLUMNS), symbol, calendar)
+                summary['after_repair'] = {k: v for k, v in report.summary().items()
+                                           if k in ('ok', 'rows', 'missing_hours', 'issues')}
+            except Exception as e:
+                logger.error(f"❌ {symbol}: Repair error - {e}")
+                summary['repair'] = {'error': str(e)}
+            finally:
+                calendar.save()
+                log.save()
+
+        summaries[symbol] = summary
+
+    directory = os.path.dirname(args.report)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump({'generated_at': datetime.utcnow().isoformat(), 'symbols': summaries}, f, indent=2)
+
+    # Summary
+    logger.info("\n" + "="*70)
+    logger.info("VALIDATION SUMMARY")
+    logger.info("="*70)
+    for symbol, summary in summaries.items():
+        repaired = summary.get('repair', {})
+        final = summary.get('after_repair', summary)
+        logger.info(f"  {symbol}: {'OK' if final['ok'] else 'issues'}, "
+                    f"{final['missing_hours']} missing hours"
+                    + (f", {repaired.get('uploaded', 0)} rows repaired" if repaired else ""))
+    logger.info(f"Report: {args.report}")
+
+    if args.strict and not all(s.get('after_repair', s)['ok'] for s in summaries.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Resumable historical backfill dari Dukascopy ke Supabase
+
+Range tanggal dipecah menjadi unit symbol x bulan. Beberapa unit jalan
+bersamaan (thread), semua download lewat 1 DownloadPipeline: fetch di
+thread I/O, lzma decompress + parse di process pool, jadi network dan
+semua core terpakai sementara unit lain meng-upload.
+
+Checkpoint manifest lokal (id unit = symbol|YYYY-MM, tidak tergantung
+jam start / end run):
+
+    completed  bulan penuh yang selesai
+    partial    bulan yang belum penuh: list range jam yang sudah selesai
+               (urut, digabung kalau overlap / bersambung); run berikutnya
+               hanya mengambil jam di luar semua range itu
+
+Unit dengan fetch error (network, timeout, 5xx) tidak di-checkpoint;
+unit yang semua jamnya 404 (tidak ada data) di-checkpoint supaya tidak
+di-retry terus. Jam < SETTLE_HOURS terakhir tidak di-checkpoint karena
+file-nya mungkin belum dipublikasikan Dukascopy.
+"""
+
+import json
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from src.data.download_pipeline import DownloadPipeline
+from src.data.dukascopy_downloader import DukascopyH1Downloader
+from src.data.tick_archive import TickArchive
+from src.data.trading_calendar import TradingCalendar
+
+logger = logging.getLogger(__name__)
+
+# Supabase client per thread unit (dibuat sekali, dipakai ulang antar unit)
+_local = threading.local()
+
+SETTLE_HOURS = 2
+
+
+def _month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(dt: datetime) -> datetime:
+    if dt.month == 12:
+        return dt.replace(year=dt.year + 1, month=1)
+    return dt.replace(month=dt.month + 1)
+
+
+def unit_id(symbol: str, start: datetime) -> str:
+    """ID unit backfill: symbol + bulan kalender dari jam start"""
+    return f"{symbol}|{start:%Y-%m}"
+
+
+def _month_bounds(start: datetime) -> Tuple[datetime, datetime]:
+    """Jam pertama dan terakhir (inklusif) bulan dari start"""
+    first = _month_start(start)
+    return first, _next_month(first) - timedelta(hours=1)
+
+
+def month_units(
+    symbols: List[str],
+    start_date: datetime,
+    end_date: datetime
+) -> List[Tuple[str, datetime, datetime]]:
+    """Pecah range menjadi unit (symbol, start, end) per bulan kalender"""
+    start = start_date.replace(minute=0, second=0, microsecond=0)
+    end = end_date.replace(minute=0, second=0, microsecond=0)
+
+    ranges = []
+    current = start
+    while current <= end:
+        month_end = _next_month(_month_start(current)) - timedelta(hours=1)
+        ranges.append((current, min(month_end, end)))
+        current = month_end + timedelta(hours=1)
+
+    return [(symbol, s, e) for symbol in symbols for s, e in ranges]
+
+
+class CheckpointManifest:
+    """Checkpoint lokal (JSON) untuk unit backfill yang sudah selesai"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed = {}
+        self.partial = {}
+
+        if os.path.exists(path):
+            with open(path) as f:
+                content = json.load(f)
+            self.completed = content.get('completed', {})
+            self.partial = {uid: self._upgrade(entry) for uid, entry in content.get('partial', {}).items()}
+            logger.info(f"Manifest loaded: {len(self.completed)} completed units, {len(self.partial)} partial")
+
+    @staticmethod
+    def _upgrade(entry: dict) -> dict:
+        """Format lama (1 range start / end per unit) -> list ranges"""
+        if 'ranges' in entry:
+            return entry
+        return {
+            'ranges': [[entry['start'], entry['end']]],
+            'rows': entry['rows'],
+            'updated_at': entry.get('updated_at')
+        }
+
+    def _covered(self, uid: str) -> List[Tuple[datetime, datetime]]:
+        entry = self.partial.get(uid)
+        if not entry:
+            return []
+        return [(datetime.fromisoformat(s), datetime.fromisoformat(e)) for s, e in entry['ranges']]
+
+    def is_done(self, uid: str) -> bool:
+        return uid in self.completed
+
+    def remaining(self, uid: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Bagian [start, end] yang belum selesai: [start, end] dikurangi semua range partial"""
+        if self.is_done(uid):
+            return []
+
+        hour = timedelta(hours=1)
+        ranges = []
+        current = start
+        # Range partial sudah urut dan tidak overlap
+        for covered_start, covered_end in self._covered(uid):
+            if covered_end < current:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > current:
+                ranges.append((current, covered_start - hour))
+            current = covered_end + hour
+        if current <= end:
+            ranges.append((current, end))
+        return ranges
+
+    def mark_range(self, uid: str, start: datetime, end: datetime, rows: int):
+        """Catat [start, end] selesai; range yang overlap / bersambung digabung"""
+        hour = timedelta(hours=1)
+        merged = []
+        for covered_start, covered_end in sorted(self._covered(uid) + [(start, end)]):
+            if merged and covered_start <= merged[-1][1] + hour:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], covered_end))
+            else:
+                merged.append((covered_start, covered_end))
+        rows += self.partial.get(uid, {}).get('rows', 0)
+
+        first, last = _month_bounds(start)
+        if len(merged) == 1 and merged[0][0] <= first and merged[0][1] >= last:
+            self.partial.pop(uid, None)
+            self.mark_done(uid, rows)
+            return
+
+        self.partial[uid] = {
+            'ranges': [[s.isoformat(), e.isoformat()] for s, e in merged],
+            'rows': rows,
+            'updated_at': datetime.utcnow().isoformat()
+        }
+        self._save()
+
+    def mark_done(self, uid: str, rows: int):
+        self.completed[uid] = {
+            'rows': rows,
+            'completed_at': datetime.utcnow().isoformat()
+        }
+        self._save()
+
+    def _save(self):
+        """Tulis atomic supaya crash tidak merusak manifest"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'completed': self.completed, 'partial': self.partial}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _run_unit(
+    symbol: str,
+    start: datetime,
+    end: datetime,
+    pipeline: DownloadPipeline,
+    calendar_path: Optional[str] = None,
+    archive_dir: Optional[str] = None
+) -> Tuple[int, list, int]:
+    """
+    Download + upload 1 unit (dijalankan di thread unit)
+
+    Returns:
+        (rows uploaded, journal observasi calendar untuk di-merge,
+        jumlah jam yang gagal di-fetch)
+    """
+    supabase = getattr(_local, 'supabase', None)
+    if supabase is None:
+        from src.data.supabase_client import SupabaseClient
+        supabase = _local.supabase = SupabaseClient()
+
+    # Calendar per unit (read-only); hanya BackfillJob yang menulis file calendar
+    calendar = TradingCalendar(symbol, calendar_path)
+    # 1 unit = 1 symbol x bulan = 1 file arsip, jadi unit tidak berebut file
+    archive = TickArchive(archive_dir) if archive_dir else None
+    downloader = DukascopyH1Downloader(symbol, calendar=calendar, archive=archive)
+    df = downloader.download_range(start, end, pipeline)
+
+    if df.empty:
+        return 0, calendar.journal, downloader.fetch_errors
+
+    uploaded = supabase.upload_ohlc(df, symbol, 'H1')
+    if uploaded != len(df):
+        raise RuntimeError(f"Upload failed ({uploaded}/{len(df)} rows)")
+
+    return uploaded, calendar.journal, downloader.fetch_errors
+
+
+class BackfillJob:
+    """Backfill paralel symbol x bulan yang bisa di-resume"""
+
+    def __init__(
+        self,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        manifest_path: str,
+        workers: int = 4,
+        calendar_dir: Optional[str] = None,
+        archive_dir: Optional[str] = None,
+        io_workers: Optional[int] = None,
+        decode_workers: Optional[int] = None
+    ):
+        self.symbols = symbols
+        self.start_date = start_date
+        self.end_date = end_date
+        self.workers = max(1, workers)
+        self.manifest = CheckpointManifest(manifest_path)
+        self.archive_dir = archive_dir
+        self.pipeline_args = {'io_workers': io_workers, 'decode_workers': decode_workers}
+        self.calendars = {}
+
+        if calendar_dir:
+            self.calendars = {
+                symbol: TradingCalendar.for_symbol(symbol, calendar_dir)
+                for symbol in symbols
+            }
+
+    def _calendar_path(self, symbol: str) -> Optional[str]:
+        calendar = self.calendars.get(symbol)
+        return calendar.path if calendar else None
+
+    def pending_units(self) -> List[Tuple[str, datetime, datetime]]:
+        """Unit (bagian range) yang belum tercatat selesai di manifest"""
+        units = []
+        for symbol, start, end in month_units(self.symbols, self.start_date, self.end_date):
+            for s, e in self.manifest.remaining(unit_id(symbol, start), start, end):
+                units.append((symbol, s, e))
+        return units
+
+    def run(self) -> dict:
+        """
+        Jalankan semua unit pending
+
+        Returns:
+            dict dengan jumlah unit done / empty / failed dan total rows
+        """
+        units = self.pending_units()
+        total = len(month_units(self.symbols, self.start_date, self.end_date))
+
+        logger.info(f"Backfill: {len(units)}/{total} units pending, {self.workers} concurrent units")
+
+        summary = {'done': 0, 'empty': 0, 'failed': 0, 'rows': 0}
+
+        if not units:
+            return summary
+
+        with DownloadPipeline(**self.pipeline_args) as pipeline, ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(_run_unit, *unit, pipeline, self._calendar_path(unit[0]), self.archive_dir): unit
+                for unit in units
+            }
+
+            settled = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=SETTLE_HOURS)
+
+            for future in as_completed(futures):
+                symbol, start, end = futures[future]
+                uid = unit_id(symbol, start)
+
+                try:
+                    rows, journal, errors = future.result()
+                except Exception as e:
+                    logger.error(f"❌ {uid}: {e}")
+                    summary['failed'] += 1
+                    continue
+
+                if symbol in self.calendars:
+                    self.calendars[symbol].replay(journal)
+                    self.calendars[symbol].save()
+
+                summary['rows'] += rows
+                if errors:
+                    # Jangan di-checkpoint: jam yang gagal di-download lagi di run berikutnya
+                    logger.warning(f"⚠️  {uid}: {rows} candles, {errors} hours failed to download")
+                    summary['failed'] += 1
+                    continue
+
+                # Semua jam terjawab (data / 404): checkpoint, termasuk bulan tanpa data
+                if min(end, settled) >= start:
+                    self.manifest.mark_range(uid, start, min(end, settled), rows)
+
+                if rows == 0:
+                    logger.warning(f"⚠️  {uid}: No data")
+                    summary['empty'] += 1
+                    continue
+
+                summary['done'] += 1
+                logger.info(f"✅ {uid}: {rows} candles ({summary['done']}/{len(units)})")
+
+        return summary
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse YYYY-MM-DD atau YYYY-MM-DD HH:MM (UTC)"""
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value}")
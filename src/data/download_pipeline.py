@@ -0,0 +1,241 @@
+"""
+Pipeline download Dukascopy: network I/O dan decode (CPU) di-decouple
+
+    I/O threads (requests.Session per thread)   fetch payload .bi5 mentah
+      -> process pool                           lzma.decompress + parse + OHLC
+                                                (+ encode chunk TickArchive)
+      -> thread pemanggil                       calendar observe, tulis arsip
+
+Payload yang sudah di-fetch tapi belum selesai di-decode dibatasi
+max_pending (semaphore, di-acquire sebelum fetch): kalau decode tertinggal,
+jam berikutnya tidak di-fetch, jadi memori tetap terbatas; kalau network
+lambat, process pool menganggur sebentar saja karena fetch jalan paralel.
+
+1 pipeline bisa dipakai bersama beberapa thread pemanggil (BackfillJob:
+1 unit per thread, semua lewat I/O pool + process pool yang sama).
+
+Dengan memory profiling (--profile-memory), worker process men-trace
+decode_hour sendiri; statistiknya ikut hasil tiap task dan digabung per
+worker di summary profile.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from functools import partial
+from typing import List, Optional, Tuple
+
+import requests
+
+from src.data.dukascopy_downloader import decode_hour
+from src.utils.config import config
+from src.utils.profiling import allocations_enabled, drain_allocations, merge_worker_allocations, worker_init
+
+logger = logging.getLogger(__name__)
+
+
+def _ready() -> bool:
+    return True
+
+
+def _decode_tracked(*args) -> tuple:
+    """decode_hour di worker + statistik @track_allocations worker itu"""
+    return decode_hour(*args), os.getpid(), drain_allocations()
+
+
+class DownloadPipeline:
+    """I/O thread pool + decode process pool dengan backpressure"""
+
+    def __init__(
+        self,
+        io_workers: Optional[int] = None,
+        decode_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        request_delay: Optional[float] = None
+    ):
+        """
+        Args:
+            decode_workers: 0 = decode di thread I/O (tanpa process pool)
+            max_pending: max payload yang sedang di-fetch / menunggu decode
+                per pemanggil run()
+            request_delay: jeda (detik) setelah setiap request per thread I/O
+        """
+        self.io_workers = io_workers or config.DOWNLOAD_IO_WORKERS
+        self.decode_workers = config.DOWNLOAD_DECODE_WORKERS if decode_workers is None else decode_workers
+        self.max_pending = max(max_pending or config.DOWNLOAD_QUEUE_SIZE, 1)
+        self.request_delay = config.DOWNLOAD_REQUEST_DELAY if request_delay is None else request_delay
+
+        self._local = threading.local()
+        self._io = None
+        self._decode = None
+        self._track_workers = False
+
+    def start(self) -> 'DownloadPipeline':
+        if self.decode_workers > 0:
+            # Bukan fork: pemanggil bisa punya thread lain (unit backfill, outbox flusher),
+            # fork saat thread lain memegang lock bisa deadlock di child
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._track_workers = allocations_enabled()
+            self._decode = ProcessPoolExecutor(max_workers=self.decode_workers,
+                                               mp_context=multiprocessing.get_context(method),
+                                               initializer=worker_init,
+                                               initargs=(self._track_workers, config.PROFILE_MEMORY_FRAMES))
+            # Worker di-start (import numpy dll.) sekarang, bukan di callback fetch pertama
+            wait([self._decode.submit(_ready) for _ in range(self.decode_workers)])
+        self._io = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="download-io")
+        logger.info(f"Download pipeline: {self.io_workers} I/O threads, "
+                    f"{self.decode_workers or 'inline'} decode workers, max {self.max_pending} pending")
+        return self
+
+    def close(self):
+        if self._io is not None:
+            self._io.shutdown(wait=True)
+            self._io = None
+        if self._decode is not None:
+            self._decode.shutdown(wait=True)
+            self._decode = None
+
+    def __enter__(self) -> 'DownloadPipeline':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Stages ---
+
+    def _fetch(self, url: str) -> Tuple[int, bytes]:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        try:
+            response = session.get(url, timeout=30)
+            return response.status_code, response.content
+        finally:
+            if self.request_delay:
+                time.sleep(self.request_delay)
+
+    def _submit_decode(self, *args) -> Future:
+        if self._decode is not None and self._track_workers:
+            return self._submit_tracked(*args)
+        if self._decode is not None:
+            return self._decode.submit(decode_hour, *args)
+        future = Future()
+        try:
+            future.set_result(decode_hour(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _submit_tracked(self, *args) -> Future:
+        """Seperti submit decode_hour, statistik alokasi worker digabung saat selesai"""
+        result = Future()
+
+        def unpack(future):
+            try:
+                value, worker, functions = future.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            merge_worker_allocations(f"decode-{worker}", functions)
+            result.set_result(value)
+
+        self._decode.submit(_decode_tracked, *args).add_done_callback(unpack)
+        return result
+
+    def run(self, downloader, hours: List[datetime]) -> List[dict]:
+        """
+        Download + decode jam-jam untuk 1 downloader (symbol)
+
+        Returns:
+            list OHLC dict urut timestamp (jam tanpa data tidak ada);
+            jam yang gagal ditambahkan ke downloader.fetch_errors
+        """
+        if self._io is None:
+            raise RuntimeError("DownloadPipeline belum di-start")
+
+        lock = threading.Lock()
+        slots = threading.Semaphore(self.max_pending)
+        results, observed, chunks, failed = {}, [], [], []
+        archive = downloader.archive is not None
+
+        def decoded(hour, future):
+            try:
+                ohlc, chunk, count = future.result()
+                with lock:
+                    if ohlc:
+                        results[hour] = ohlc
+                        observed.append((hour, True))
+                    if chunk is not None:
+                        chunks.append((hour, chunk, count))
+            except Exception as e:
+                logger.error(f"Error decoding {hour}: {e}")
+                with lock:
+                    failed.append(hour)
+            finally:
+                slots.release()
+
+        def fetched(hour, future):
+            try:
+                status, content = future.result()
+            except Exception as e:
+                logger.error(f"Error downloading {hour}: {e}")
+                with lock:
+                    failed.append(hour)
+                slots.release()
+                return
+
+            if status == 200 and content:
+                try:
+                    decode = self._submit_decode(content, hour, downloader.price_divisor, archive)
+                except Exception as e:
+                    logger.error(f"Error decoding {hour}: {e}")
+                    with lock:
+                        failed.append(hour)
+                    slots.release()
+                    return
+                decode.add_done_callback(partial(decoded, hour))
+                return
+
+            # 404 / file kosong = market tutup; status lain = gagal, coba lagi nanti
+            with lock:
+                if status in (200, 404):
+                    observed.append((hour, False))
+                else:
+                    logger.warning(f"{downloader.symbol}: HTTP {status} for {hour}")
+                    failed.append(hour)
+            slots.release()
+
+        def write_chunks():
+            with lock:
+                ready = chunks[:]
+                chunks.clear()
+            for hour, chunk, count in ready:
+                try:
+                    downloader.archive.write_chunk(downloader.symbol, hour, chunk, count)
+                except Exception as e:
+                    logger.warning(f"{downloader.symbol}: Failed to archive ticks {hour}: {e}")
+
+        for hour in hours:
+            hour = hour.replace(minute=0, second=0, microsecond=0)
+            # Backpressure: tunggu sampai ada slot (fetch + decode yang belum selesai < max_pending)
+            slots.acquire()
+            self._io.submit(self._fetch, downloader._get_bi5_url(hour)).add_done_callback(partial(fetched, hour))
+            write_chunks()
+
+        # Semua slot kembali = semua fetch + decode selesai
+        for _ in range(self.max_pending):
+            slots.acquire()
+        for _ in range(self.max_pending):
+            slots.release()
+        write_chunks()
+
+        # Calendar tidak thread-safe: observe di thread pemanggil
+        for hour, has_data in sorted(observed):
+            downloader._observe(hour, has_data)
+        downloader.fetch_errors += len(failed)
+
+        return [results[hour] for hour in sorted(results)]
@@ -3,44 +3,129 @@ Download OHLC H1 data dari Dukascopy
 """
 
 import requests
+import numpy as np
 import pandas as pd
-import struct
 import lzma
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
 import time
 
+from src.data.tick_archive import encode_chunk
+from src.utils.config import config
+from src.utils.profiling import track_allocations
+from src.utils.symbols import dukascopy_symbol, price_divisor
+
 logger = logging.getLogger(__name__)
 
+# 1 tick = 20 bytes big-endian: ms sejak awal jam, ask, bid, ask volume, bid volume
+TICK_SIZE = 20
+TICK_DTYPE = np.dtype([
+    ('time', '>i4'), ('ask', '>i4'), ('bid', '>i4'), ('ask_vol', '>i4'), ('bid_vol', '>i4')
+])
+
+
+def parse_ticks(data: bytes, start: int = 0) -> np.ndarray:
+    """
+    Tick records mulai dari tick ke-start (tanpa copy); sisa byte yang
+    belum lengkap diabaikan
+    """
+    if not data:
+        return np.zeros(0, dtype=TICK_DTYPE)
+    count = len(data) // TICK_SIZE - start
+    if count <= 0:
+        return np.zeros(0, dtype=TICK_DTYPE)
+    return np.frombuffer(data, dtype=TICK_DTYPE, count=count, offset=start * TICK_SIZE)
+
+
+def mid_prices(ticks: np.ndarray, price_divisor: int) -> np.ndarray:
+    return (ticks['ask'].astype(np.float64) + ticks['bid']) / 2 / price_divisor
+
+
+def tick_volume(ticks: np.ndarray) -> int:
+    return int(ticks['ask_vol'].astype(np.int64).sum() + ticks['bid_vol'].astype(np.int64).sum())
+
+
+def decompress_bi5(data: bytes) -> Optional[bytes]:
+    """Decompress LZMA compressed bi5 data (None kalau corrupt)"""
+    try:
+        return lzma.decompress(data)
+    except lzma.LZMAError as e:
+        logger.warning(f"Corrupt data (skip): {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Decompression error: {e}")
+        return None
+
+
+def ohlc_from_ticks(ticks: np.ndarray, hour_start: datetime, price_divisor: int) -> Optional[dict]:
+    """Aggregate tick 1 jam ke OHLC H1"""
+    if len(ticks) == 0:
+        return None
+    
+    mid = mid_prices(ticks, price_divisor)
+    
+    return {
+        'timestamp': hour_start,
+        'open': round(float(mid[0]), 5),
+        'high': round(float(mid.max()), 5),
+        'low': round(float(mid.min()), 5),
+        'close': round(float(mid[-1]), 5),
+        'volume': tick_volume(ticks)
+    }
+
+
+@track_allocations()
+def decode_hour(content: bytes, hour_start: datetime, price_divisor: int, archive: bool = False) -> tuple:
+    """
+    Decompress + aggregate payload .bi5 1 jam (top-level supaya bisa
+    dijalankan di process pool, lihat src/data/download_pipeline.py)
+    
+    Returns:
+        (ohlc atau None, chunk TickArchive atau None, jumlah tick)
+    """
+    decompressed = decompress_bi5(content)
+    if decompressed is None:
+        raise ValueError("corrupt .bi5 payload")
+    if not decompressed:
+        return None, None, 0
+    
+    ticks = parse_ticks(decompressed)
+    chunk = encode_chunk(ticks) if archive and len(ticks) else None
+    return ohlc_from_ticks(ticks, hour_start, price_divisor), chunk, len(ticks)
+
 
 class DukascopyH1Downloader:
     """Download H1 OHLC data dari Dukascopy"""
     
-    BASE_URL = "https://datafeed.dukascopy.com/datafeed"
-    
-    SYMBOLS = {
-        'EURUSD': 'EURUSD',
-        'GBPUSD': 'GBPUSD', 
-        'USDJPY': 'USDJPY',
-        'AUDUSD': 'AUDUSD',
-        'USDCHF': 'USDCHF',
-        'USDCAD': 'USDCAD',
-        'NZDUSD': 'NZDUSD',
-        'EURGBP': 'EURGBP',
-        'EURJPY': 'EURJPY',
-        'GBPJPY': 'GBPJPY',
-        'XAUUSD': 'XAUUSD',
-        'XAGUSD': 'XAGUSD',
-    }
+    BASE_URL = config.DUKASCOPY_BASE_URL
     
-    def __init__(self, symbol: str):
-        if symbol not in self.SYMBOLS:
-            raise ValueError(f"Symbol {symbol} tidak didukung")
-        
+    def __init__(self, symbol: str, calendar=None, base_url: Optional[str] = None, archive=None):
         self.symbol = symbol
-        self.dukascopy_symbol = self.SYMBOLS[symbol]
-        self.price_divisor = 1000 if 'JPY' in symbol else 100000
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        # Instrument + divisor dari aturan / tabel di src/utils/symbols.py (tanpa whitelist)
+        self.dukascopy_symbol = dukascopy_symbol(symbol)
+        self.price_divisor = price_divisor(symbol)
+        
+        # Optional TradingCalendar: skip jam tutup + belajar dari 404
+        self.calendar = calendar
+        # Optional TickArchive: tick hasil decompress disimpan lokal
+        self.archive = archive
+        # Jam yang gagal di-fetch / decode (network, timeout, 5xx, corrupt),
+        # beda dengan 404 = memang tidak ada data
+        self.fetch_errors = 0
+    
+    def _observe(self, hour_start: datetime, has_data: bool):
+        if self.calendar is not None:
+            self.calendar.observe(hour_start, has_data)
+    
+    def _archive(self, hour_start: datetime, data: bytes):
+        if self.archive is None:
+            return
+        try:
+            self.archive.write_hour(self.symbol, hour_start, parse_ticks(data))
+        except Exception as e:
+            logger.warning(f"{self.symbol}: Failed to archive ticks {hour_start}: {e}")
     
     def _get_bi5_url(self, dt: datetime) -> str:
         """Generate URL untuk download bi5 file"""
@@ -50,64 +135,18 @@ class DukascopyH1Downloader:
         hour = dt.hour
         
         url = (
-            f"{self.BASE_URL}/{self.dukascopy_symbol}/"
+            f"{self.base_url}/{self.dukascopy_symbol}/"
             f"{year}/{month:02d}/{day:02d}/{hour:02d}h_ticks.bi5"
         )
         return url
     
     def _decompress_bi5(self, data: bytes) -> Optional[bytes]:
-        """Decompress LZMA compressed bi5 data"""
-        try:
-            return lzma.decompress(data)
-        except lzma.LZMAError as e:
-            logger.warning(f"Corrupt data (skip): {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Decompression error: {e}")
-            return None
+        return decompress_bi5(data)
     
+    @track_allocations()
     def _parse_ticks_to_ohlc(self, data: bytes, hour_start: datetime) -> Optional[dict]:
         """Parse tick data dan aggregate ke OHLC H1"""
-        if not data or len(data) == 0:
-            return None
-        
-        chunk_size = 20
-        num_ticks = len(data) // chunk_size
-        
-        if num_ticks == 0:
-            return None
-        
-        prices = []
-        volumes = []
-        
-        for i in range(num_ticks):
-            offset = i * chunk_size
-            chunk = data[offset:offset + chunk_size]
-            
-            if len(chunk) < chunk_size:
-                break
-            
-            try:
-                tick_time, ask, bid, ask_vol, bid_vol = struct.unpack('>5i', chunk)
-                mid_price = (ask + bid) / 2 / self.price_divisor
-                prices.append(mid_price)
-                volumes.append(bid_vol + ask_vol)
-            except struct.error:
-                continue
-        
-        if not prices:
-            return None
-        
-        ohlc = {
-            'timestamp': hour_start,
-            'open': round(prices[0], 5),
-            'high': round(max(prices), 5),
-            'low': round(min(prices), 5),
-            'close': round(prices[-1], 5),
-            'volume': sum(volumes)
-        }
-        
-        return ohlc
+        return ohlc_from_ticks(parse_ticks(data), hour_start, self.price_divisor)
     
     def download_hour(self, dt: datetime) -> Optional[dict]:
         """Download dan parse data untuk 1 jam"""
@@ -118,52 +157,85 @@ class DukascopyH1Downloader:
             response = requests.get(url, timeout=30)
             
             if response.status_code == 200:
+                if not response.content:
+                    # File kosong = market tutup
+                    self._observe(hour_start, False)
+                    return None
+                
                 decompressed = self._decompress_bi5(response.content)
+                if decompressed is None:
+                    self.fetch_errors += 1
+                    return None
                 
                 if decompressed:
+                    self._archive(hour_start, decompressed)
                     ohlc = self._parse_ticks_to_ohlc(decompressed, hour_start)
                     if ohlc:
+                        self._observe(hour_start, True)
                         return ohlc
             
             elif response.status_code == 404:
                 # No data available for this hour
+                self._observe(hour_start, False)
                 return None
             
+            else:
+                logger.warning(f"{self.symbol}: HTTP {response.status_code} for {hour_start}")
+                self.fetch_errors += 1
+            
             return None
         
         except Exception as e:
             logger.error(f"Error downloading {hour_start}: {e}")
+            self.fetch_errors += 1
             return None
     
-    def download_range(
-        self, 
-        start_date: datetime, 
-        end_date: datetime
-    ) -> pd.DataFrame:
-        """Download range of hours"""
-        data_list = []
+    def _plan_hours(self, start_date: datetime, end_date: datetime) -> list:
+        """Jam yang perlu di-request (jam tutup market di-skip kalau ada calendar)"""
+        if self.calendar is not None:
+            hours = self.calendar.open_hours(start_date, end_date)
+        else:
+            hours = []
+            current = start_date.replace(minute=0, second=0, microsecond=0)
+            end = end_date.replace(minute=0, second=0, microsecond=0)
+            while current <= end:
+                hours.append(current)
+                current += timedelta(hours=1)
+        return hours
+    
+    def download_hours(self, hours: list, pipeline=None) -> pd.DataFrame:
+        """
+        Download jam-jam tertentu (mis. gap di database)
         
-        current = start_date.replace(minute=0, second=0, microsecond=0)
-        end = end_date.replace(minute=0, second=0, microsecond=0)
+        Args:
+            pipeline: DownloadPipeline (fetch paralel + decode di process
+                pool); None = serial, kecuali jumlah jam >=
+                DOWNLOAD_PIPELINE_MIN_HOURS (pipeline sementara, 0 = selalu serial)
+        """
+        min_hours = config.DOWNLOAD_PIPELINE_MIN_HOURS
+        if pipeline is None and min_hours and len(hours) >= min_hours:
+            from src.data.download_pipeline import DownloadPipeline
+            with DownloadPipeline() as pipeline:
+                return self.download_hours(hours, pipeline)
         
-        total_hours = int((end - current).total_seconds() / 3600) + 1
-        downloaded = 0
+        if pipeline is not None:
+            data_list = pipeline.run(self, hours)
+            for ohlc in data_list:
+                ohlc['symbol'] = self.symbol
+            return self._to_frame(data_list)
         
-        logger.info(f"Downloading {total_hours} hours for {self.symbol}")
+        data_list = []
         
-        while current <= end:
+        for current in hours:
             ohlc = self.download_hour(current)
-            
             if ohlc:
                 ohlc['symbol'] = self.symbol
                 data_list.append(ohlc)
-                downloaded += 1
-            
-            current += timedelta(hours=1)
             time.sleep(0.5)
         
-        logger.info(f"Downloaded {downloaded}/{total_hours} hours for {self.symbol}")
-        
+        return self._to_frame(data_list)
+    
+    def _to_frame(self, data_list: list) -> pd.DataFrame:
         if data_list:
             df = pd.DataFrame(data_list)
             df = df[['symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume']]
@@ -172,6 +244,24 @@ class DukascopyH1Downloader:
         
         return pd.DataFrame()
     
+    def download_range(
+        self, 
+        start_date: datetime, 
+        end_date: datetime,
+        pipeline=None
+    ) -> pd.DataFrame:
+        """Download range of hours"""
+        hours = self._plan_hours(start_date, end_date)
+        total_hours = len(hours)
+        
+        logger.info(f"Downloading {total_hours} hours for {self.symbol}")
+        
+        df = self.download_hours(hours, pipeline)
+        
+        logger.info(f"Downloaded {len(df)}/{total_hours} hours for {self.symbol}")
+        
+        return df
+    
     def download_latest(self, hours: int = 24) -> pd.DataFrame:
         """Download N jam terakhir"""
         end_date = datetime.utcnow()
@@ -0,0 +1,295 @@
+"""
+Outbox lokal (SQLite, write-ahead) untuk write ke Supabase
+
+Stage menulis ke outbox lalu langsung lanjut; thread flusher me-replay
+entry ke database berurutan (id) dalam batch:
+
+    upsert  rows dari beberapa entry (table + on_conflict sama) digabung
+            1 request, duplikat conflict key -> baris terakhir menang
+    insert  digabung seperti upsert; dengan on_conflict jadi insert
+            ON CONFLICT DO NOTHING (idempotent, row yang sudah ada tidak
+            ditimpa)
+    update  1 request per entry (values + filter eq); update pending untuk
+            baris yang sama ditimpa payload-nya di tempat (id / posisi di
+            antrian tetap), jadi antrian tidak tumbuh dan baris yang
+            ditulis ulang setiap run tidak terus pindah ke belakang
+
+Entry baru dihapus setelah request sukses. Gagal -> berhenti (urutan
+tetap), coba lagi setelah backoff; setelah max_attempts entry
+ditandai 'dead' supaya tidak memblok antrian. upsert / update idempotent;
+insert tanpa on_conflict at-least-once (request sukses tapi response
+hilang = baris dobel), jadi write yang tidak boleh dobel (predictions)
+pakai conflict key deterministik. Entry dengan expires_at (mis. valid_until signal) yang
+sudah lewat dibuang, tidak dikirim terlambat.
+
+File tetap ada kalau process mati, jadi entry yang belum ter-flush
+dikirim oleh run berikutnya.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tbl TEXT NOT NULL,
+    op TEXT NOT NULL,
+    on_conflict TEXT,
+    match TEXT,
+    payload TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_update_match ON outbox (tbl, match) WHERE op = 'update';
+"""
+
+
+def _json_default(value):
+    # numpy scalar / datetime dari DataFrame records
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default, allow_nan=False, sort_keys=True)
+
+
+class Outbox:
+    """Antrian write durable + background flusher"""
+
+    def __init__(
+        self,
+        path: str,
+        client=None,
+        batch_size: int = 500,
+        interval: float = 1.0,
+        max_attempts: int = 20
+    ):
+        self.path = path
+        self.client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Outbox dari versi lama (cache CI) belum punya kolom expires_at
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if 'expires_at' not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN expires_at REAL")
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._failures = 0
+        self.flushed = 0
+
+    # --- Enqueue (dipanggil stage, tidak menunggu database) ---
+
+    def _enqueue(self, table: str, op: str, rows: List[dict], on_conflict: Optional[str] = None,
+                 match: Optional[dict] = None, expires_at: Optional[float] = None) -> int:
+        payload = _dumps(rows)
+        match = _dumps(match) if match else None
+        with self._lock:
+            replaced = 0
+            if op == 'update':
+                replaced = self._conn.execute(
+                    "UPDATE outbox SET payload = ? "
+                    "WHERE op = 'update' AND tbl = ? AND match = ? AND status = 'pending'",
+                    (payload, table, match)
+                ).rowcount
+            if not replaced:
+                self._conn.execute(
+                    "INSERT INTO outbox (tbl, op, on_conflict, match, payload, n_rows, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (table, op, on_conflict, match, payload, len(rows), time.time(), expires_at)
+                )
+        self._wake.set()
+        return len(rows)
+
+    def insert(self, table: str, rows, on_conflict: Optional[str] = None,
+               expires_at: Optional[float] = None) -> int:
+        """
+        on_conflict: row dengan key yang sudah ada di-skip (idempotent)
+        expires_at (epoch detik): entry dibuang kalau belum terkirim saat itu
+        """
+        return self._enqueue(table, 'insert', rows if isinstance(rows, list) else [rows],
+                             on_conflict=on_conflict, expires_at=expires_at)
+
+    def upsert(self, table: str, rows: List[dict], on_conflict: str) -> int:
+        return self._enqueue(table, 'upsert', rows, on_conflict=on_conflict)
+
+    def update(self, table: str, values: dict, match: Dict[str, object]) -> int:
+        return self._enqueue(table, 'update', [values], match=match)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    # --- Flush ---
+
+    def _next_batch(self) -> list:
+        """Entry pending berurutan, digabung per (table, op, on_conflict) sampai batch_size rows"""
+        with self._lock:
+            expired = self._conn.execute(
+                "DELETE FROM outbox WHERE status = 'pending' AND expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),)
+            ).rowcount
+            if expired:
+                logger.warning(f"Outbox: {expired} expired entries dropped")
+            entries = self._conn.execute(
+                "SELECT id, tbl, op, on_conflict, match, payload, n_rows, attempts FROM outbox "
+                "WHERE status = 'pending' ORDER BY id LIMIT ?", (self.batch_size,)
+            ).fetchall()
+
+        groups = []
+        for entry in entries:
+            _, table, op, on_conflict, _, _, n_rows, _ = entry
+            last = groups[-1] if groups else None
+            if (last is not None and op != 'update' and last['key'] == (table, op, on_conflict)
+                    and last['rows'] + n_rows <= self.batch_size):
+                last['entries'].append(entry)
+                last['rows'] += n_rows
+            else:
+                groups.append({'key': (table, op, on_conflict), 'entries': [entry], 'rows': n_rows})
+        return groups
+
+    def _execute(self, group: dict):
+        table, op, on_conflict = group['key']
+        rows = [row for entry in group['entries'] for row in json.loads(entry[5])]
+
+        if op == 'update':
+            query = self.client.table(table).update(rows[0])
+            for column, value in json.loads(group['entries'][0][4]).items():
+                query = query.eq(column, value)
+            query.execute()
+        elif op == 'upsert':
+            keys = on_conflict.split(',')
+            unique = {tuple(row.get(k) for k in keys): row for row in rows}
+            self.client.table(table).upsert(list(unique.values()), on_conflict=on_conflict).execute()
+        elif on_conflict:
+            # Insert idempotent: duplikat key -> baris pertama yang dipakai
+            keys = on_conflict.split(',')
+            unique = {}
+            for row in rows:
+                unique.setdefault(tuple(row.get(k) for k in keys), row)
+            self.client.table(table).upsert(list(unique.values()), on_conflict=on_conflict,
+                                            ignore_duplicates=True).execute()
+        else:
+            self.client.table(table).insert(rows).execute()
+
+    def flush(self, deadline: Optional[float] = None) -> int:
+        """
+        Kirim entry pending sampai habis / gagal / deadline (time.monotonic)
+
+        Returns:
+            jumlah rows yang terkirim
+        """
+        sent = 0
+        while deadline is None or time.monotonic() < deadline:
+            groups = self._next_batch()
+            if not groups:
+                break
+
+            for group in groups:
+                try:
+                    self._execute(group)
+                except Exception as e:
+                    self._record_failure(group, e)
+                    self.flushed += sent
+                    return sent
+
+                # Payload yang ditimpa selama request berjalan belum terkirim: entry tetap ada
+                with self._lock:
+                    self._conn.executemany("DELETE FROM outbox WHERE id = ? AND payload = ?",
+                                           [(entry[0], entry[5]) for entry in group['entries']])
+                sent += group['rows']
+                self._failures = 0
+
+        self.flushed += sent
+        return sent
+
+    def _record_failure(self, group: dict, error: Exception):
+        self._failures += 1
+        table, op, _ = group['key']
+        logger.warning(f"Outbox: {op} {table} ({group['rows']} rows) failed: {error}")
+
+        with self._lock:
+            for entry in group['entries']:
+                attempts = entry[7] + 1
+                status = 'dead' if attempts >= self.max_attempts else 'pending'
+                if status == 'dead':
+                    logger.error(f"Outbox: entry {entry[0]} ({op} {table}) dead after {attempts} attempts")
+                self._conn.execute(
+                    "UPDATE outbox SET attempts = ?, status = ?, last_error = ? WHERE id = ?",
+                    (attempts, status, str(error)[:500], entry[0])
+                )
+
+    # --- Background flusher ---
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Outbox flusher error: {e}", exc_info=True)
+            if self._failures:
+                # Backoff eksponensial selama database error
+                self._stop.wait(min(self.interval * 2 ** self._failures, 60))
+
+    def start(self) -> 'Outbox':
+        if self.client is None:
+            raise ValueError("Outbox.start() butuh client")
+        self._thread = threading.Thread(target=self._run, name="outbox-flusher", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 60.0) -> int:
+        """
+        Stop flusher lalu coba kirim sisa entry sampai timeout
+
+        Returns:
+            jumlah entry yang masih pending (tersimpan untuk run berikutnya)
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+        if self.client is not None:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline and self.pending():
+                self.flush(deadline)
+                if self._failures:
+                    time.sleep(min(self.interval * 2 ** self._failures, 60, max(deadline - time.monotonic(), 0)))
+
+        remaining = self.pending()
+        if remaining:
+            logger.warning(f"Outbox: {remaining} entries pending in {self.path}")
+        self._conn.close()
+        return remaining
@@ -0,0 +1,165 @@
+"""
+Panel data: symbols x bars x fields dalam 1 array float32
+
+Semua symbol di-align ke timestamp index yang sama. Bar yang tidak ada
+untuk suatu symbol ditandai di mask (dan bernilai NaN di values).
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _naive_timestamps(values) -> pd.DatetimeIndex:
+    ts = pd.DatetimeIndex(pd.to_datetime(values))
+    if ts.tz is not None:
+        ts = ts.tz_convert(None)
+    return ts
+
+
+class OHLCPanel:
+    """Aligned panel: values (symbols, bars, fields) + mask (symbols, bars)"""
+
+    BASE_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+    def __init__(
+        self,
+        symbols: List[str],
+        timestamps: pd.DatetimeIndex,
+        fields: List[str],
+        values: np.ndarray,
+        mask: np.ndarray
+    ):
+        self.symbols = list(symbols)
+        self.timestamps = pd.DatetimeIndex(timestamps)
+        self.fields = list(fields)
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.mask = np.asarray(mask, dtype=bool)
+
+        expected = (len(self.symbols), len(self.timestamps), len(self.fields))
+        if self.values.shape != expected:
+            raise ValueError(f"values shape {self.values.shape} != {expected}")
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Dict[str, pd.DataFrame],
+        fields: Optional[List[str]] = None
+    ) -> 'OHLCPanel':
+        """Build panel dari dict symbol -> DataFrame (kolom timestamp + fields)"""
+        fields = list(fields or cls.BASE_FIELDS)
+        symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+
+        parsed = {}
+        for symbol in symbols:
+            df = frames[symbol]
+            ts = _naive_timestamps(df['timestamp'])
+            cols = {}
+            for field in fields:
+                if field in df.columns:
+                    cols[field] = pd.to_numeric(df[field], errors='coerce').to_numpy(np.float32)
+                else:
+                    cols[field] = np.full(len(df), np.nan, dtype=np.float32)
+            parsed[symbol] = (ts, cols)
+
+        if parsed:
+            timestamps = parsed[symbols[0]][0]
+            for symbol in symbols[1:]:
+                timestamps = timestamps.union(parsed[symbol][0])
+            timestamps = timestamps.unique().sort_values()
+        else:
+            timestamps = pd.DatetimeIndex([])
+
+        values = np.full((len(symbols), len(timestamps), len(fields)), np.nan, dtype=np.float32)
+        mask = np.zeros((len(symbols), len(timestamps)), dtype=bool)
+
+        for i, symbol in enumerate(symbols):
+            ts, cols = parsed[symbol]
+            pos = timestamps.get_indexer(ts)
+            for j, field in enumerate(fields):
+                # Duplicate timestamp: baris terakhir yang menang
+                values[i, pos, j] = cols[field]
+            mask[i, pos] = True
+
+        return cls(symbols, timestamps, fields, values, mask)
+
+    # --- Access ---
+
+    def symbol_index(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def field(self, name: str) -> np.ndarray:
+        """View (symbols, bars) untuk 1 field"""
+        return self.values[:, :, self.fields.index(name)]
+
+    def add_fields(self, new_fields: Dict[str, np.ndarray]):
+        """Tambah / overwrite field; array baru di-alokasi sekali untuk semua field baru"""
+        added = [name for name in new_fields if name not in self.fields]
+
+        if added:
+            extra = np.full(self.values.shape[:2] + (len(added),), np.nan, dtype=np.float32)
+            self.values = np.ascontiguousarray(np.concatenate([self.values, extra], axis=2))
+            self.fields.extend(added)
+
+        for name, arr in new_fields.items():
+            self.values[:, :, self.fields.index(name)] = arr
+
+    def valid_mask(self, fields: Optional[List[str]] = None) -> np.ndarray:
+        """Bar yang ada dan semua field-nya tidak NaN"""
+        if not fields:
+            return self.mask
+        idx = [self.fields.index(f) for f in fields]
+        return self.mask & ~np.isnan(self.values[:, :, idx]).any(axis=2)
+
+    # --- Packing: bar valid per symbol dirapatkan ke kiri ---
+
+    @staticmethod
+    def pack(arr: np.ndarray, mask: np.ndarray):
+        """
+        Rapatkan bar valid per symbol ke kiri
+
+        Args:
+            arr: (symbols, bars) atau (symbols, bars, fields)
+            mask: (symbols, bars)
+
+        Returns:
+            (packed, counts) - packed (symbols, max_count, ...) dengan NaN di ekor
+        """
+        counts = mask.sum(axis=1)
+        width = int(counts.max()) if len(counts) else 0
+
+        order = np.argsort(~mask, axis=1, kind='stable')[:, :width]
+        if arr.ndim == 3:
+            packed = np.take_along_axis(arr, order[:, :, None], axis=1)
+        else:
+            packed = np.take_along_axis(arr, order, axis=1)
+
+        packed = packed.astype(np.float32, copy=True)
+        packed[np.arange(width)[None, :] >= counts[:, None]] = np.nan
+        return packed, counts
+
+    @staticmethod
+    def unpack(packed: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Kebalikan pack: scatter kembali ke posisi bar asli (NaN di bar kosong)"""
+        counts = mask.sum(axis=1)
+        out = np.full(mask.shape + packed.shape[2:], np.nan, dtype=np.float32)
+        filled = np.arange(packed.shape[1])[None, :] < counts[:, None]
+        out[mask] = packed[filled]
+        return out
+
+    # --- Export ---
+
+    def to_frame(self, symbol: str, fields: Optional[List[str]] = None) -> pd.DataFrame:
+        """DataFrame (timestamp + fields) untuk bar yang ada dari 1 symbol"""
+        i = self.symbol_index(symbol)
+        fields = fields or self.fields
+        rows = self.mask[i]
+
+        df = pd.DataFrame({'timestamp': self.timestamps[rows]})
+        for field in fields:
+            df[field] = self.values[i, rows, self.fields.index(field)]
+        return df
@@ -0,0 +1,256 @@
+"""
+Validasi kualitas ohlc_data per symbol (1 pass vectorized atas seluruh history)
+
+Issue per baris (mask, urutan baris input):
+
+    out_of_order  timestamp < baris sebelumnya
+    duplicate     timestamp sama dengan baris lain (baris terakhir dipertahankan)
+    off_grid      timestamp bukan awal jam
+    invalid       harga NaN / <= 0, high < max(open, close), low > min(open, close)
+    zero_volume   volume <= 0 (jam tanpa tick)
+    spike         close melompat > SPIKE_MULT x median |return| lalu balik
+                  arah di bar berikutnya (bad tick), atau wick > SPIKE_MULT x
+                  median range (median rolling QUALITY_WINDOW bar)
+
+Gap = jam buka (TradingCalendar) tanpa baris on-grid sama sekali, di
+antara bar pertama dan terakhir. Calendar hanya dicek untuk jam di dalam
+gap, bukan semua jam.
+
+Download ulang dari Dukascopy hasilnya sama untuk bar yang memang
+spike / volume 0 di sumber, dan jam yang tidak ada di sumber tetap
+hilang. RepairLog mencatat jam yang sudah pernah di-download ulang, jadi
+tiap jam hanya dicoba 1x; setelah itu issue-nya cukup dilaporkan.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import config
+from src.utils.profiling import track_allocations
+
+logger = logging.getLogger(__name__)
+
+HOUR_NS = 3_600 * 10**9
+
+ISSUES = ('out_of_order', 'duplicate', 'off_grid', 'invalid', 'zero_volume', 'spike')
+
+# Issue yang dibetulkan dengan download ulang jam-nya (upsert menimpa baris),
+# 1x per jam (RepairLog): bisa jadi file parsial saat sync, bisa juga memang begitu di sumber
+REDOWNLOAD_ISSUES = ('invalid', 'zero_volume', 'spike')
+# Issue yang dibetulkan dengan menghapus baris (butuh kolom id)
+DELETE_ISSUES = ('duplicate', 'off_grid')
+
+
+class QualityReport:
+    """Hasil validate_ohlc untuk 1 symbol"""
+
+    def __init__(self, symbol: str, timestamps: np.ndarray, issues: Dict[str, np.ndarray],
+                 missing: pd.DatetimeIndex, ids: Optional[np.ndarray] = None):
+        self.symbol = symbol
+        self.timestamps = timestamps
+        self.issues = issues
+        self.missing = missing
+        self.ids = ids
+
+    @property
+    def rows(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def ok(self) -> bool:
+        return len(self.missing) == 0 and not any(mask.any() for mask in self.issues.values())
+
+    def flagged(self, names=ISSUES) -> np.ndarray:
+        mask = np.zeros(self.rows, dtype=bool)
+        for name in names:
+            mask |= self.issues[name]
+        return mask
+
+    def delete_ids(self) -> list:
+        """id baris duplikat / off-grid (kosong kalau data tanpa kolom id)"""
+        if self.ids is None:
+            return []
+        return self.ids[self.flagged(DELETE_ISSUES)].astype(np.int64).tolist()
+
+    def repair_hours(self) -> pd.DatetimeIndex:
+        """Jam yang perlu di-download ulang: gap + bar rusak (off-grid dibulatkan ke jam)"""
+        bad = self.timestamps[self.flagged(REDOWNLOAD_ISSUES + ('off_grid',))]
+        hours = pd.DatetimeIndex(bad).floor('h')
+        return self.missing.union(hours)
+
+    def gaps(self) -> pd.DataFrame:
+        """Jam hilang digabung per run berurutan: start, end, hours"""
+        if len(self.missing) == 0:
+            return pd.DataFrame(columns=['start', 'end', 'hours'])
+        hours = self.missing.asi8 // HOUR_NS
+        run = np.r_[0, np.cumsum(np.diff(hours) != 1)]
+        starts = np.r_[0, np.flatnonzero(np.diff(run)) + 1]
+        ends = np.r_[starts[1:] - 1, len(hours) - 1]
+        return pd.DataFrame({
+            'start': self.missing[starts],
+            'end': self.missing[ends],
+            'hours': ends - starts + 1,
+        })
+
+    def summary(self, max_items: int = 20) -> dict:
+        """Ringkasan JSON-able: jumlah per issue, gap terbesar, contoh timestamp"""
+        gaps = self.gaps().sort_values('hours', ascending=False).head(max_items)
+        return {
+            'symbol': self.symbol,
+            'rows': self.rows,
+            'first': str(self.timestamps.min()) if self.rows else None,
+            'last': str(self.timestamps.max()) if self.rows else None,
+            'ok': self.ok,
+            'missing_hours': len(self.missing),
+            'issues': {name: int(mask.sum()) for name, mask in self.issues.items()},
+            'largest_gaps': [
+                {'start': str(g.start), 'end': str(g.end), 'hours': int(g.hours)} for g in gaps.itertuples()
+            ],
+            'examples': {
+                name: [str(ts) for ts in self.timestamps[mask][:max_items]]
+                for name, mask in self.issues.items() if mask.any()
+            },
+        }
+
+
+class RepairLog:
+    """Jam yang sudah pernah di-download ulang per symbol (JSON), dicoba 1x saja"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        # repaired: sumber mengembalikan data (di-upsert); unavailable: sumber tidak punya data
+        self.repaired = set()
+        self.unavailable = set()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.repaired = set(state.get('repaired', []))
+            self.unavailable = set(state.get('unavailable', []))
+
+    @classmethod
+    def for_symbol(cls, symbol: str, directory: str) -> 'RepairLog':
+        return cls(os.path.join(directory, f"{symbol}.json"))
+
+    def pending(self, hours: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        """Jam yang belum pernah dicoba"""
+        tried = self.repaired | self.unavailable
+        return hours[np.array([hour.isoformat() not in tried for hour in hours], dtype=bool)]
+
+    def record(self, repaired, unavailable=()):
+        self.repaired.update(hour.isoformat() for hour in repaired)
+        self.unavailable.update(hour.isoformat() for hour in unavailable)
+
+    def save(self):
+        if not self.path:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'repaired': sorted(self.repaired),
+                'unavailable': sorted(self.unavailable),
+                'updated_at': datetime.utcnow().isoformat(),
+            }, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def _rolling_median(values: np.ndarray, window: int) -> np.ndarray:
+    return pd.Series(values).rolling(window, min_periods=min(window, 50), center=True).median().to_numpy()
+
+
+@track_allocations()
+def validate_ohlc(
+    data,
+    symbol: str,
+    calendar=None,
+    spike_mult: Optional[float] = None,
+    window: Optional[int] = None
+) -> QualityReport:
+    """
+    Validasi semua baris 1 symbol
+
+    Args:
+        data: DataFrame atau dict kolom -> array (SupabaseClient.fetch_ohlc),
+            kolom timestamp, open, high, low, close (+ volume, id opsional)
+        calendar: TradingCalendar; None = semua jam di dalam gap dianggap hilang
+    """
+    spike_mult = spike_mult or config.QUALITY_SPIKE_MULT
+    window = window or config.QUALITY_WINDOW
+
+    columns = data if isinstance(data, dict) else {c: data[c].to_numpy() for c in data.columns}
+    ts = pd.DatetimeIndex(pd.to_datetime(columns['timestamp']))
+    if ts.tz is not None:
+        ts = ts.tz_convert(None)
+    ts = ts.to_numpy('datetime64[ns]')
+    t = ts.view(np.int64)
+    n = len(t)
+    o, h, l, c = (np.asarray(columns[k], dtype=np.float64) for k in ('open', 'high', 'low', 'close'))
+
+    issues = {}
+    issues['out_of_order'] = np.r_[False, t[1:] < t[:-1]] if n else np.zeros(0, dtype=bool)
+
+    # Duplikat: setelah stable sort, semua kecuali baris terakhir per timestamp
+    order = np.argsort(t, kind='stable')
+    ts_sorted = t[order]
+    duplicate = np.zeros(n, dtype=bool)
+    duplicate[order] = np.r_[ts_sorted[:-1] == ts_sorted[1:], False] if n else []
+    issues['duplicate'] = duplicate
+
+    issues['off_grid'] = t % HOUR_NS != 0
+
+    with np.errstate(invalid='ignore'):
+        prices = np.stack([o, h, l, c])
+        issues['invalid'] = (
+            ~np.isfinite(prices).all(axis=0) | (prices <= 0).any(axis=0)
+            | (h < np.maximum(o, c)) | (l > np.minimum(o, c))
+        )
+
+    if 'volume' in columns:
+        volume = np.asarray(columns['volume'], dtype=np.float64)
+        issues['zero_volume'] = ~(volume > 0)
+    else:
+        issues['zero_volume'] = np.zeros(n, dtype=bool)
+
+    # Spike dihitung di bar bersih, urut waktu
+    clean = order[~(duplicate | issues['off_grid'] | issues['invalid'])[order]]
+    spike = np.zeros(n, dtype=bool)
+    if len(clean) > 2:
+        cc, oc, hc, lc = c[clean], o[clean], h[clean], l[clean]
+        r = np.diff(np.log(cc))
+        scale = _rolling_median(np.abs(r), window) * spike_mult
+        jump = np.abs(r) > scale
+        # Bar t: return masuk (r[t-1]) dan keluar (r[t]) sama-sama besar, arah berlawanan
+        close_spike = np.r_[False, jump[:-1] & jump[1:] & (np.sign(r[:-1]) != np.sign(r[1:])), False]
+
+        wick = np.maximum(hc - np.maximum(oc, cc), np.minimum(oc, cc) - lc)
+        wick_spike = wick > _rolling_median(hc - lc, window) * spike_mult
+        spike[clean] = close_spike | wick_spike
+    issues['spike'] = spike
+
+    missing = pd.DatetimeIndex([])
+    hours = np.unique(t[~issues['off_grid']] // HOUR_NS)
+    if len(hours) > 1:
+        step = np.diff(hours)
+        gap = np.flatnonzero(step > 1)
+        # Expand setiap gap (h, h + step) ke jam-jam di dalamnya tanpa loop per gap
+        counts = step[gap] - 1
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = np.repeat(hours[gap], counts) + 1 + offsets
+        missing = pd.DatetimeIndex(candidates * HOUR_NS)
+        if calendar is not None:
+            missing = missing[np.fromiter((calendar.is_open(dt) for dt in missing.to_pydatetime()),
+                                          dtype=bool, count=len(missing))]
+
+    ids = np.asarray(columns['id']) if 'id' in columns else None
+    return QualityReport(symbol, ts, issues, missing, ids)
@@ -0,0 +1,143 @@
+"""
+Realtime: candle H1 parsial dari file tick jam berjalan
+
+Dukascopy menulis tick jam berjalan ke file .bi5 yang sama dan terus
+bertambah. Poller me-request ulang file itu secara kondisional (ETag /
+Last-Modified, 304 = tidak ada tick baru). File LZMA harus di-decompress
+utuh, tapi yang di-parse dan di-aggregate hanya tick setelah offset
+terakhir, jadi update candle O(tick baru).
+
+Saat jam berganti, file jam sebelumnya di-request sekali lagi (tanpa
+header kondisional) sebelum candle-nya diserahkan sebagai `closed`, jadi
+tick antara poll terakhir dan akhir jam ikut masuk.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import requests
+
+from src.data.dukascopy_downloader import DukascopyH1Downloader, mid_prices, parse_ticks, tick_volume
+
+logger = logging.getLogger(__name__)
+
+
+class PartialCandle:
+    """OHLC 1 jam yang di-update incremental dari tick baru"""
+
+    def __init__(self, hour_start: datetime):
+        self.hour_start = hour_start
+        self.n_ticks = 0
+        self.open = self.high = self.low = self.close = None
+        self.volume = 0
+        self.last_tick_ms = None
+
+    def update(self, ticks: np.ndarray, price_divisor: int):
+        """Tambahkan tick baru (sudah urut waktu, setelah n_ticks)"""
+        if len(ticks) == 0:
+            return
+        mid = mid_prices(ticks, price_divisor)
+        if self.open is None:
+            self.open = float(mid[0])
+            self.high = float(mid.max())
+            self.low = float(mid.min())
+        else:
+            self.high = max(self.high, float(mid.max()))
+            self.low = min(self.low, float(mid.min()))
+        self.close = float(mid[-1])
+        self.volume += tick_volume(ticks)
+        self.n_ticks += len(ticks)
+        self.last_tick_ms = int(ticks['time'][-1])
+
+    @property
+    def empty(self) -> bool:
+        return self.open is None
+
+    @property
+    def last_tick_at(self) -> Optional[datetime]:
+        if self.last_tick_ms is None:
+            return None
+        return self.hour_start + timedelta(milliseconds=self.last_tick_ms)
+
+    def to_row(self) -> dict:
+        """Baris OHLC (format sama dengan DukascopyH1Downloader)"""
+        return {
+            'timestamp': self.hour_start,
+            'open': round(self.open, 5),
+            'high': round(self.high, 5),
+            'low': round(self.low, 5),
+            'close': round(self.close, 5),
+            'volume': self.volume,
+        }
+
+
+class PartialCandlePoller:
+    """Poll file tick jam berjalan 1 symbol"""
+
+    def __init__(self, symbol: str, session: Optional[requests.Session] = None, base_url: Optional[str] = None):
+        self.downloader = DukascopyH1Downloader(symbol, base_url=base_url)
+        self.symbol = symbol
+        self.session = session or requests.Session()
+        self.candle = None
+        self.closed = None  # candle jam sebelumnya (sudah final)
+        self._validators = {}
+
+    def _reset(self, hour_start: datetime):
+        if self.candle is not None:
+            # Poll terakhir bisa sampai `interval` detik sebelum akhir jam: ambil file final
+            self._fetch(self.candle, conditional=False)
+            if not self.candle.empty:
+                logger.info(f"{self.symbol}: Candle {self.candle.hour_start} closed ({self.candle.n_ticks} ticks)")
+                self.closed = self.candle
+        self.candle = PartialCandle(hour_start)
+        self._validators = {}
+
+    def poll(self, now: Optional[datetime] = None) -> bool:
+        """
+        Update candle jam berjalan
+
+        Returns:
+            True kalau ada tick baru
+        """
+        now = now or datetime.utcnow()
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        if self.candle is None or self.candle.hour_start != hour_start:
+            self._reset(hour_start)
+
+        return self._fetch(self.candle)
+
+    def _fetch(self, candle: PartialCandle, conditional: bool = True) -> bool:
+        """Request file tick jam candle, tambahkan tick setelah candle.n_ticks"""
+        headers = {}
+        if conditional and 'etag' in self._validators:
+            headers['If-None-Match'] = self._validators['etag']
+        if conditional and 'last_modified' in self._validators:
+            headers['If-Modified-Since'] = self._validators['last_modified']
+
+        try:
+            response = self.session.get(self.downloader._get_bi5_url(candle.hour_start), headers=headers, timeout=10)
+        except requests.RequestException as e:
+            logger.warning(f"{self.symbol}: Poll failed: {e}")
+            return False
+
+        # 304 = file tidak berubah, 404 / kosong = belum ada tick jam ini
+        if response.status_code != 200 or not response.content:
+            return False
+
+        if response.headers.get('ETag'):
+            self._validators['etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            self._validators['last_modified'] = response.headers['Last-Modified']
+
+        data = self.downloader._decompress_bi5(response.content)
+        if not data:
+            return False
+
+        ticks = parse_ticks(data, start=candle.n_ticks)
+        if len(ticks) == 0:
+            return False
+
+        candle.update(ticks, self.downloader.price_divisor)
+        return True
@@ -0,0 +1,339 @@
+"""
+Replay tick Dukascopy dari file .bi5 lokal
+
+    {root}/{SYMBOL}/{YYYY}/{MM-1}/{DD}/{HH}h_ticks.bi5   (layout sama dengan URL Dukascopy)
+
+TickReplayServer melayani path yang sama dengan BASE_URL Dukascopy lewat
+HTTP lokal. Waktu mengikuti ReplayClock (real time atau dipercepat):
+file jam yang sudah lewat dikirim utuh, file jam berjalan hanya berisi
+tick sampai waktu simulasi sekarang (ETag = jumlah tick, 304 kalau sama),
+jam yang belum mulai 404. MemoryStore menggantikan Supabase (ohlc_data +
+predictions) supaya fungsi run_* script produksi bisa dijalankan tanpa
+service live.
+"""
+
+import lzma
+import os
+import re
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.dukascopy_downloader import TICK_DTYPE, DukascopyH1Downloader, parse_ticks
+
+logger = logging.getLogger(__name__)
+
+_PATH = re.compile(r'^/(\w+)/(\d{4})/(\d{2})/(\d{2})/(\d{2})h_ticks\.bi5$')
+
+
+def hour_path(root: str, symbol: str, hour_start: datetime) -> str:
+    """Path file .bi5 lokal untuk 1 jam"""
+    return os.path.join(root, symbol, f"{hour_start.year}", f"{hour_start.month - 1:02d}",
+                        f"{hour_start.day:02d}", f"{hour_start.hour:02d}h_ticks.bi5")
+
+
+def recorded_hours(root: str, symbol: str) -> List[datetime]:
+    """Semua jam yang ada filenya, urut"""
+    hours = []
+    base = os.path.join(root, symbol)
+    for dirpath, _, filenames in os.walk(base):
+        parts = os.path.relpath(dirpath, base).split(os.sep)
+        if len(parts) != 3:
+            continue
+        year, month, day = (int(p) for p in parts)
+        for name in filenames:
+            if name.endswith('h_ticks.bi5'):
+                hours.append(datetime(year, month + 1, day, int(name[:2])))
+    return sorted(hours)
+
+
+def read_ticks(path: str) -> np.ndarray:
+    """Tick records file .bi5 lokal (kosong kalau file kosong / corrupt)"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    if not content:
+        return np.zeros(0, dtype=TICK_DTYPE)
+    try:
+        return parse_ticks(lzma.decompress(content))
+    except lzma.LZMAError:
+        logger.warning(f"Corrupt replay file: {path}")
+        return np.zeros(0, dtype=TICK_DTYPE)
+
+
+def record_hours(root: str, symbol: str, hours: List[datetime], base_url: Optional[str] = None) -> int:
+    """Download file .bi5 mentah ke root (untuk direplay); returns jumlah file"""
+    import requests
+
+    downloader = DukascopyH1Downloader(symbol, base_url=base_url)
+    saved = 0
+    for hour_start in hours:
+        path = hour_path(root, symbol, hour_start)
+        if os.path.exists(path):
+            continue
+        try:
+            response = requests.get(downloader._get_bi5_url(hour_start), timeout=30)
+        except Exception as e:
+            logger.error(f"{symbol}: Error downloading {hour_start}: {e}")
+            continue
+        if response.status_code != 200 or not response.content:
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        saved += 1
+    return saved
+
+
+class ReplayClock:
+    """Waktu simulasi = start + (wall time sejak mulai) * speed"""
+
+    def __init__(self, start: datetime, speed: float = 1.0):
+        self.start = start
+        self.speed = speed
+        self._t0 = time.monotonic()
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=(time.monotonic() - self._t0) * self.speed)
+
+    def sleep_until(self, sim_time: datetime):
+        wait = (sim_time - self.now()).total_seconds() / self.speed
+        if wait > 0:
+            time.sleep(wait)
+
+
+class TickReplayServer:
+    """HTTP server lokal yang kompatibel dengan DukascopyH1Downloader.BASE_URL"""
+
+    def __init__(self, root: str, clock: ReplayClock, host: str = '127.0.0.1', port: int = 0):
+        self.root = root
+        self.clock = clock
+        self._ticks = {}
+        self._bodies = {}
+        self.requests = 0
+        self.not_modified = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                status, body, etag = server.respond(self.path)
+                if status == 200 and etag and self.headers.get('If-None-Match') == etag:
+                    server.not_modified += 1
+                    status, body = 304, b''
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _load(self, path: str) -> np.ndarray:
+        if path not in self._ticks:
+            self._ticks[path] = read_ticks(path)
+        return self._ticks[path]
+
+    def respond(self, url_path: str):
+        """(status, body, etag) untuk 1 request"""
+        match = _PATH.match(url_path)
+        if not match:
+            return 404, b'', None
+        symbol, year, month, day, hour = match.groups()
+        hour_start = datetime(int(year), int(month) + 1, int(day), int(hour))
+        path = hour_path(self.root, symbol, hour_start)
+
+        elapsed = self.clock.now() - hour_start
+        if elapsed < timedelta(0) or not os.path.exists(path):
+            return 404, b'', None
+
+        ticks = self._load(path)
+        if elapsed >= timedelta(hours=1):
+            n = len(ticks)
+        else:
+            n = int(np.searchsorted(ticks['time'], elapsed.total_seconds() * 1000, side='right'))
+        if n == 0:
+            return 404, b'', None
+
+        key = (path, n)
+        if key not in self._bodies:
+            if n == len(ticks):
+                with open(path, 'rb') as f:
+                    self._bodies[key] = f.read()
+            else:
+                self._bodies[key] = lzma.compress(ticks[:n].tobytes(), format=lzma.FORMAT_ALONE)
+        return 200, self._bodies[key], f'"{n}"'
+
+    def last_tick_at(self, symbol: str, hour_start: datetime) -> Optional[datetime]:
+        """Waktu tick terakhir jam itu (waktu simulasi)"""
+        path = hour_path(self.root, symbol, hour_start)
+        if not os.path.exists(path):
+            return None
+        ticks = self._load(path)
+        if len(ticks) == 0:
+            return None
+        return hour_start + timedelta(milliseconds=int(ticks['time'][-1]))
+
+    def start(self) -> 'TickReplayServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Replay server: {self.base_url} ({self.root}, speed {self.clock.speed}x)")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Insert:
+    def __init__(self, store: 'MemoryStore', table: str, rows, on_conflict: Optional[str] = None):
+        self.store, self.table, self.rows, self.on_conflict = store, table, rows, on_conflict
+
+    def execute(self):
+        rows = self.rows if isinstance(self.rows, list) else [self.rows]
+        inserted_at = time.perf_counter()
+        table = self.store.tables.setdefault(self.table, [])
+        if self.on_conflict:
+            # ON CONFLICT DO NOTHING seperti insert idempotent Supabase
+            keys = self.on_conflict.split(',')
+            seen = {tuple(row.get(k) for k in keys) for row in table}
+            unique = []
+            for row in rows:
+                key = tuple(row.get(k) for k in keys)
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(row)
+            rows = unique
+        table.extend(dict(row, _inserted_at=inserted_at) for row in rows)
+        return self
+
+
+class _Table:
+    def __init__(self, store: 'MemoryStore', name: str):
+        self.store, self.name = store, name
+
+    def insert(self, rows):
+        return _Insert(self.store, self.name, rows)
+
+    def upsert(self, rows, on_conflict: str, ignore_duplicates: bool = False):
+        if not ignore_duplicates:
+            raise NotImplementedError("MemoryStore only supports upsert(ignore_duplicates=True)")
+        return _Insert(self.store, self.name, rows, on_conflict)
+
+
+class MemoryStore:
+    """
+    Pengganti SupabaseClient untuk replay: interface yang dipakai
+    run_sync / run_indicators / run_predictions. ohlc_data per symbol di
+    memory (id, OHLC + kolom indicator dari update_rows), insert tabel
+    lain (predictions) dicatat beserta waktu insert
+    """
+
+    OHLC_COLS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self):
+        self.ohlc: Dict[str, pd.DataFrame] = {}
+        self.tables: Dict[str, list] = {}
+        self.client = self
+        self._next_id = 1
+        self._id_symbol: Dict[int, str] = {}
+
+    def table(self, name: str) -> _Table:
+        return _Table(self, name)
+
+    def insert_rows(self, table: str, rows, on_conflict: Optional[str] = None,
+                    expires_at: Optional[float] = None) -> int:
+        _Insert(self, table, rows, on_conflict).execute()
+        return len(rows) if isinstance(rows, list) else 1
+
+    def update_rows(self, table: str, values: dict, match: dict) -> int:
+        if table != 'ohlc_data' or set(match) != {'id'}:
+            raise NotImplementedError("MemoryStore only supports ohlc_data updates by id")
+        symbol = self._id_symbol[match['id']]
+        df = self.ohlc[symbol]
+        rows = df['id'].to_numpy() == match['id']
+        for column, value in values.items():
+            if column not in df.columns:
+                df[column] = np.nan
+            df.loc[rows, column] = np.nan if value is None else value
+        return 1
+
+    def upload_ohlc(self, df: pd.DataFrame, symbol: str, timeframe: str = 'H1') -> int:
+        """Upsert (symbol, timestamp): baris yang sudah ada tetap id-nya, kolom OHLC ditimpa"""
+        if df.empty:
+            return 0
+        rows = df[self.OHLC_COLS].copy()
+        rows['timestamp'] = pd.to_datetime(rows['timestamp'])
+        rows = rows.drop_duplicates('timestamp', keep='last')
+
+        existing = self.ohlc.get(symbol)
+        if existing is None:
+            existing = pd.DataFrame({'id': np.zeros(0, dtype=np.int64), **{c: rows[c].iloc[:0] for c in self.OHLC_COLS}})
+        merged = existing.merge(rows, on='timestamp', how='outer', suffixes=('', '_new'), sort=True)
+        for column in self.OHLC_COLS[1:]:
+            merged[column] = merged[f"{column}_new"].where(merged[f"{column}_new"].notna(), merged[column])
+        merged = merged.drop(columns=[f"{c}_new" for c in self.OHLC_COLS[1:]])
+
+        new = merged['id'].isna().to_numpy()
+        ids = np.arange(self._next_id, self._next_id + int(new.sum()))
+        self._next_id += len(ids)
+        merged.loc[new, 'id'] = ids
+        merged['id'] = merged['id'].astype(np.int64)
+        self._id_symbol.update({int(i): symbol for i in ids})
+
+        self.ohlc[symbol] = merged.reset_index(drop=True)
+        return len(rows)
+
+    def get_latest_timestamp(self, symbol: str, timeframe: str = 'H1') -> Optional[pd.Timestamp]:
+        df = self.ohlc.get(symbol)
+        return None if df is None or df.empty else df['timestamp'].iloc[-1]
+
+    def get_timestamps(self, symbol: str, start, end, timeframe: str = 'H1') -> list:
+        df = self.ohlc.get(symbol)
+        if df is None:
+            return []
+        ts = df['timestamp']
+        return [t.strftime('%Y-%m-%d %H:%M:%S') for t in ts[(ts >= start) & (ts <= end)]]
+
+    def get_ohlc(self, symbol: str, timeframe: str = 'H1', columns=None, tail=None) -> pd.DataFrame:
+        df = self.ohlc.get(symbol, pd.DataFrame())
+        if columns is not None and not df.empty:
+            df = df.reindex(columns=list(columns))
+        return (df.tail(tail) if tail is not None else df).reset_index(drop=True)
+
+    def get_ohlc_frames(self, symbols, timeframe: str = 'H1', columns=None, tail=None) -> dict:
+        return {s: self.get_ohlc(s, timeframe, columns, tail) for s in symbols if s in self.ohlc}
+
+    def seed(self, root: str, symbols, before: datetime) -> int:
+        """Isi ohlc_data dari file replay sebelum `before` (history untuk indicator)"""
+        total = 0
+        for symbol in symbols:
+            downloader = DukascopyH1Downloader(symbol)
+            rows = []
+            for hour_start in recorded_hours(root, symbol):
+                if hour_start >= before:
+                    break
+                ticks = read_ticks(hour_path(root, symbol, hour_start))
+                ohlc = downloader._parse_ticks_to_ohlc(ticks.tobytes(), hour_start)
+                if ohlc:
+                    rows.append(ohlc)
+            if rows:
+                total += self.upload_ohlc(pd.DataFrame(rows), symbol)
+        return total
@@ -3,15 +3,42 @@ Supabase client
 """
 
 from supabase import create_client, Client
+import numpy as np
 import pandas as pd
 import os
 from dotenv import load_dotenv
 import logging
 from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+from src.data.outbox import Outbox
+from src.utils.config import config
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Kolom yang cukup untuk panel / features (indicators dihitung ulang dari OHLC)
+OHLC_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+# dtype per kolom ohlc_data; kolom lain (harga, indicators) float32, NULL -> NaN
+COLUMN_DTYPES = {'id': np.int64, 'volume': np.int64, 'timestamp': 'datetime64[ns]'}
+
+
+def decode_columns(rows: list, columns: Sequence[str]) -> Dict[str, np.ndarray]:
+    """JSON rows -> dict kolom -> array typed (timestamp naive UTC)"""
+    arrays = {}
+    for col in columns:
+        dtype = COLUMN_DTYPES.get(col, np.float32)
+        values = [row[col] for row in rows]
+        if col == 'timestamp':
+            ts = pd.to_datetime(values, utc=True, format='ISO8601')
+            arrays[col] = ts.tz_convert(None).to_numpy(dtype)
+        elif dtype is np.int64 and None in values:
+            arrays[col] = np.array(values, dtype=np.float64)
+        else:
+            arrays[col] = np.array(values, dtype=dtype)
+    return arrays
+
 
 class SupabaseClient:
     
@@ -23,23 +50,179 @@ class SupabaseClient:
             raise ValueError("SUPABASE_URL dan SUPABASE_SERVICE_KEY required")
         
         self.client: Client = create_client(url, key)
+        # Kalau ada: write lewat outbox lokal, tidak menunggu database
+        self.outbox: Optional[Outbox] = None
     
-    def get_latest_timestamp(self, symbol: str, timeframe: str = 'H1'):
-        try:
-            response = self.client.table("ohlc_data").select("timestamp").eq(
+    def start_outbox(self, path: Optional[str] = None) -> Outbox:
+        """Aktifkan outbox + background flusher untuk semua write"""
+        self.outbox = Outbox(
+            path or config.OUTBOX_PATH,
+            self.client,
+            batch_size=config.OUTBOX_BATCH_SIZE,
+            max_attempts=config.OUTBOX_MAX_ATTEMPTS
+        ).start()
+        pending = self.outbox.pending()
+        if pending:
+            logger.info(f"Outbox: {pending} entries from previous run")
+        return self.outbox
+    
+    def close(self, timeout: Optional[float] = None) -> int:
+        """Flush sisa outbox (sampai timeout); returns entry yang masih pending"""
+        if self.outbox is None:
+            return 0
+        remaining = self.outbox.close(config.OUTBOX_DRAIN_SECONDS if timeout is None else timeout)
+        self.outbox = None
+        return remaining
+    
+    def insert_rows(self, table: str, rows, on_conflict: Optional[str] = None,
+                    expires_at: Optional[float] = None) -> int:
+        """
+        Insert rows; dengan on_conflict row yang key-nya sudah ada di-skip
+        (idempotent). expires_at: entry outbox dibuang kalau belum terkirim
+        """
+        if self.outbox is not None:
+            return self.outbox.insert(table, rows, on_conflict=on_conflict, expires_at=expires_at)
+        if on_conflict:
+            self.client.table(table).upsert(rows, on_conflict=on_conflict, ignore_duplicates=True).execute()
+        else:
+            self.client.table(table).insert(rows).execute()
+        return len(rows) if isinstance(rows, list) else 1
+    
+    def update_rows(self, table: str, values: dict, match: dict) -> int:
+        if self.outbox is not None:
+            return self.outbox.update(table, values, match)
+        query = self.client.table(table).update(values)
+        for column, value in match.items():
+            query = query.eq(column, value)
+        query.execute()
+        return 1
+    
+    def delete_ids(self, table: str, ids: list, chunk_size: int = 500) -> int:
+        """Hapus baris by id (langsung, tidak lewat outbox)"""
+        for start in range(0, len(ids), chunk_size):
+            self.client.table(table).delete().in_("id", ids[start:start + chunk_size]).execute()
+        return len(ids)
+    
+    def get_latest_timestamp(self, symbol: str, timeframe: str = 'H1') -> Optional[pd.Timestamp]:
+        """Timestamp bar terakhir (naive UTC), None kalau belum ada data; error database di-raise"""
+        response = self.client.table("ohlc_data").select("timestamp").eq(
+            "symbol", symbol
+        ).eq(
+            "timeframe", timeframe
+        ).order("timestamp", desc=True).limit(1).execute()
+        
+        if not response.data:
+            return None
+        ts = pd.to_datetime(response.data[0]['timestamp'])
+        if ts.tz is not None:
+            ts = ts.tz_localize(None)
+        return ts
+    
+    def fetch_ohlc(
+        self,
+        symbol: str,
+        columns: Sequence[str] = OHLC_COLUMNS,
+        timeframe: str = 'H1',
+        limit: Optional[int] = None,
+        tail: Optional[int] = None,
+        page_size: int = 1000
+    ) -> Dict[str, np.ndarray]:
+        """
+        Kolom ohlc_data sebagai array typed, urut timestamp
+
+        Hanya `columns` yang di-select; limit = N baris pertama, tail = N
+        baris terakhir (untuk prediksi: cukup history warmup, bukan semua).
+        Di-paginate per page_size (max-rows PostgREST).
+        """
+        columns = list(columns)
+        wanted = tail if tail is not None else limit
+        rows = []
+        offset = 0
+        
+        while wanted is None or len(rows) < wanted:
+            size = page_size if wanted is None else min(page_size, wanted - len(rows))
+            response = self.client.table("ohlc_data").select(",".join(columns)).eq(
                 "symbol", symbol
             ).eq(
                 "timeframe", timeframe
-            ).order("timestamp", desc=True).limit(1).execute()
+            ).order("timestamp", desc=tail is not None).range(offset, offset + size - 1).execute()
             
-            if response.data:
-                # FIX: Convert to timezone-naive datetime
-                ts = pd.to_datetime(response.data[0]['timestamp'])
-                # Remove timezone info to make it naive
-                if ts.tz is not None:
-                    ts = ts.tz_localize(None)
-                return ts
-            return None
+            rows.extend(response.data)
+            if len(response.data) < size:
+                break
+            offset += size
+        
+        if tail is not None:
+            rows.reverse()
+        return decode_columns(rows, columns)
+    
+    def get_ohlc(
+        self,
+        symbol: str,
+        timeframe: str = 'H1',
+        columns: Optional[Sequence[str]] = None,
+        tail: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Rows ohlc_data untuk 1 symbol (urut timestamp); default semua kolom + semua baris"""
+        if columns is None:
+            response = self.client.table("ohlc_data").select("*").eq(
+                "symbol", symbol
+            ).eq(
+                "timeframe", timeframe
+            ).order("timestamp").execute()
+            
+            return pd.DataFrame(response.data)
+        
+        return pd.DataFrame(self.fetch_ohlc(symbol, columns, timeframe, tail=tail))
+    
+    def get_ohlc_frames(
+        self,
+        symbols,
+        timeframe: str = 'H1',
+        columns: Optional[Sequence[str]] = None,
+        tail: Optional[int] = None
+    ) -> dict:
+        """dict symbol -> DataFrame, symbol tanpa data di-skip"""
+        frames = {}
+        for symbol in symbols:
+            try:
+                df = self.get_ohlc(symbol, timeframe, columns=columns, tail=tail)
+            except Exception as e:
+                logger.error(f"Error loading {symbol}: {e}")
+                continue
+            
+            if df.empty:
+                logger.warning(f"No data for {symbol}")
+                continue
+            
+            logger.info(f"{symbol}: Loaded {len(df)} rows")
+            frames[symbol] = df
+        return frames
+    
+    def get_timestamps(self, symbol: str, start, end, timeframe: str = 'H1', page_size: int = 1000):
+        """Timestamps yang sudah ada dalam range (cukup dari index, tanpa kolom lain)"""
+        timestamps = []
+        offset = 0
+        
+        try:
+            while True:
+                response = self.client.table("ohlc_data").select("timestamp").eq(
+                    "symbol", symbol
+                ).eq(
+                    "timeframe", timeframe
+                ).gte(
+                    "timestamp", start.strftime('%Y-%m-%d %H:%M:%S')
+                ).lte(
+                    "timestamp", end.strftime('%Y-%m-%d %H:%M:%S')
+                ).order("timestamp").range(offset, offset + page_size - 1).execute()
+                
+                timestamps.extend(row['timestamp'] for row in response.data)
+                
+                if len(response.data) < page_size:
+                    break
+                offset += page_size
+            
+            return timestamps
         except Exception as e:
             logger.error(f"Error: {e}")
             return None
@@ -60,6 +243,9 @@ class SupabaseClient:
         
         records = df.to_dict('records')
         
+        if self.outbox is not None:
+            return self.outbox.upsert("ohlc_data", records, on_conflict='symbol,timeframe,timestamp')
+        
         try:
             self.client.table("ohlc_data").upsert(
                 records,
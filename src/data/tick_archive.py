@@ -0,0 +1,236 @@
+"""
+Arsip tick lokal (columnar, terkompresi) supaya tick tidak perlu di-download ulang
+
+    {root}/{SYMBOL}/{YYYY}-{MM}.ticks   chunk per jam, append-only
+    {root}/{SYMBOL}/{YYYY}-{MM}.idx     index record fixed-size per chunk
+
+Chunk 1 jam = 5 kolom int32 little-endian, byte-shuffled lalu zlib:
+
+    time     delta ms dari tick sebelumnya (tick pertama: dari awal jam)
+    ask      delta dari ask sebelumnya (tick pertama: nilai penuh), point
+    spread   ask - bid, point
+    ask_vol, bid_vol
+
+Delta + byte-shuffle membuat byte tinggi hampir selalu 0, jadi zlib
+mengompres jauh lebih baik daripada 20 byte/tick mentah (.bi5 setelah
+LZMA-decompress). Chunk ditulis dulu, baru index record-nya; jam yang
+ditulis ulang di-append dan record terakhir yang dipakai. 1 writer per
+file (sync / 1 unit backfill per symbol x bulan).
+
+scan() membaca semua chunk dalam range (index -> searchsorted, baca per
+file) ke array yang di-alokasi sekali dari jumlah tick di index.
+"""
+
+import os
+import zlib
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+HOUR_MS = 3_600_000
+
+COLUMNS = ('timestamp', 'ask', 'bid', 'ask_vol', 'bid_vol')
+
+INDEX_DTYPE = np.dtype([
+    ('hour', '<i8'), ('offset', '<i8'), ('nbytes', '<i4'), ('count', '<i4'), ('crc', '<u4'), ('pad', '<u4')
+])
+
+_FIELDS = 5
+
+
+def encode_chunk(ticks: np.ndarray, level: int = 6) -> bytes:
+    """Tick records (TICK_DTYPE) 1 jam -> chunk terkompresi"""
+    time_ms = ticks['time'].astype(np.int64)
+    ask = ticks['ask'].astype(np.int64)
+    columns = np.stack([
+        np.diff(time_ms, prepend=0),
+        np.diff(ask, prepend=0),
+        ask - ticks['bid'],
+        ticks['ask_vol'],
+        ticks['bid_vol'],
+    ]).astype('<i4')
+    # Byte-shuffle: (kolom, tick, byte) -> (kolom, byte, tick)
+    shuffled = columns.view(np.uint8).reshape(_FIELDS, len(ticks), 4).transpose(0, 2, 1)
+    return zlib.compress(np.ascontiguousarray(shuffled).tobytes(), level)
+
+
+def decode_chunk(chunk: bytes, count: int) -> np.ndarray:
+    """Chunk -> (5, count) int64: time ms dari awal jam, ask, bid, ask_vol, bid_vol"""
+    raw = np.frombuffer(zlib.decompress(chunk), dtype=np.uint8).reshape(_FIELDS, 4, count)
+    columns = np.ascontiguousarray(raw.transpose(0, 2, 1)).view('<i4').reshape(_FIELDS, count)
+    out = np.empty((_FIELDS, count), dtype=np.int64)
+    np.cumsum(columns[0], out=out[0])
+    np.cumsum(columns[1], out=out[1])
+    out[2] = out[1] - columns[2]
+    out[3:] = columns[3:]
+    return out
+
+
+def _epoch_hour(dt: datetime) -> int:
+    return int(pd.Timestamp(dt).floor('h').value // (HOUR_MS * 1_000_000))
+
+
+class TickArchive:
+    """Arsip tick per symbol x jam dengan range scan ke numpy"""
+
+    def __init__(self, root: str, level: int = 6):
+        self.root = root
+        self.level = level
+        self._index = {}
+
+    def _paths(self, symbol: str, hour_start: datetime):
+        base = os.path.join(self.root, symbol, f"{hour_start:%Y-%m}")
+        return f"{base}.ticks", f"{base}.idx"
+
+    # --- Write ---
+
+    def write_hour(self, symbol: str, hour_start: datetime, ticks: np.ndarray) -> int:
+        """Simpan tick 1 jam (menggantikan versi sebelumnya); returns bytes chunk"""
+        if len(ticks) == 0:
+            return 0
+        return self.write_chunk(symbol, hour_start, encode_chunk(ticks, self.level), len(ticks))
+
+    def write_chunk(self, symbol: str, hour_start: datetime, chunk: bytes, count: int) -> int:
+        """Simpan chunk yang sudah di-encode (mis. di worker process)"""
+        data_path, index_path = self._paths(symbol, hour_start)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+        with open(data_path, 'ab') as f:
+            offset = f.tell()
+            f.write(chunk)
+        record = np.array([(_epoch_hour(hour_start), offset, len(chunk), count, zlib.crc32(chunk), 0)],
+                          dtype=INDEX_DTYPE)
+        with open(index_path, 'ab') as f:
+            f.write(record.tobytes())
+
+        self._index.pop(symbol, None)
+        return len(chunk)
+
+    # --- Index ---
+
+    def index(self, symbol: str) -> Dict[str, np.ndarray]:
+        """Index semua file symbol: 1 record per jam (versi terakhir), urut jam"""
+        if symbol in self._index:
+            return self._index[symbol]
+
+        base = os.path.join(self.root, symbol)
+        names = sorted(n[:-4] for n in os.listdir(base) if n.endswith('.idx')) if os.path.isdir(base) else []
+        records, files = [], []
+        for i, name in enumerate(names):
+            with open(os.path.join(base, f"{name}.idx"), 'rb') as f:
+                content = f.read()
+            # Record terakhir yang terpotong (crash saat write) diabaikan
+            rec = np.frombuffer(content, dtype=INDEX_DTYPE, count=len(content) // INDEX_DTYPE.itemsize)
+            records.append(rec)
+            files.append(np.full(len(rec), i, dtype=np.int32))
+
+        rec = np.concatenate(records) if records else np.zeros(0, dtype=INDEX_DTYPE)
+        file_ids = np.concatenate(files) if files else np.zeros(0, dtype=np.int32)
+
+        # Versi terakhir per jam: urut jam (stable), ambil elemen terakhir tiap grup
+        order = np.argsort(rec['hour'], kind='stable')
+        rec, file_ids = rec[order], file_ids[order]
+        last = np.r_[rec['hour'][1:] != rec['hour'][:-1], True] if len(rec) else np.zeros(0, dtype=bool)
+
+        index = {
+            'hour': rec['hour'][last], 'offset': rec['offset'][last], 'nbytes': rec['nbytes'][last],
+            'count': rec['count'][last], 'crc': rec['crc'][last], 'file': file_ids[last],
+            'paths': [os.path.join(base, f"{name}.ticks") for name in names],
+        }
+        self._index[symbol] = index
+        return index
+
+    def hours(self, symbol: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> pd.DatetimeIndex:
+        """Jam yang ada di arsip (start / end inklusif)"""
+        rows = self._select(symbol, start, end)
+        return pd.DatetimeIndex(self.index(symbol)['hour'][rows] * HOUR_MS * 1_000_000)
+
+    def has_hour(self, symbol: str, hour_start: datetime) -> bool:
+        return len(self.hours(symbol, hour_start, hour_start)) > 0
+
+    def _select(self, symbol: str, start: Optional[datetime], end: Optional[datetime]) -> slice:
+        hours = self.index(symbol)['hour']
+        lo = 0 if start is None else np.searchsorted(hours, _epoch_hour(start), 'left')
+        hi = len(hours) if end is None else np.searchsorted(hours, _epoch_hour(end), 'right')
+        return slice(lo, hi)
+
+    # --- Read ---
+
+    def scan(
+        self,
+        symbol: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Sequence[str] = COLUMNS
+    ) -> Dict[str, np.ndarray]:
+        """
+        Semua tick dalam [start, end) sebagai array per kolom
+
+        Returns:
+            timestamp datetime64[ms] (naive UTC), ask / bid int32 point
+            (bagi price_divisor downloader), ask_vol / bid_vol int32
+        """
+        index = self.index(symbol)
+        rows = self._select(symbol, start, None if end is None else pd.Timestamp(end) - pd.Timedelta(1, 'ms'))
+        counts = index['count'][rows]
+        total = int(counts.sum())
+        out = np.empty((_FIELDS, total), dtype=np.int64)
+
+        pos = 0
+        for file_id in np.unique(index['file'][rows]):
+            selected = np.flatnonzero(index['file'][rows] == file_id) + rows.start
+            with open(index['paths'][file_id], 'rb') as f:
+                for i in selected:
+                    f.seek(index['offset'][i])
+                    chunk = f.read(index['nbytes'][i])
+                    n = int(index['count'][i])
+                    if zlib.crc32(chunk) != index['crc'][i]:
+                        raise IOError(f"{symbol}: corrupt tick chunk at hour {index['hour'][i]}")
+                    block = out[:, pos:pos + n]
+                    block[:] = decode_chunk(chunk, n)
+                    block[0] += index['hour'][i] * HOUR_MS
+                    pos += n
+
+        timestamps = out[0].astype('datetime64[ms]')
+        keep = slice(None)
+        if start is not None or end is not None:
+            lo = 0 if start is None else np.searchsorted(timestamps, np.datetime64(pd.Timestamp(start), 'ms'))
+            hi = total if end is None else np.searchsorted(timestamps, np.datetime64(pd.Timestamp(end), 'ms'))
+            keep = slice(lo, hi)
+
+        arrays = {'timestamp': timestamps[keep]}
+        for j, name in enumerate(COLUMNS[1:], start=1):
+            arrays[name] = out[j, keep].astype(np.int32)
+        return {name: arrays[name] for name in columns}
+
+    def read_hour(self, symbol: str, hour_start: datetime) -> Dict[str, np.ndarray]:
+        return self.scan(symbol, hour_start, pd.Timestamp(hour_start) + pd.Timedelta(hours=1))
+
+
+def hourly_spread(ticks: Dict[str, np.ndarray], price_divisor: int) -> pd.DataFrame:
+    """
+    Statistik spread + volume per jam dari hasil scan (reduceat, tanpa loop per jam)
+
+    Returns:
+        DataFrame index jam: ticks, spread_mean, spread_max, volume
+    """
+    if len(ticks['timestamp']) == 0:
+        return pd.DataFrame(columns=['ticks', 'spread_mean', 'spread_max', 'volume'])
+
+    hours = ticks['timestamp'].astype('datetime64[h]')
+    starts = np.r_[0, np.flatnonzero(hours[1:] != hours[:-1]) + 1]
+    counts = np.diff(np.r_[starts, len(hours)])
+    spread = (ticks['ask'].astype(np.int64) - ticks['bid']) / price_divisor
+    volume = ticks['ask_vol'].astype(np.int64) + ticks['bid_vol']
+
+    return pd.DataFrame({
+        'ticks': counts,
+        'spread_mean': np.add.reduceat(spread, starts) / counts,
+        'spread_max': np.maximum.reduceat(spread, starts),
+        'volume': np.add.reduceat(volume, starts),
+    }, index=pd.DatetimeIndex(hours[starts].astype('datetime64[ns]'), name='timestamp'))
@@ -0,0 +1,231 @@
+"""
+Trading-session calendar per symbol
+
+Rule statis (weekend FX, break harian metals, holiday) ditambah statistik
+404 yang dipelajari dari download, supaya downloader hanya request jam H1
+yang memang mungkin punya data.
+
+Penutupan yang dipelajari tidak permanen: setelah REPROBE_AFTER sejak
+probe terakhir, slot / hari dianggap buka lagi supaya di-request 1x.
+404 lagi -> tutup lagi; ada data -> buka seterusnya. Jadi 404 karena
+outage tidak mem-blacklist jam itu selamanya. 404 sebelum data pertama
+symbol (backfill sebelum listing) tidak dipelajari.
+"""
+
+import json
+import os
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _nth_sunday(year: int, month: int, first_day: int) -> date:
+    """Hari Minggu pertama pada/sesudah tanggal first_day"""
+    d = date(year, month, first_day)
+    return d + timedelta(days=(6 - d.weekday()) % 7)
+
+
+class TradingCalendar:
+    """Kalender jam buka market H1 untuk 1 symbol"""
+
+    METALS = ('XAU', 'XAG')
+
+    # (month, day) - market tutup sepanjang trading day
+    HOLIDAYS = {(12, 25), (1, 1)}
+
+    # Slot (DST, weekday, hour) dianggap tutup setelah N kali kosong tanpa pernah ada data
+    MIN_SLOT_MISSES = 4
+
+    # Trading day dianggap holiday setelah N jam kosong tanpa pernah ada data
+    MIN_DAY_MISSES = 20
+
+    # Jam yang baru selesai belum tentu sudah dipublish, jangan dipelajari
+    PUBLISH_LAG = timedelta(hours=2)
+
+    # Slot / hari tutup di-request ulang setelah ini (detik sejak probe terakhir)
+    REPROBE_AFTER = 24 * 3600
+
+    _dst_cache = {}
+
+    def __init__(self, symbol: str, path: Optional[str] = None):
+        self.symbol = symbol
+        self.path = path
+        self.is_metal = symbol.startswith(self.METALS)
+
+        # key -> [hits, misses, epoch probe terakhir]
+        self.slots = {}
+        self.days = {}
+        self.journal = []
+        # Jam pertama yang pernah ada data; 404 sebelumnya tidak dipelajari
+        self.first_data = None
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            # File lama tanpa waktu probe: 0 = langsung di-probe ulang
+            self.slots = {k: (v + [0])[:3] for k, v in state.get('slots', {}).items()}
+            self.days = {k: (v + [0])[:3] for k, v in state.get('days', {}).items()}
+            if state.get('first_data'):
+                self.first_data = datetime.fromisoformat(state['first_data'])
+
+        self._closed_slots = {k for k in self.slots if self._slot_closed(k)}
+        self._closed_days = {k for k in self.days if self._day_closed(k)}
+
+    @classmethod
+    def for_symbol(cls, symbol: str, directory: str) -> 'TradingCalendar':
+        return cls(symbol, os.path.join(directory, f"{symbol}.json"))
+
+    # --- Rules ---
+
+    @classmethod
+    def _is_us_dst(cls, d: date) -> bool:
+        if d.year not in cls._dst_cache:
+            cls._dst_cache[d.year] = (
+                _nth_sunday(d.year, 3, 8),   # Minggu kedua Maret
+                _nth_sunday(d.year, 11, 1),  # Minggu pertama November
+            )
+        start, end = cls._dst_cache[d.year]
+        return start <= d < end
+
+    @classmethod
+    def rollover_hour(cls, dt: datetime) -> int:
+        """Jam UTC untuk rollover 17:00 New York"""
+        return 21 if cls._is_us_dst(dt.date()) else 22
+
+    def trading_date(self, dt: datetime) -> date:
+        """Trading day dimulai saat rollover, bukan tengah malam UTC"""
+        return (dt + timedelta(hours=24 - self.rollover_hour(dt))).date()
+
+    def _slot_key(self, dt: datetime) -> str:
+        return f"{int(self._is_us_dst(dt.date()))}-{dt.weekday()}-{dt.hour}"
+
+    def _slot_closed(self, key: str) -> bool:
+        hits, misses, _ = self.slots[key]
+        return hits == 0 and misses >= self.MIN_SLOT_MISSES
+
+    def _day_closed(self, key: str) -> bool:
+        hits, misses, _ = self.days[key]
+        return hits == 0 and misses >= self.MIN_DAY_MISSES
+
+    def _still_closed(self, closed: set, stats: dict, key: str) -> bool:
+        """Penutupan yang dipelajari berlaku sampai REPROBE_AFTER sejak probe terakhir"""
+        return key in closed and time.time() - stats[key][2] < self.REPROBE_AFTER
+
+    def is_open(self, dt: datetime) -> bool:
+        """True kalau jam H1 ini mungkin punya data"""
+        trading_day = self.trading_date(dt)
+
+        # Weekend: trading day Sabtu/Minggu = Jumat rollover s/d Minggu rollover
+        if trading_day.weekday() >= 5:
+            return False
+
+        if (trading_day.month, trading_day.day) in self.HOLIDAYS:
+            return False
+
+        # Metals: break 1 jam setiap rollover
+        if self.is_metal and dt.hour == self.rollover_hour(dt):
+            return False
+
+        if self._still_closed(self._closed_days, self.days, trading_day.isoformat()):
+            return False
+
+        return not self._still_closed(self._closed_slots, self.slots, self._slot_key(dt))
+
+    def open_hours(self, start_date: datetime, end_date: datetime) -> List[datetime]:
+        """Semua jam H1 buka dalam range (inklusif)"""
+        current = start_date.replace(minute=0, second=0, microsecond=0)
+        end = end_date.replace(minute=0, second=0, microsecond=0)
+
+        hours = []
+        while current <= end:
+            if self.is_open(current):
+                hours.append(current)
+            current += timedelta(hours=1)
+        return hours
+
+    def next_open(self, dt: datetime, limit_hours: int = 24 * 14) -> datetime:
+        """Jam buka pertama pada/sesudah dt"""
+        current = dt.replace(minute=0, second=0, microsecond=0)
+        for _ in range(limit_hours):
+            if self.is_open(current):
+                return current
+            current += timedelta(hours=1)
+        return current
+
+    def find_gaps(
+        self,
+        timestamps: Iterable,
+        start_date: datetime,
+        end_date: datetime
+    ) -> pd.DatetimeIndex:
+        """Jam buka yang tidak ada di timestamps (index lookup, bukan scan)"""
+        expected = pd.DatetimeIndex(self.open_hours(start_date, end_date))
+        existing = pd.DatetimeIndex(pd.to_datetime(list(timestamps)))
+        if existing.tz is not None:
+            existing = existing.tz_localize(None)
+        return expected.difference(existing)
+
+    # --- Learning ---
+
+    def observe(self, dt: datetime, has_data: bool):
+        """Catat hasil download 1 jam (200 dengan data vs 404/kosong)"""
+        hour = dt.replace(minute=0, second=0, microsecond=0)
+        if hour + timedelta(hours=1) > datetime.utcnow() - self.PUBLISH_LAG:
+            return
+
+        self.journal.append((hour.isoformat(), has_data))
+        if has_data:
+            if self.first_data is None or hour < self.first_data:
+                self.first_data = hour
+        elif self.first_data is None or hour < self.first_data:
+            # Sebelum symbol listing / data pertama: 404 bukan jam tutup
+            return
+        idx = 0 if has_data else 1
+        now = time.time()
+
+        key = self._slot_key(hour)
+        stats = self.slots.setdefault(key, [0, 0, 0])
+        stats[idx] += 1
+        stats[2] = now
+        if self._slot_closed(key):
+            if key not in self._closed_slots:
+                logger.info(f"{self.symbol}: learned closed slot {key}")
+            self._closed_slots.add(key)
+        else:
+            self._closed_slots.discard(key)
+
+        day = self.trading_date(hour).isoformat()
+        stats = self.days.setdefault(day, [0, 0, 0])
+        stats[idx] += 1
+        stats[2] = now
+        if self._day_closed(day):
+            self._closed_days.add(day)
+        else:
+            self._closed_days.discard(day)
+
+    def replay(self, journal: Iterable):
+        """Terapkan observasi dari calendar lain (mis. dari worker process)"""
+        for hour, has_data in journal:
+            self.observe(datetime.fromisoformat(hour), has_data)
+
+    def save(self):
+        if not self.path:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'slots': self.slots,
+                'days': self.days,
+                'first_data': self.first_data.isoformat() if self.first_data else None,
+            }, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,248 @@
+"""
+Vectorized indicator kernels (NumPy + scipy.signal.lfilter)
+
+Pengganti object-object `ta` untuk RSI, MACD, Bollinger, EMA dan ATR.
+Input 1D (bars) atau 2D (symbols, bars) float32, dihitung sepanjang axis
+terakhir; rekursi EMA/Wilder dijalankan di C oleh lfilter untuk semua
+symbol sekaligus. Rumus dan warm-up (NaN / 0) identik dengan `ta` 0.11.
+"""
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+def _as_2d(x) -> np.ndarray:
+    return np.atleast_2d(np.asarray(x, dtype=np.float64))
+
+
+def _ewm_from(x: np.ndarray, alpha: float, start: int) -> np.ndarray:
+    """EMA adjust=False mulai dari kolom `start` (y[start] = x[start])"""
+    out = np.full_like(x, np.nan)
+    seg = x[:, start:]
+    if seg.shape[1] == 0:
+        return out
+    zi = (1 - alpha) * seg[:, :1]
+    out[:, start:], _ = lfilter([alpha], [1, alpha - 1], seg, axis=-1, zi=zi)
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    EMA adjust=False per row, mulai dari nilai valid pertama
+
+    NaN di awal row diabaikan (seperti pandas ewm); NaN di ekor row (padding
+    panel) ikut terbawa tapi tidak mempengaruhi bar valid sebelumnya.
+    """
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+
+    out = np.full_like(x, np.nan)
+    for start in np.unique(first):
+        rows = first == start
+        out[rows] = _ewm_from(x[rows], alpha, int(start))
+        # min_periods dihitung dari nilai valid pertama
+        out[rows, start:start + min_periods - 1] = np.nan
+    return out
+
+
+def _rolling_mean_std(x: np.ndarray, window: int):
+    """Rolling mean + std (ddof=0) via cumulative sums, O(bars)"""
+    # Geser ke nilai pertama supaya E[x^2] - E[x]^2 tidak kehilangan presisi
+    ref = x[:, :1]
+    d = x - ref
+
+    zeros = np.zeros((x.shape[0], 1))
+    s1 = np.concatenate([zeros, np.cumsum(d, axis=1)], axis=1)
+    s2 = np.concatenate([zeros, np.cumsum(d * d, axis=1)], axis=1)
+
+    mean = np.full_like(x, np.nan)
+    var = np.full_like(x, np.nan)
+    sum1 = s1[:, window:] - s1[:, :-window]
+    sum2 = s2[:, window:] - s2[:, :-window]
+    mean[:, window - 1:] = sum1 / window
+    var[:, window - 1:] = np.maximum(sum2 / window - (sum1 / window) ** 2, 0)
+
+    return mean + ref, np.sqrt(var)
+
+
+def ema(close, window: int) -> np.ndarray:
+    """EMA (span=window, adjust=False, NaN sebelum window bar)"""
+    x = _as_2d(close)
+    out = _ewm(x, 2 / (window + 1), window)
+    return out.astype(np.float32).reshape(np.shape(close))
+
+
+def rsi(close, window: int = 14) -> np.ndarray:
+    x = _as_2d(close)
+    return _rsi(x, window).astype(np.float32).reshape(np.shape(close))
+
+
+def _diff(x: np.ndarray, prev: np.ndarray = None) -> np.ndarray:
+    """Selisih dengan bar sebelumnya; bar pertama 0 (atau x - prev)"""
+    diff = np.zeros_like(x)
+    diff[:, 1:] = x[:, 1:] - x[:, :-1]
+    if prev is not None:
+        diff[:, 0] = x[:, 0] - prev
+    return diff
+
+
+def _wilder_up_down(x: np.ndarray, window: int):
+    diff = _diff(x)
+    up = np.maximum(diff, 0.0)
+    down = np.maximum(-diff, 0.0)
+    return _ewm(up, 1 / window, window), _ewm(down, 1 / window, window)
+
+
+def _rsi_from(ema_up: np.ndarray, ema_down: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_down == 0, 100, 100 - (100 / (1 + ema_up / ema_down)))
+
+
+def _rsi(x: np.ndarray, window: int) -> np.ndarray:
+    return _rsi_from(*_wilder_up_down(x, window))
+
+
+def _macd(x: np.ndarray, fast: int, slow: int, signal: int):
+    macd_line = _ewm(x, 2 / (fast + 1), fast) - _ewm(x, 2 / (slow + 1), slow)
+    signal_line = _ewm(macd_line, 2 / (signal + 1), signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Returns (macd, signal, histogram)"""
+    x = _as_2d(close)
+    shape = np.shape(close)
+    return tuple(v.astype(np.float32).reshape(shape) for v in _macd(x, fast, slow, signal))
+
+
+def bollinger(close, window: int = 20, dev: float = 2.0):
+    """Returns (upper, middle, lower)"""
+    x = _as_2d(close)
+    mean, std = _rolling_mean_std(x, window)
+    shape = np.shape(close)
+    return tuple(
+        v.astype(np.float32).reshape(shape)
+        for v in (mean + dev * std, mean, mean - dev * std)
+    )
+
+
+def _atr(h: np.ndarray, l: np.ndarray, c: np.ndarray, window: int) -> np.ndarray:
+    prev_close = np.full_like(c, np.nan)
+    prev_close[:, 1:] = c[:, :-1]
+
+    # Bar pertama: TR = high - low (fmax mengabaikan NaN prev_close)
+    tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+
+    out = np.zeros_like(c)
+    if c.shape[1] < window:
+        return out
+
+    seeded = tr[:, window - 1:].copy()
+    seeded[:, 0] = tr[:, :window].mean(axis=1)
+    out[:, window - 1:] = _ewm_from(seeded, 1 / window, 0)
+    return out
+
+
+def atr(high, low, close, window: int = 14) -> np.ndarray:
+    """Wilder ATR; bar sebelum window bernilai 0 seperti `ta`"""
+    out = _atr(_as_2d(high), _as_2d(low), _as_2d(close), window)
+    return out.astype(np.float32).reshape(np.shape(close))
+
+
+def compute_indicators(close, high, low) -> dict:
+    """
+    Semua indicator pipeline dalam 1 panggilan
+
+    Args:
+        close, high, low: (bars,) atau (symbols, bars)
+
+    Returns:
+        dict nama kolom -> float32 array dengan shape yang sama
+    """
+    shape = np.shape(close)
+    c = _as_2d(close)
+
+    macd_line, signal_line, histogram = _macd(c, 12, 26, 9)
+    mean, std = _rolling_mean_std(c, 20)
+
+    out = {
+        'rsi_14': _rsi(c, 14),
+        'macd': macd_line,
+        'macd_signal': signal_line,
+        'macd_histogram': histogram,
+        'bb_upper': mean + 2 * std,
+        'bb_middle': mean,
+        'bb_lower': mean - 2 * std,
+        'ema_20': _ewm(c, 2 / 21, 20),
+        'ema_50': _ewm(c, 2 / 51, 50),
+        'ema_200': _ewm(c, 2 / 201, 200),
+        'atr_14': _atr(_as_2d(high), _as_2d(low), c, 14),
+    }
+
+    return {name: v.astype(np.float32).reshape(shape) for name, v in out.items()}
+
+
+# --- Resumable (feature cache) ---
+#
+# Input dict kolom -> (rows, bars) float64. state None = hitung dari awal;
+# kalau ada, input hanya bar baru dan state = nilai internal per row di bar
+# terakhir sebelumnya, jadi hasil sama dengan menghitung ulang semua bar.
+# Returns (outputs, internals): internals (rows, bars) untuk state berikutnya.
+
+def _ewm_continue(x: np.ndarray, alpha: float, prev: np.ndarray) -> np.ndarray:
+    """Lanjutkan EMA adjust=False dari nilai terakhir prev (rows,)"""
+    out, _ = lfilter([alpha], [1, alpha - 1], x, axis=-1, zi=(1 - alpha) * prev[:, None])
+    return out
+
+
+def resumable_ema(d: dict, state: dict = None, window: int = 20):
+    alpha = 2 / (window + 1)
+    x = d['close']
+    out = _ewm(x, alpha, window) if state is None else _ewm_continue(x, alpha, state['ema'])
+    return (out,), {'ema': out}
+
+
+def resumable_rsi(d: dict, state: dict = None, window: int = 14):
+    x = d['close']
+    if state is None:
+        up, down = _wilder_up_down(x, window)
+    else:
+        diff = _diff(x, state['close'])
+        up = _ewm_continue(np.maximum(diff, 0.0), 1 / window, state['up'])
+        down = _ewm_continue(np.maximum(-diff, 0.0), 1 / window, state['down'])
+    return (_rsi_from(up, down),), {'close': x, 'up': up, 'down': down}
+
+
+def resumable_macd(d: dict, state: dict = None, fast: int = 12, slow: int = 26, signal: int = 9):
+    x = d['close']
+    if state is None:
+        fast_line = _ewm(x, 2 / (fast + 1), fast)
+        slow_line = _ewm(x, 2 / (slow + 1), slow)
+        signal_line = _ewm(fast_line - slow_line, 2 / (signal + 1), signal)
+    else:
+        fast_line = _ewm_continue(x, 2 / (fast + 1), state['fast'])
+        slow_line = _ewm_continue(x, 2 / (slow + 1), state['slow'])
+        signal_line = _ewm_continue(fast_line - slow_line, 2 / (signal + 1), state['signal'])
+    macd_line = fast_line - slow_line
+    return (
+        (macd_line, signal_line, macd_line - signal_line),
+        {'fast': fast_line, 'slow': slow_line, 'signal': signal_line},
+    )
+
+
+def resumable_bollinger(d: dict, state: dict = None, window: int = 20, dev: float = 2.0):
+    """Tanpa state: cukup window - 1 bar input sebelumnya (Kernel.lookback)"""
+    mean, std = _rolling_mean_std(d['close'], window)
+    return (mean + dev * std, mean, mean - dev * std), {}
+
+
+def resumable_atr(d: dict, state: dict = None, window: int = 14):
+    h, l, c = d['high'], d['low'], d['close']
+    if state is None:
+        out = _atr(h, l, c, window)
+        return (out,), {'close': c, 'atr': out}
+
+    prev_close = np.concatenate([state['close'][:, None], c[:, :-1]], axis=1)
+    tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+    out = _ewm_continue(tr, 1 / window, state['atr'])
+    return (out,), {'close': c, 'atr': out}
@@ -0,0 +1,132 @@
+"""
+Label training: next-bar, multi-horizon return dan ATR triple-barrier
+
+Semua fungsi bekerja per symbol pada array bar yang rapat (tanpa gap),
+label per bar (entry di close bar itu). Bar yang labelnya belum bisa
+ditentukan (future belum lengkap, ATR belum valid) diberi INVALID.
+
+Triple-barrier mengikuti cara TradingPredictor trading: TP = 2.5 ATR,
+SL = 1 ATR, sinyal berlaku 4 bar H1. Dihitung dengan sliding window
+high/low (view, tanpa copy) per chunk, bukan loop per bar.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SELL, HOLD, BUY = 0, 1, 2
+INVALID = -1
+
+TP_ATR_MULT = 2.5
+SL_ATR_MULT = 1.0
+SIGNAL_HORIZON = 4  # bar (valid_until prediction = 4 jam)
+
+LABEL_METHODS = ('next_bar', 'horizon', 'triple_barrier')
+
+
+def forward_returns(close, horizons=(1, 4, 12, 24)) -> np.ndarray:
+    """
+    Return close[t] -> close[t+h] untuk setiap horizon
+
+    Returns:
+        (n, len(horizons)) float64, NaN kalau t+h di luar data
+    """
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full((len(close), len(horizons)), np.nan)
+    for j, h in enumerate(horizons):
+        if 0 < h < len(close):
+            out[:-h, j] = (close[h:] - close[:-h]) / close[:-h]
+    return out
+
+
+def return_labels(returns, threshold: float = 0.001) -> np.ndarray:
+    """BUY / SELL kalau return melewati +-threshold, selain itu HOLD"""
+    returns = np.asarray(returns, dtype=np.float64)
+    labels = np.where(returns > threshold, BUY, np.where(returns < -threshold, SELL, HOLD)).astype(np.int8)
+    labels[np.isnan(returns)] = INVALID
+    return labels
+
+
+def horizon_labels(close, horizons=(1, 4, 12, 24), threshold: float = 0.001) -> np.ndarray:
+    """Label multi-horizon: (n, len(horizons)) int8"""
+    return return_labels(forward_returns(close, horizons), threshold)
+
+
+def _first_hit(hit: np.ndarray) -> np.ndarray:
+    """Index bar pertama yang kena barrier per baris (horizon kalau tidak kena)"""
+    return np.where(hit.any(axis=1), hit.argmax(axis=1), hit.shape[1])
+
+
+def triple_barrier_labels(
+    close, high, low, atr,
+    horizon: int = SIGNAL_HORIZON,
+    tp_mult: float = TP_ATR_MULT,
+    sl_mult: float = SL_ATR_MULT,
+    chunk_size: int = 65536
+) -> np.ndarray:
+    """
+    Label ATR triple-barrier
+
+    BUY  kalau posisi long (TP close + tp*ATR, SL close - sl*ATR) kena TP
+         sebelum SL dalam `horizon` bar berikutnya
+    SELL kalau posisi short kena TP lebih dulu
+    HOLD kalau tidak ada yang kena TP (time barrier) atau keduanya menang.
+    TP dan SL di bar yang sama dihitung SL (konservatif, urutan intra-bar
+    tidak diketahui).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    atr = np.asarray(atr, dtype=np.float64)
+
+    n = len(close)
+    labels = np.full(n, INVALID, dtype=np.int8)
+    m = n - horizon
+    if m <= 0:
+        return labels
+
+    # Baris t = bar t+1 .. t+horizon
+    high_win = sliding_window_view(high[1:], horizon)
+    low_win = sliding_window_view(low[1:], horizon)
+
+    for start in range(0, m, chunk_size):
+        stop = min(start + chunk_size, m)
+        entry = close[start:stop, None]
+        a = atr[start:stop, None]
+        hw = high_win[start:stop]
+        lw = low_win[start:stop]
+
+        long_tp = _first_hit(hw >= entry + tp_mult * a)
+        long_sl = _first_hit(lw <= entry - sl_mult * a)
+        short_tp = _first_hit(lw <= entry - tp_mult * a)
+        short_sl = _first_hit(hw >= entry + sl_mult * a)
+
+        buy = long_tp < long_sl
+        sell = short_tp < short_sl
+
+        chunk = np.full(stop - start, HOLD, dtype=np.int8)
+        chunk[buy & ~sell] = BUY
+        chunk[sell & ~buy] = SELL
+        chunk[~(np.isfinite(a[:, 0]) & (a[:, 0] > 0))] = INVALID
+        labels[start:stop] = chunk
+
+    return labels
+
+
+def make_labels(method: str, close, high=None, low=None, atr=None,
+                horizon: int = SIGNAL_HORIZON, threshold: float = 0.001) -> np.ndarray:
+    """
+    Label per bar untuk label_method
+
+    Args:
+        method: 'next_bar' (return 1 bar), 'horizon' (return `horizon` bar)
+            atau 'triple_barrier' (butuh high, low, atr)
+    """
+    if method == 'next_bar':
+        return horizon_labels(close, (1,), threshold)[:, 0]
+    if method == 'horizon':
+        return horizon_labels(close, (horizon,), threshold)[:, 0]
+    if method == 'triple_barrier':
+        if high is None or low is None or atr is None:
+            raise ValueError("triple_barrier labels need high, low and atr")
+        return triple_barrier_labels(close, high, low, atr, horizon=horizon)
+    raise ValueError(f"Unknown label method: {method} (expected one of {LABEL_METHODS})")
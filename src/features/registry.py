@@ -0,0 +1,255 @@
+"""
+Feature registry + feature cache yang bisa dilanjutkan
+
+Setiap feature mendeklarasikan input kolom, window dan warm-up, dan
+dihitung oleh 1 Kernel; 1 kernel bisa menghasilkan beberapa feature
+(MACD: macd / signal / histogram, Bollinger: upper / middle / lower)
+dalam 1 pass.
+
+Cache per symbol x kernel menyimpan output untuk n bar pertama, hash
+n bar input itu, dan state internal kernel di bar ke-n. Kalau n bar
+pertama data sekarang sama (bar baru hanya di-append), hanya bar baru
+yang dihitung dari state itu; kalau history berubah, hitung ulang semua.
+"""
+
+import hashlib
+import os
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.features import kernels
+from src.utils.profiling import track_allocations
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Kernel:
+    """1 perhitungan (1+ output) yang bisa dilanjutkan dari state bar terakhir"""
+    name: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    # (inputs (rows, bars) float64, state | None) -> (outputs, internals), lihat kernels.resumable_*
+    compute: Callable
+    # Bar minimal di cache supaya bisa dilanjutkan (state sudah lewat warm-up)
+    min_bars: int
+    # Bar input sebelum bar baru yang ikut dihitung ulang (rolling window tanpa state)
+    lookback: int = 0
+    # Naikkan kalau rumus berubah supaya cache lama tidak terpakai
+    version: int = 1
+
+    def signature(self) -> str:
+        return f"{self.name}|{','.join(self.inputs)}|{','.join(self.outputs)}|v{self.version}"
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """Deklarasi 1 feature"""
+    name: str
+    inputs: Tuple[str, ...]
+    window: int
+    warmup: int
+    kernel: Optional[Kernel] = None
+
+    @property
+    def is_raw(self) -> bool:
+        """Kolom OHLC apa adanya (tidak dihitung)"""
+        return self.kernel is None
+
+
+class FeatureCache:
+    """Cache kernel per symbol: {dir}/{symbol}/{kernel}.npz (output, hash prefix, state)"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def digest(kernel: Kernel, timestamps: np.ndarray, inputs: Dict[str, np.ndarray]) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(kernel.signature().encode())
+        h.update(np.ascontiguousarray(timestamps, dtype=np.int64).tobytes())
+        for name in kernel.inputs:
+            h.update(np.ascontiguousarray(inputs[name], dtype=np.float32).tobytes())
+        return h.digest()
+
+    def _path(self, symbol: str, kernel: Kernel) -> str:
+        return os.path.join(self.cache_dir, symbol, f"{kernel.name}.npz")
+
+    def load(self, symbol: str, kernel: Kernel) -> Optional[dict]:
+        """dict digest, outputs (k, n) float32, state (nama -> float64), atau None"""
+        path = self._path(symbol, kernel)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as saved:
+                return {
+                    'digest': saved['digest'].tobytes(),
+                    'outputs': saved['outputs'],
+                    'state': {k[6:]: float(saved[k]) for k in saved.files if k.startswith('state_')},
+                }
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Corrupt feature cache {path}: {e}")
+            return None
+
+    def save(self, symbol: str, kernel: Kernel, digest: bytes, outputs: np.ndarray, state: Dict[str, float]):
+        path = self._path(symbol, kernel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            digest=np.frombuffer(digest, dtype=np.uint8),
+            outputs=np.asarray(outputs, dtype=np.float32),
+            **{f"state_{k}": np.float64(v) for k, v in state.items()}
+        )
+        os.replace(tmp_path, path)
+
+
+class FeatureRegistry:
+    """Kumpulan FeatureSpec, menghitung feature ke OHLCPanel"""
+
+    def __init__(self):
+        self._specs = {}
+
+    def register(self, spec: FeatureSpec):
+        self._specs[spec.name] = spec
+        return spec
+
+    def get(self, name: str) -> FeatureSpec:
+        if name not in self._specs:
+            raise KeyError(f"Unknown feature: {name}")
+        return self._specs[name]
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def warmup(self, names: Iterable[str]) -> int:
+        """Jumlah bar history minimal sebelum semua feature valid"""
+        return max((self.get(n).warmup for n in names), default=0)
+
+    @track_allocations()
+    def compute(self, panel, names: Iterable[str], cache: Optional[FeatureCache] = None):
+        """
+        Tambahkan feature ke panel (in-place)
+
+        Dihitung per kernel di bar valid yang dirapatkan per symbol; dengan
+        cache, symbol yang history-nya hanya bertambah dilanjutkan dari state
+        (hanya bar baru yang dihitung), sisanya dihitung ulang bersama.
+        """
+        specs = [self.get(n) for n in names]
+        kernels_needed = list(dict.fromkeys(s.kernel for s in specs if not s.is_raw))
+        if not kernels_needed:
+            return panel
+
+        mask = panel.mask
+        counts = mask.sum(axis=1)
+        input_cols = sorted({col for k in kernels_needed for col in k.inputs})
+        packed = {}
+        for col in input_cols:
+            packed[col], _ = panel.pack(panel.field(col), mask)
+
+        ts_all = panel.timestamps.asi8
+        ts = [ts_all[mask[i]] for i in range(len(panel.symbols))]
+
+        results = {}
+        stats = {'hit': 0, 'resumed': 0, 'computed': 0}
+
+        for kernel in kernels_needed:
+            out = np.full((len(kernel.outputs),) + packed[input_cols[0]].shape, np.nan, dtype=np.float32)
+            todo, resume = [], []
+
+            for i, symbol in enumerate(panel.symbols):
+                n = int(counts[i])
+                if n == 0:
+                    continue
+                entry = cache.load(symbol, kernel) if cache is not None else None
+                if entry is not None:
+                    done = entry['outputs'].shape[1]
+                    inputs = {c: packed[c][i, :done] for c in kernel.inputs}
+                    if (kernel.min_bars <= done <= n
+                            and cache.digest(kernel, ts[i][:done], inputs) == entry['digest']):
+                        out[:, i, :done] = entry['outputs']
+                        if done == n:
+                            stats['hit'] += 1
+                        else:
+                            resume.append((i, done, entry['state']))
+                        continue
+                todo.append(i)
+
+            states = {}
+            if todo:
+                outputs, internals = kernel.compute(
+                    {c: packed[c][todo].astype(np.float64) for c in kernel.inputs}, None
+                )
+                for j, k in enumerate(todo):
+                    n = int(counts[k])
+                    out[:, k, :n] = [o[j, :n] for o in outputs]
+                    states[k] = {name: v[j, n - 1] for name, v in internals.items()}
+                stats['computed'] += len(todo)
+
+            for i, done, state in resume:
+                n = int(counts[i])
+                start = done - kernel.lookback
+                outputs, internals = kernel.compute(
+                    {c: packed[c][i:i + 1, start:n].astype(np.float64) for c in kernel.inputs},
+                    {name: np.array([v]) for name, v in state.items()}
+                )
+                out[:, i, done:n] = [o[0, kernel.lookback:] for o in outputs]
+                states[i] = {name: v[0, -1] for name, v in internals.items()}
+                stats['resumed'] += 1
+
+            if cache is not None:
+                for i, state in states.items():
+                    n = int(counts[i])
+                    inputs = {c: packed[c][i, :n] for c in kernel.inputs}
+                    cache.save(panel.symbols[i], kernel, cache.digest(kernel, ts[i], inputs), out[:, i, :n], state)
+
+            for j, name in enumerate(kernel.outputs):
+                results[name] = out[j]
+
+        if cache is not None:
+            logger.info(f"Feature cache: {stats['hit']} hits, {stats['resumed']} resumed, "
+                        f"{stats['computed']} computed (symbol x kernel)")
+
+        panel.add_fields({spec.name: panel.unpack(results[spec.name], mask) for spec in specs if not spec.is_raw})
+        return panel
+
+
+registry = FeatureRegistry()
+
+for _col in ('open', 'high', 'low', 'close', 'volume'):
+    registry.register(FeatureSpec(_col, (_col,), window=1, warmup=0))
+
+RSI_14 = Kernel('rsi_14', ('close',), ('rsi_14',), compute=kernels.resumable_rsi, min_bars=14)
+MACD = Kernel(
+    'macd_12_26_9', ('close',), ('macd', 'macd_signal', 'macd_histogram'),
+    compute=kernels.resumable_macd, min_bars=34
+)
+BOLLINGER = Kernel(
+    'bollinger_20_2', ('close',), ('bb_upper', 'bb_middle', 'bb_lower'),
+    compute=kernels.resumable_bollinger, min_bars=20, lookback=19
+)
+ATR_14 = Kernel('atr_14', ('high', 'low', 'close'), ('atr_14',), compute=kernels.resumable_atr, min_bars=14)
+
+registry.register(FeatureSpec('rsi_14', ('close',), window=14, warmup=13, kernel=RSI_14))
+registry.register(FeatureSpec('macd', ('close',), window=26, warmup=25, kernel=MACD))
+registry.register(FeatureSpec('macd_signal', ('close',), window=26, warmup=33, kernel=MACD))
+registry.register(FeatureSpec('macd_histogram', ('close',), window=26, warmup=33, kernel=MACD))
+for _name in BOLLINGER.outputs:
+    registry.register(FeatureSpec(_name, ('close',), window=20, warmup=19, kernel=BOLLINGER))
+for _window in (20, 50, 200):
+    _ema = Kernel(
+        f'ema_{_window}', ('close',), (f'ema_{_window}',),
+        compute=lambda d, state, w=_window: kernels.resumable_ema(d, state, w), min_bars=_window
+    )
+    registry.register(FeatureSpec(f'ema_{_window}', ('close',), window=_window, warmup=_window - 1, kernel=_ema))
+registry.register(FeatureSpec('atr_14', ('high', 'low', 'close'), window=14, warmup=13, kernel=ATR_14))
+
+# Feature set untuk model (urutan = urutan kolom di scaler / model)
+MODEL_FEATURES = [
+    'close', 'rsi_14', 'macd', 'macd_signal',
+    'ema_20', 'ema_50', 'ema_200', 'atr_14'
+]
@@ -1,10 +1,23 @@
+import numpy as np
 import pandas as pd
-import ta
 import logging
 
+from src.features.kernels import compute_indicators
+from src.features.registry import registry
+from src.utils.profiling import track_allocations
+
 logger = logging.getLogger(__name__)
 
+INDICATOR_COLS = [
+    'rsi_14', 'macd', 'macd_signal', 'macd_histogram',
+    'bb_upper', 'bb_middle', 'bb_lower',
+    'ema_20', 'ema_50', 'ema_200', 'atr_14'
+]
+
+MIN_ROWS = 200
 
+
+@track_allocations()
 def calculate_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """Calculate all technical indicators"""
     
@@ -16,35 +29,19 @@ def calculate_indicators(df: pd.DataFrame) -> pd.DataFrame:
     df = df.sort_values('timestamp')
     
     # Check minimum data
-    if len(df) < 200:
-        logger.warning(f"Not enough data: {len(df)} rows (need 200+)")
+    if len(df) < MIN_ROWS:
+        logger.warning(f"Not enough data: {len(df)} rows (need {MIN_ROWS}+)")
         return df
     
     try:
-        # RSI
-        df['rsi_14'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
-        
-        # MACD
-        macd = ta.trend.MACD(df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_histogram'] = macd.macd_diff()
-        
-        # Bollinger Bands
-        bb = ta.volatility.BollingerBands(df['close'])
-        df['bb_upper'] = bb.bollinger_hband()
-        df['bb_middle'] = bb.bollinger_mavg()
-        df['bb_lower'] = bb.bollinger_lband()
-        
-        # EMA
-        df['ema_20'] = ta.trend.EMAIndicator(df['close'], window=20).ema_indicator()
-        df['ema_50'] = ta.trend.EMAIndicator(df['close'], window=50).ema_indicator()
-        df['ema_200'] = ta.trend.EMAIndicator(df['close'], window=200).ema_indicator()
-        
-        # ATR
-        df['atr_14'] = ta.volatility.AverageTrueRange(
-            df['high'], df['low'], df['close'], window=14
-        ).average_true_range()
+        # Semua indicator dalam 1 pass (lihat src/features/kernels.py)
+        indicators = compute_indicators(
+            df['close'].to_numpy(np.float32),
+            df['high'].to_numpy(np.float32),
+            df['low'].to_numpy(np.float32)
+        )
+        for name in INDICATOR_COLS:
+            df[name] = indicators[name]
         
         # JANGAN drop NaN - biarkan NULL untuk rows yang belum cukup data
         # Yang penting adalah rows terakhir (latest) sudah punya indicators
@@ -60,3 +57,34 @@ def calculate_indicators(df: pd.DataFrame) -> pd.DataFrame:
     except Exception as e:
         logger.error(f"Error calculating indicators: {e}")
         return df
+
+
+@track_allocations()
+def calculate_panel_indicators(panel, cache=None):
+    """Calculate indicators untuk semua symbol di OHLCPanel sekaligus (in-place)"""
+
+    mask = panel.mask
+    counts = mask.sum(axis=1)
+
+    for symbol, count in zip(panel.symbols, counts):
+        if count < MIN_ROWS:
+            logger.warning(f"{symbol}: Not enough data: {count} rows (need {MIN_ROWS}+)")
+
+    if counts.max(initial=0) < MIN_ROWS:
+        return panel
+
+    registry.compute(panel, INDICATOR_COLS, cache)
+
+    # Symbol dengan data kurang tetap tanpa indicators, sama seperti calculate_indicators
+    short = counts < MIN_ROWS
+    if short.any():
+        panel.add_fields({
+            name: np.where(short[:, None], np.nan, panel.field(name))
+            for name in INDICATOR_COLS
+        })
+
+    valid = panel.valid_mask(['rsi_14', 'macd', 'ema_20', 'ema_50', 'ema_200', 'atr_14']).sum(axis=1)
+    for symbol, v, count in zip(panel.symbols, valid, counts):
+        logger.info(f"{symbol}: Calculated indicators: {v}/{count} rows have complete data")
+
+    return panel
@@ -0,0 +1,85 @@
+"""
+Model backend: interface training / evaluasi / bundle yang sama untuk
+setiap jenis model
+
+    lstm  TradingLSTM (Keras)
+    gbm   gradient boosting di atas window features (src/models/gbm.py)
+
+Semua backend menerima window (B, seq, F) yang sama dari WindowDataset
+dan menghasilkan probabilities (B, 3) SELL / HOLD / BUY, jadi
+train_model.py, predictor dan benchmark tidak peduli backend mana yang
+dipakai. Backend dicatat di metadata bundle ('backend', 'algorithm').
+"""
+
+import importlib
+import logging
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from src.utils.config import config
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = {
+    'lstm': 'src.models.lstm_model:LSTMBackend',
+    'gbm': 'src.models.gbm:GradientBoostingBackend',
+}
+
+
+def get_backend(name: str):
+    """Class backend dari nama (import lazy: gbm tidak butuh TensorFlow)"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend: {name} (choices: {', '.join(BACKENDS)})")
+    module, cls = BACKENDS[name].split(':')
+    return getattr(importlib.import_module(module), cls)
+
+
+class ModelBackend(ABC):
+    """Interface model untuk prediksi BUY/SELL/HOLD dari window features"""
+
+    name = None
+    algorithm = None
+    DEFAULT_HPARAMS = {}
+
+    def __init__(self, sequence_length=60, hparams=None, performance=None, label_method=None):
+        self.sequence_length = sequence_length
+        self.hparams = {**self.DEFAULT_HPARAMS, **(hparams or {})}
+        self.label_method = label_method or config.LABEL_METHOD
+        self.performance = config.TRAIN_PERF_MODE if performance is None else performance
+        self.scaler = None
+        self.profile = None
+
+    @abstractmethod
+    def fit(self, X_train, y_train, X_val, y_val, epochs=100) -> int:
+        """Train; returns jumlah epoch / iterasi boosting yang dipakai"""
+
+    @abstractmethod
+    def predict(self, X) -> np.ndarray:
+        """Probabilities (B, 3)"""
+
+    @abstractmethod
+    def to_bundle(self, metadata=None):
+        """ModelBundle untuk registry"""
+
+    def evaluate(self, X, y, batch_size: int = 4096):
+        """(loss, accuracy) dengan sparse categorical crossentropy"""
+        y = np.asarray(y)
+        losses = np.empty(len(y), dtype=np.float64)
+        correct = 0
+        for start in range(0, len(y), batch_size):
+            proba = self.predict(X[start:start + batch_size])
+            yb = y[start:start + batch_size]
+            losses[start:start + len(yb)] = -np.log(np.clip(proba[np.arange(len(yb)), yb], 1e-7, 1.0))
+            correct += int(np.sum(proba.argmax(axis=1) == yb))
+        return float(losses.mean()), correct / max(len(y), 1)
+
+    def bundle_metadata(self, metadata=None) -> dict:
+        metadata = dict(metadata or {})
+        metadata.setdefault('sequence_length', self.sequence_length)
+        metadata.setdefault('hparams', self.hparams)
+        metadata.setdefault('label_method', self.label_method)
+        metadata['backend'] = self.name
+        metadata['algorithm'] = self.algorithm
+        return metadata
+
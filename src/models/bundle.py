@@ -0,0 +1,319 @@
+"""
+Single-file model bundle
+
+Satu file berisi weights (memory-mappable, optional float16), parameter
+scaler, feature spec dan metadata training. Pengganti pasangan .h5 + .pkl.
+
+Layout:
+    MAGIC (8 bytes) | header length (uint64 LE) | header JSON | arrays
+Setiap array di-align ke 64 bytes supaya bisa di-np.memmap langsung.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TBUNDLE1"
+ALIGN = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def file_hash(path: str) -> str:
+    """sha256 isi file"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'softmax': _softmax,
+}
+
+
+class NumpySequential:
+    """
+    Forward pass NumPy untuk Sequential LSTM / Dropout / Dense
+
+    Tanpa membangun graph Keras, jadi load predictor cukup beberapa ms.
+    Interface predict() sama dengan Keras model.
+    """
+
+    def __init__(self, model_config: str, weights: List[np.ndarray]):
+        config = json.loads(model_config)
+        if config.get('class_name') != 'Sequential':
+            raise NotImplementedError("Only Sequential models")
+
+        self.layers = []
+        weights = iter(weights)
+
+        for layer in config['config']['layers']:
+            kind = layer['class_name']
+            cfg = layer['config']
+
+            if kind in ('InputLayer', 'Dropout'):
+                continue
+            if kind == 'LSTM':
+                for key, expected in (('activation', 'tanh'), ('recurrent_activation', 'sigmoid')):
+                    if cfg.get(key, expected) != expected:
+                        raise NotImplementedError(f"LSTM {key}={cfg[key]}")
+                kernel, recurrent, bias = (np.asarray(next(weights), dtype=np.float32) for _ in range(3))
+                self.layers.append(('lstm', (kernel, recurrent, bias), cfg.get('return_sequences', False)))
+            elif kind == 'Dense':
+                if cfg.get('activation') not in _ACTIVATIONS:
+                    raise NotImplementedError(f"Dense activation {cfg.get('activation')}")
+                kernel, bias = (np.asarray(next(weights), dtype=np.float32) for _ in range(2))
+                self.layers.append(('dense', (kernel, bias), cfg['activation']))
+            else:
+                raise NotImplementedError(f"Layer {kind}")
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent, bias, return_sequences):
+        batch, steps, _ = x.shape
+        units = recurrent.shape[0]
+        sigmoid = _ACTIVATIONS['sigmoid']
+
+        # Proyeksi input untuk semua timestep sekaligus; gate order Keras: i, f, c, o
+        projected = x @ kernel + bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = []
+
+        for t in range(steps):
+            z = projected[:, t] + h @ recurrent
+            i = sigmoid(z[:, :units])
+            f = sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = sigmoid(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            if return_sequences:
+                outputs.append(h)
+
+        return np.stack(outputs, axis=1) if return_sequences else h
+
+    def predict(self, X, verbose=0):
+        out = np.asarray(X, dtype=np.float32)
+        for kind, params, option in self.layers:
+            if kind == 'lstm':
+                out = self._lstm(out, *params, option)
+            else:
+                kernel, bias = params
+                out = _ACTIVATIONS[option](out @ kernel + bias)
+        return out
+
+
+class ModelBundle:
+    """Weights + scaler + feature spec + metadata dalam 1 file"""
+
+    def __init__(
+        self,
+        weights: List[np.ndarray],
+        model_config: str,
+        scaler: dict,
+        features: List[str],
+        metadata: Optional[dict] = None,
+        path: Optional[str] = None,
+        hash: Optional[str] = None
+    ):
+        self.weights = weights
+        self.model_config = model_config
+        self.scaler = scaler
+        self.features = list(features)
+        self.metadata = metadata or {}
+        self.path = path
+        self.hash = hash
+
+    @property
+    def version(self) -> str:
+        """Model version yang dicatat di predictions (hash pendek)"""
+        return self.hash[:12] if self.hash else "unsaved"
+
+    @staticmethod
+    def _scaler_params(scaler) -> dict:
+        return {
+            'data_min': scaler.data_min_.tolist(),
+            'data_max': scaler.data_max_.tolist(),
+            'feature_range': list(scaler.feature_range),
+            'n_samples': int(scaler.n_samples_seen_) if scaler.n_samples_seen_ is not None else None,
+        }
+
+    @classmethod
+    def from_model(cls, model, scaler, features: List[str], metadata: Optional[dict] = None) -> 'ModelBundle':
+        """
+        Bundle dari Keras model + fitted MinMaxScaler
+
+        scaler boleh dict symbol -> scaler (model global, scaling per symbol)
+        """
+        if isinstance(scaler, dict):
+            scaler_params = {'symbols': {s: cls._scaler_params(sc) for s, sc in scaler.items()}}
+        else:
+            scaler_params = cls._scaler_params(scaler)
+        return cls(
+            weights=[np.asarray(w) for w in model.get_weights()],
+            model_config=model.to_json(),
+            scaler=scaler_params,
+            features=features,
+            metadata=metadata
+        )
+
+    def save(self, path: str, weights_dtype: str = 'float32') -> str:
+        """
+        Tulis bundle (atomic)
+
+        Returns:
+            sha256 file
+        """
+        # Hanya weights float32 yang di-cast; index / threshold tree tetap exact
+        dtype = np.dtype(weights_dtype)
+        arrays = [
+            np.ascontiguousarray(w, dtype=dtype if np.asarray(w).dtype == np.float32 else None)
+            for w in self.weights
+        ]
+
+        entries = []
+        offset = 0
+        for i, arr in enumerate(arrays):
+            entries.append({
+                'name': f"w{i}",
+                'dtype': arr.dtype.str,
+                'shape': list(arr.shape),
+                'offset': offset,
+            })
+            offset = _align(offset + arr.nbytes)
+
+        header = json.dumps({
+            'format': 1,
+            'arrays': entries,
+            'model_config': self.model_config,
+            'scaler': self.scaler,
+            'features': self.features,
+            'metadata': self.metadata,
+            'created_at': datetime.utcnow().isoformat(),
+        }).encode()
+
+        data_start = _align(len(MAGIC) + 8 + len(header))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for entry, arr in zip(entries, arrays):
+                f.seek(data_start + entry['offset'])
+                f.write(arr.tobytes())
+        os.replace(tmp_path, path)
+
+        self.path = path
+        self.hash = file_hash(path)
+        logger.info(f"Bundle saved: {path} ({os.path.getsize(path) / 1024:.0f} KB, {self.version})")
+        return self.hash
+
+    @classmethod
+    def load(cls, path: str, expected_hash: Optional[str] = None, verify: bool = False) -> 'ModelBundle':
+        """
+        Load bundle; weights di-memmap (tidak dibaca sampai dipakai)
+
+        expected_hash dari manifest registry dipakai apa adanya (file sudah
+        diverifikasi saat publish / merge); sha256 seluruh file hanya dihitung
+        kalau verify=True atau hash belum diketahui
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a model bundle: {path}")
+            (header_len,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_len))
+
+        data_start = _align(len(MAGIC) + 8 + header_len)
+
+        weights = []
+        for entry in header['arrays']:
+            shape = tuple(entry['shape'])
+            if int(np.prod(shape)) == 0:
+                weights.append(np.zeros(shape, dtype=entry['dtype']))
+                continue
+            weights.append(np.memmap(
+                path, dtype=np.dtype(entry['dtype']), mode='r',
+                offset=data_start + entry['offset'], shape=shape
+            ))
+
+        bundle_hash = expected_hash
+        if verify or bundle_hash is None:
+            bundle_hash = file_hash(path)
+            if expected_hash and bundle_hash != expected_hash:
+                raise ValueError(f"Bundle hash mismatch: {path}")
+
+        return cls(
+            weights=weights,
+            model_config=header['model_config'],
+            scaler=header['scaler'],
+            features=header['features'],
+            metadata=header.get('metadata', {}),
+            path=path,
+            hash=bundle_hash
+        )
+
+    def build_model(self):
+        """Keras model dari config + weights (float16 di-cast ke float32)"""
+        from tensorflow.keras.models import model_from_json
+
+        model = model_from_json(self.model_config)
+        model.set_weights([
+            np.asarray(w, dtype=np.float32) if w.dtype != np.float32 else w
+            for w in self.weights
+        ])
+        return model
+
+    def build_inference_model(self):
+        """TreeEnsemble (backend gbm), NumpySequential kalau arsitektur didukung, selain itu Keras model"""
+        if json.loads(self.model_config).get('class_name') == 'TreeEnsemble':
+            from src.models.gbm import TreeEnsemble
+            return TreeEnsemble(self.weights, json.loads(self.model_config))
+
+        try:
+            return NumpySequential(self.model_config, self.weights)
+        except NotImplementedError as e:
+            logger.info(f"NumPy inference not supported ({e}), using Keras")
+            return self.build_model()
+
+    def build_scaler(self, symbol: Optional[str] = None):
+        """Scaler bundle (model global: scaler milik symbol)"""
+        from src.models.lstm_model import build_scaler
+
+        params = self.scaler
+        if 'symbols' in params:
+            if symbol not in params['symbols']:
+                raise KeyError(f"Symbol {symbol} not in bundle")
+            params = params['symbols'][symbol]
+
+        return build_scaler(
+            params['data_min'],
+            params['data_max'],
+            feature_range=tuple(params['feature_range']),
+            n_samples=params.get('n_samples')
+        )
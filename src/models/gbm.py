@@ -0,0 +1,245 @@
+"""
+Gradient boosting backend: HistGradientBoosting di atas window features
+
+Window (seq, F) yang sama dengan LSTM diringkas jadi feature tabular
+(nilai terakhir, lag delta, statistik window). Setelah training, tree
+ensemble diekspor ke array node datar (TreeEnsemble) yang disimpan di
+ModelBundle biasa dan dievaluasi dengan NumPy: inference tanpa Keras /
+sklearn, < 1 ms per window.
+"""
+
+import json
+import logging
+import time
+from typing import List
+
+import numpy as np
+
+from src.features.registry import MODEL_FEATURES
+from src.models.backends import ModelBackend
+from src.models.bundle import _softmax
+
+logger = logging.getLogger(__name__)
+
+LAGS = (1, 2, 4, 8, 24)
+
+DEFAULT_GBM_HPARAMS = {
+    'max_iter': 300,
+    'learning_rate': 0.05,
+    'max_leaf_nodes': 31,
+    'max_depth': 8,
+    'min_samples_leaf': 40,
+    'l2_regularization': 1.0,
+}
+
+
+def window_features(X: np.ndarray, lags=LAGS) -> np.ndarray:
+    """
+    (B, seq, F) windows -> (B, n_features) feature tabular
+
+    Per feature: nilai terakhir, delta terhadap lag, mean / std / min / max
+    window dan posisi nilai terakhir di range window.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    last = X[:, -1, :]
+    lags = [lag for lag in lags if lag < X.shape[1]]
+
+    lo = X.min(axis=1)
+    hi = X.max(axis=1)
+    span = hi - lo
+    position = np.divide(last - lo, span, out=np.full_like(last, 0.5), where=span > 0)
+
+    parts = [last]
+    parts += [last - X[:, -1 - lag, :] for lag in lags]
+    parts += [X.mean(axis=1), X.std(axis=1), lo, hi, position]
+    return np.concatenate(parts, axis=1)
+
+
+def _log_loss(proba: np.ndarray, y: np.ndarray) -> float:
+    return float(-np.log(np.clip(proba[np.arange(len(y)), y], 1e-7, 1.0)).mean())
+
+
+class TreeEnsemble:
+    """
+    Evaluasi HistGradientBoostingClassifier dari array node datar
+
+    Semua tree di-pad ke jumlah node yang sama, lalu ditelusuri bersamaan
+    (sample x tree) sebanyak max_depth langkah.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'missing_left', 'is_leaf', 'value', 'baseline')
+
+    def __init__(self, arrays: List[np.ndarray], config: dict):
+        for name, arr in zip(self.ARRAYS, arrays):
+            setattr(self, name, np.asarray(arr))
+        self.config = config
+        self.n_classes = config['n_classes']
+        self.classes = config['classes']
+        self.max_depth = config['max_depth']
+        self.lags = tuple(config.get('lags', LAGS))
+
+        # Index node datar (tree * n_nodes + node); leaf menunjuk ke dirinya
+        # sendiri, jadi traversal cukup max_depth langkah tanpa cek leaf
+        n_trees, n_nodes = self.feature.shape
+        flat = np.arange(n_trees * n_nodes, dtype=np.int64).reshape(n_trees, n_nodes)
+        offset = flat[:, :1]
+        leaf = self.is_leaf == 1
+        self._left = np.where(leaf, flat, self.left + offset).ravel()
+        self._right = np.where(leaf, flat, self.right + offset).ravel()
+        self._feature = self.feature.astype(np.int64).ravel()
+        self._threshold = np.asarray(self.threshold, dtype=np.float64).ravel()
+        self._missing_left = (self.missing_left == 1).ravel()
+        self._value = np.asarray(self.value, dtype=np.float64).ravel()
+        self._roots = offset.ravel()
+
+    @classmethod
+    def from_sklearn(cls, clf, n_iter=None, lags=LAGS) -> 'TreeEnsemble':
+        """Export tree ensemble (n_iter = hanya n iterasi boosting pertama)"""
+        predictors = [p for iteration in clf._predictors[:n_iter] for p in iteration]
+        n_nodes = max(len(p.nodes) for p in predictors)
+        n_trees = len(predictors)
+
+        def padded(field, dtype, fill=0):
+            out = np.full((n_trees, n_nodes), fill, dtype=dtype)
+            for t, p in enumerate(predictors):
+                out[t, :len(p.nodes)] = p.nodes[field]
+            return out
+
+        arrays = [
+            padded('feature_idx', np.int32),
+            padded('num_threshold', np.float64),
+            padded('left', np.int32),
+            padded('right', np.int32),
+            padded('missing_go_to_left', np.uint8),
+            padded('is_leaf', np.uint8, fill=1),
+            padded('value', np.float64),
+            np.asarray(clf._baseline_prediction, dtype=np.float64).ravel(),
+        ]
+        config = {
+            'class_name': 'TreeEnsemble',
+            'n_classes': int(clf.n_trees_per_iteration_),
+            'classes': [int(c) for c in clf.classes_],
+            'max_depth': int(max(p.get_max_depth() for p in predictors)),
+            'lags': list(lags),
+        }
+        return cls(arrays, config)
+
+    def weights(self) -> List[np.ndarray]:
+        return [getattr(self, name) for name in self.ARRAYS]
+
+    def raw_predict(self, features: np.ndarray) -> np.ndarray:
+        """Jumlah leaf value semua tree + baseline: (n, n_trees_per_iteration)"""
+        features = np.asarray(features, dtype=np.float64)
+        n = len(features)
+        has_nan = np.isnan(features).any()
+        row_offset = (np.arange(n) * features.shape[1])[:, None]
+        features = features.ravel()
+        node = np.broadcast_to(self._roots, (n, len(self._roots)))
+
+        for _ in range(self.max_depth):
+            x = features[row_offset + self._feature[node]]
+            go_left = x <= self._threshold[node]
+            if has_nan:
+                go_left |= np.isnan(x) & self._missing_left[node]
+            node = np.where(go_left, self._left[node], self._right[node])
+
+        values = self._value[node]
+        return values.reshape(n, -1, self.n_classes).sum(axis=1) + self.baseline[None, :]
+
+    def predict(self, X, verbose=0):
+        """Interface sama dengan Keras: windows (B, seq, F) -> probabilities (B, 3)"""
+        return self.proba(self.raw_predict(window_features(X, self.lags)))
+
+    def proba(self, raw: np.ndarray) -> np.ndarray:
+        """Raw score -> probabilities (n, 3); kelas yang tidak ada saat training = 0"""
+        raw = np.asarray(raw).reshape(len(raw), -1)
+        if self.n_classes == 1:
+            p = 1 / (1 + np.exp(-raw[:, 0]))
+            proba = np.stack([1 - p, p], axis=1)
+        else:
+            proba = _softmax(raw)
+
+        out = np.zeros((len(proba), 3), dtype=np.float32)
+        out[:, self.classes] = proba
+        return out
+
+
+class GradientBoostingBackend(ModelBackend):
+    """HistGradientBoostingClassifier sebagai model backend"""
+
+    name = 'gbm'
+    algorithm = 'GBM'
+    DEFAULT_HPARAMS = DEFAULT_GBM_HPARAMS
+
+    # Window features dihitung per chunk supaya memmap tidak dibaca sekaligus
+    CHUNK = 16384
+    PATIENCE = 20
+
+    def __init__(self, sequence_length=60, hparams=None, performance=None, label_method=None):
+        super().__init__(sequence_length, hparams, performance, label_method)
+        self.ensemble = None
+
+    def features(self, X) -> np.ndarray:
+        return np.concatenate([
+            window_features(X[start:start + self.CHUNK])
+            for start in range(0, max(len(X), 1), self.CHUNK)
+        ])
+
+    def fit(self, X_train, y_train, X_val, y_val, epochs=100) -> int:
+        """
+        Boosting per blok PATIENCE iterasi (warm start) sampai val loss tidak
+        turun lagi atau hparams['max_iter'], lalu potong di iterasi dengan
+        val loss terendah (setara EarlyStopping restore_best_weights LSTM)
+
+        epochs tidak dipakai.
+        """
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        start = time.perf_counter()
+        hparams = dict(self.hparams)
+        max_iter = hparams.pop('max_iter')
+        features, y_train = self.features(X_train), np.asarray(y_train)
+        val_features, y_val = self.features(X_val), np.asarray(y_val)
+
+        clf = HistGradientBoostingClassifier(**hparams, max_iter=min(self.PATIENCE, max_iter),
+                                             early_stopping=False, warm_start=True, random_state=42)
+        best_loss = np.inf
+        while True:
+            clf.fit(features, y_train)
+            if len(y_val):
+                raw = clf.decision_function(val_features)
+                loss = _log_loss(TreeEnsemble.from_sklearn(clf).proba(raw), y_val)
+                if loss >= best_loss:
+                    break
+                best_loss = loss
+            if clf.max_iter >= max_iter:
+                break
+            clf.set_params(max_iter=min(clf.max_iter + self.PATIENCE, max_iter))
+
+        best = clf.n_iter_
+        if len(y_val):
+            ensemble = TreeEnsemble.from_sklearn(clf)
+            losses = [_log_loss(ensemble.proba(raw), y_val) for raw in clf.staged_decision_function(val_features)]
+            best = int(np.argmin(losses)) + 1
+
+        self.ensemble = TreeEnsemble.from_sklearn(clf, n_iter=best)
+        self.profile = {'train_seconds': round(time.perf_counter() - start, 3), 'iterations': best}
+        logger.info(f"GBM: {best}/{clf.n_iter_} iterations, {len(self.ensemble.feature)} trees "
+                    f"({self.profile['train_seconds']}s)")
+        return best
+
+    def predict(self, X) -> np.ndarray:
+        if self.ensemble is None:
+            raise ValueError("Model not trained yet")
+        return self.ensemble.predict(X)
+
+    def to_bundle(self, metadata=None):
+        from src.models.bundle import ModelBundle
+
+        return ModelBundle(
+            weights=self.ensemble.weights(),
+            model_config=json.dumps(self.ensemble.config),
+            scaler=ModelBundle._scaler_params(self.scaler),
+            features=list(MODEL_FEATURES),
+            metadata=self.bundle_metadata(metadata)
+        )
@@ -0,0 +1,151 @@
+"""
+Model global: 1 LSTM untuk semua symbol
+
+Setiap symbol tetap di-scale dengan scaler-nya sendiri (WindowDataset per
+symbol). Identitas symbol masuk sebagai channel one-hot di setiap
+timestep; bobot LSTM pertama untuk channel itu berfungsi sebagai
+embedding symbol. Model tetap Sequential biasa, jadi bundle + inference
+NumPy yang sama dipakai, dan 1 forward pass menghasilkan prediksi untuk
+semua symbol. Disimpan di registry dengan key GLOBAL_H1.
+"""
+
+import math
+import logging
+from typing import Dict, List
+
+import numpy as np
+from tensorflow.keras.utils import Sequence
+
+from src.models.lstm_model import FEATURE_COLS, TradingLSTM
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SYMBOL = 'GLOBAL'
+
+
+def add_symbol_channels(X: np.ndarray, symbol_ids, n_symbols: int) -> np.ndarray:
+    """(B, seq, F) + one-hot symbol di setiap timestep -> (B, seq, F + n_symbols)"""
+    X = np.asarray(X, dtype=np.float32)
+    onehot = np.eye(n_symbols, dtype=np.float32)[np.asarray(symbol_ids)]
+    onehot = np.broadcast_to(onehot[:, None, :], (X.shape[0], X.shape[1], n_symbols))
+    return np.concatenate([X, onehot], axis=2)
+
+
+class GlobalBatches(Sequence):
+    """Batch campuran semua symbol, dibaca dari WindowDataset memmap"""
+
+    def __init__(self, parts: List[tuple], n_symbols: int, batch_size: int,
+                 shuffle: bool = True, seed: int = 0):
+        """
+        Args:
+            parts: list (symbol_id, X view, y) per symbol
+        """
+        super().__init__()
+        self.parts = parts
+        self.n_symbols = n_symbols
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+
+        self.part_of = np.concatenate([np.full(len(y), p, dtype=np.int32) for p, (_, _, y) in enumerate(parts)])
+        self.row_of = np.concatenate([np.arange(len(y), dtype=np.int64) for _, _, y in parts])
+        self.order = np.arange(len(self.part_of))
+        self.on_epoch_end()
+
+    @property
+    def n_samples(self) -> int:
+        return len(self.order)
+
+    @property
+    def input_shape(self):
+        _, X, _ = self.parts[0]
+        return X.shape[1], X.shape[2] + self.n_symbols
+
+    def __len__(self):
+        return math.ceil(len(self.order) / self.batch_size)
+
+    def __getitem__(self, i):
+        sel = self.order[i * self.batch_size:(i + 1) * self.batch_size]
+        # Urutkan per symbol + row supaya baca memmap berurutan
+        sel = sel[np.lexsort((self.row_of[sel], self.part_of[sel]))]
+
+        X, y, ids = [], [], []
+        for p in np.unique(self.part_of[sel]):
+            rows = self.row_of[sel][self.part_of[sel] == p]
+            symbol_id, Xp, yp = self.parts[p]
+            X.append(np.asarray(Xp[rows]))
+            y.append(np.asarray(yp[rows]))
+            ids.append(np.full(len(rows), symbol_id))
+
+        return add_symbol_channels(np.concatenate(X), np.concatenate(ids), self.n_symbols), np.concatenate(y)
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.order)
+
+
+class GlobalLSTM(TradingLSTM):
+    """TradingLSTM yang dilatih di semua symbol sekaligus"""
+
+    def __init__(self, symbols: List[str], sequence_length=60, hparams=None, performance=None, label_method=None):
+        super().__init__(sequence_length, hparams=hparams, performance=performance, label_method=label_method)
+        self.symbols = list(symbols)
+        self.scalers = {}
+
+    def symbol_id(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def batches(self, datasets: Dict[str, object], test_size: float = 0.2):
+        """
+        GlobalBatches train / test dari WindowDataset per symbol
+
+        Split urut waktu per symbol (sama dengan model per symbol)
+        """
+        train_parts, test_parts = [], []
+        for symbol in self.symbols:
+            X_train, X_test, y_train, y_test = datasets[symbol].split(test_size=test_size)
+            train_parts.append((self.symbol_id(symbol), X_train, y_train))
+            test_parts.append((self.symbol_id(symbol), X_test, y_test))
+
+        batch_size = self.hparams['batch_size']
+        return (
+            GlobalBatches(train_parts, len(self.symbols), batch_size, shuffle=True),
+            GlobalBatches(test_parts, len(self.symbols), batch_size, shuffle=False),
+        )
+
+    def fit_datasets(self, datasets: Dict[str, object], epochs=100, patience=10, test_size: float = 0.2):
+        """Train di semua symbol; returns (history, test_batches)"""
+        self.scalers = {s: datasets[s].build_scaler() for s in self.symbols}
+        train, test = self.batches(datasets, test_size)
+
+        logger.info(f"Global model: {len(self.symbols)} symbols, "
+                    f"Train: {train.n_samples}, Test: {test.n_samples}")
+
+        history = self.train(train, None, test, None, epochs=epochs, patience=patience)
+        return history, test
+
+    def evaluate_symbols(self, datasets: Dict[str, object], test_size: float = 0.2) -> dict:
+        """Test loss / accuracy per symbol"""
+        metrics = {}
+        for symbol in self.symbols:
+            _, X_test, _, y_test = datasets[symbol].split(test_size=test_size)
+            if len(y_test) == 0:
+                continue
+            part = GlobalBatches([(self.symbol_id(symbol), X_test, y_test)], len(self.symbols),
+                                 self.hparams['batch_size'], shuffle=False)
+            loss, acc = self.model.evaluate(part, verbose=0)
+            metrics[symbol] = {'test_accuracy': float(acc), 'test_loss': float(loss)}
+        return metrics
+
+    def to_bundle(self, metadata=None):
+        """ModelBundle dengan scaler per symbol + daftar symbol (urutan channel)"""
+        from src.models.bundle import ModelBundle
+
+        metadata = dict(metadata or {})
+        metadata.setdefault('sequence_length', self.sequence_length)
+        metadata.setdefault('hparams', self.hparams)
+        metadata.setdefault('label_method', self.label_method)
+        metadata.setdefault('backend', 'lstm')
+        metadata.setdefault('algorithm', 'LSTM')
+        metadata['symbols'] = self.symbols
+        return ModelBundle.from_model(self.model, self.scalers, FEATURE_COLS, metadata)
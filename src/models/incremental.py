@@ -0,0 +1,115 @@
+"""
+Incremental retraining: skip kalau data tidak berubah, warm-start kalau bertambah
+
+Fingerprint data training disimpan di metadata bundle. Run berikutnya:
+- fingerprint sama             -> skip
+- ada bundle lama yang cocok   -> fine-tune beberapa epoch di bar baru,
+                                  diterima kalau holdout loss tidak memburuk
+- selain itu                   -> full retrain
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def data_fingerprint(panel, symbol: str, features) -> dict:
+    """Hash timestamps + feature values (bar valid) untuk 1 symbol"""
+    i = panel.symbol_index(symbol)
+    valid = panel.valid_mask(features)[i]
+    idx = [panel.fields.index(f) for f in features]
+
+    timestamps = panel.timestamps.asi8[valid]
+    values = np.ascontiguousarray(panel.values[i][valid][:, idx])
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(','.join(features).encode())
+    h.update(timestamps.tobytes())
+    h.update(values.tobytes())
+
+    return {
+        'data_fingerprint': h.hexdigest(),
+        'n_rows': int(valid.sum()),
+        'last_timestamp': str(panel.timestamps[valid][-1]) if valid.any() else None,
+    }
+
+
+def combine_fingerprints(infos: dict) -> dict:
+    """Fingerprint gabungan beberapa symbol (model global)"""
+    h = hashlib.blake2b(digest_size=16)
+    for symbol in sorted(infos):
+        h.update(f"{symbol}:{infos[symbol]['data_fingerprint']};".encode())
+
+    return {
+        'data_fingerprint': h.hexdigest(),
+        'n_rows': sum(info['n_rows'] for info in infos.values()),
+        'last_timestamp': max((info['last_timestamp'] for info in infos.values() if info['last_timestamp']), default=None),
+    }
+
+
+class IncrementalTrainer:
+    """Keputusan skip / fine-tune / full + fine-tune dengan holdout check"""
+
+    def __init__(self, epochs: int = 5, replay: int = 500, tolerance: float = 0.02,
+                 learning_rate: float = 1e-4, max_new_fraction: float = 0.25):
+        self.epochs = epochs
+        self.replay = replay
+        self.tolerance = tolerance
+        self.learning_rate = learning_rate
+        self.max_new_fraction = max_new_fraction
+
+    def plan(self, info: dict, previous) -> str:
+        """
+        Returns:
+            'skip', 'finetune' atau 'full'
+        """
+        if previous is None:
+            return 'full'
+
+        meta = previous.metadata
+        if meta.get('data_fingerprint') == info['data_fingerprint']:
+            return 'skip'
+
+        prev_rows = meta.get('n_rows')
+        if not prev_rows or 'n_train' not in meta:
+            return 'full'
+
+        new_rows = info['n_rows'] - prev_rows
+        if new_rows <= 0 or new_rows > self.max_new_fraction * prev_rows:
+            # History berubah / menyusut, atau terlalu banyak data baru
+            return 'full'
+
+        return 'finetune'
+
+    def finetune(self, lstm, prev_n_train: int, X_train, y_train, X_test, y_test) -> Optional[dict]:
+        """
+        Fine-tune lstm (weights bundle lama) di window train yang baru + replay
+
+        Returns:
+            metrics dict kalau diterima, None kalau holdout memburuk
+        """
+        prev_loss, prev_acc = lstm.model.evaluate(X_test, y_test, verbose=0)
+
+        start = max(0, prev_n_train - self.replay)
+        X_new, y_new = X_train[start:], y_train[start:]
+        logger.info(f"Fine-tune on {len(X_new)} windows ({len(X_train) - prev_n_train} new)")
+
+        lstm.compile_model(learning_rate=self.learning_rate)
+        history = lstm.train(X_new, y_new, X_test, y_test, epochs=self.epochs, patience=2)
+
+        test_loss, test_acc = lstm.model.evaluate(X_test, y_test, verbose=0)
+        logger.info(f"Holdout loss: previous {prev_loss:.4f} -> fine-tuned {test_loss:.4f}")
+
+        if test_loss > prev_loss * (1 + self.tolerance):
+            logger.warning("Fine-tune rejected: holdout loss worse than previous model")
+            return None
+
+        return {
+            'test_accuracy': float(test_acc),
+            'test_loss': float(test_loss),
+            'epochs': len(history.history['loss']),
+        }
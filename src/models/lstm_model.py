@@ -11,49 +11,126 @@ from sklearn.preprocessing import MinMaxScaler
 import joblib
 import logging
 
+from src.features.labels import make_labels
+from src.features.registry import MODEL_FEATURES
+from src.models.backends import ModelBackend
+from src.utils.config import config
+from src.utils.profiling import track_allocations
+
 logger = logging.getLogger(__name__)
 
+FEATURE_COLS = list(MODEL_FEATURES)
+
+# Arsitektur + training default (override lewat hparams, mis. hasil tuning)
+DEFAULT_HPARAMS = {
+    'lstm_units': [128, 64, 32],
+    'lstm_dropout': 0.3,
+    'dense_units': [64, 32],
+    'dense_dropout': 0.2,
+    'learning_rate': None,  # None = default Adam
+    'batch_size': config.BATCH_SIZE,
+}
+
+
+def build_scaler(data_min, data_max, feature_range=(0, 1), n_samples=None):
+    """MinMaxScaler yang sudah 'fitted' dari min/max per feature"""
+    data_min = np.asarray(data_min, dtype=np.float64)
+    data_max = np.asarray(data_max, dtype=np.float64)
+    data_range = data_max - data_min
+    
+    scaler = MinMaxScaler(feature_range=feature_range)
+    scaler.data_min_ = data_min
+    scaler.data_max_ = data_max
+    scaler.data_range_ = data_range
+    scaler.scale_ = (feature_range[1] - feature_range[0]) / np.where(data_range == 0, 1.0, data_range)
+    scaler.min_ = feature_range[0] - data_min * scaler.scale_
+    scaler.n_features_in_ = len(data_min)
+    scaler.n_samples_seen_ = n_samples
+    return scaler
+
+
+def make_windows(scaled: np.ndarray, labels: np.ndarray, sequence_length: int):
+    """
+    Sliding windows + label per bar
+
+    Window ke-k = scaled[k:k+seq] dengan label bar terakhirnya labels[k+seq-1];
+    window dengan label INVALID (future belum lengkap) dibuang.
+    """
+    n_features = scaled.shape[1]
+    windows = np.lib.stride_tricks.sliding_window_view(
+        scaled, (sequence_length, n_features)
+    )[:, 0]
+    y = np.asarray(labels[sequence_length - 1:])
+    keep = y >= 0
+    
+    # Label: BUY (2), HOLD (1), SELL (0)
+    X = np.ascontiguousarray(windows[keep])
+    y = y[keep].astype(np.int64)
+    
+    return X, y
+
 
 class TradingLSTM:
     """LSTM model untuk prediksi BUY/SELL/HOLD"""
     
-    def __init__(self, sequence_length=60):
+    def __init__(self, sequence_length=60, hparams=None, performance=None, label_method=None):
         self.sequence_length = sequence_length
+        self.hparams = {**DEFAULT_HPARAMS, **(hparams or {})}
+        self.label_method = label_method or config.LABEL_METHOD
         self.model = None
         self.scaler = MinMaxScaler()
         
+        # Performance mode: XLA, thread pool, float32 end-to-end, profiling per epoch
+        self.performance = config.TRAIN_PERF_MODE if performance is None else performance
+        self.profile = None
+        if self.performance:
+            from src.models.performance import configure_threads
+            configure_threads(config.TF_INTRA_OP_THREADS, config.TF_INTER_OP_THREADS)
+        
     def build_model(self, input_shape):
-        """Build LSTM architecture"""
-        model = Sequential([
-            LSTM(128, return_sequences=True, input_shape=input_shape),
-            Dropout(0.3),
-            LSTM(64, return_sequences=True),
-            Dropout(0.3),
-            LSTM(32),
-            Dropout(0.3),
-            Dense(64, activation='relu'),
-            Dropout(0.2),
-            Dense(32, activation='relu'),
-            Dense(3, activation='softmax')  # BUY, HOLD, SELL
-        ])
-        
-        model.compile(
-            optimizer='adam',
+        """Build LSTM architecture dari self.hparams"""
+        hp = self.hparams
+        lstm_units = list(hp['lstm_units'])
+        dense_units = list(hp['dense_units'])
+        
+        layers = []
+        for i, units in enumerate(lstm_units):
+            kwargs = {'input_shape': input_shape} if i == 0 else {}
+            layers.append(LSTM(units, return_sequences=i < len(lstm_units) - 1, **kwargs))
+            layers.append(Dropout(hp['lstm_dropout']))
+        
+        for i, units in enumerate(dense_units):
+            layers.append(Dense(units, activation='relu'))
+            # Dropout hanya setelah dense pertama (sama dengan arsitektur awal)
+            if i == 0 and len(dense_units) > 1:
+                layers.append(Dropout(hp['dense_dropout']))
+        
+        layers.append(Dense(3, activation='softmax'))  # BUY, HOLD, SELL
+        self.model = Sequential(layers)
+        
+        return self.compile_model(hp['learning_rate'])
+    
+    def compile_model(self, learning_rate=None):
+        """Compile model (learning_rate kecil untuk fine-tune)"""
+        from tensorflow.keras.optimizers import Adam
+        
+        optimizer = Adam(learning_rate=learning_rate) if learning_rate else 'adam'
+        
+        self.model.compile(
+            optimizer=optimizer,
             loss='sparse_categorical_crossentropy',
-            metrics=['accuracy']
+            metrics=['accuracy'],
+            jit_compile=bool(self.performance and config.TRAIN_JIT_COMPILE)
         )
         
-        self.model = model
-        return model
+        return self.model
     
+    @track_allocations()
     def prepare_data(self, df: pd.DataFrame):
         """Prepare data untuk training"""
         
         # Features untuk training
-        feature_cols = [
-            'close', 'rsi_14', 'macd', 'macd_signal', 
-            'ema_20', 'ema_50', 'ema_200', 'atr_14'
-        ]
+        feature_cols = FEATURE_COLS
         
         # Drop rows dengan NaN
         df = df.dropna(subset=feature_cols)
@@ -62,59 +139,161 @@ class TradingLSTM:
             logger.error(f"Not enough data: {len(df)} rows")
             return None, None
         
-        # Extract features
+        # Extract features (float32 di performance mode, scaler ikut float32)
         data = df[feature_cols].values
+        if self.performance:
+            data = data.astype(np.float32)
         
         # Scale data
         scaled_data = self.scaler.fit_transform(data)
         
         # Create sequences
-        X, y = [], []
+        labels = make_labels(
+            self.label_method, df['close'].values, df.get('high'), df.get('low'), df['atr_14'].values,
+            horizon=config.LABEL_HORIZON, threshold=config.LABEL_THRESHOLD
+        )
+        X, y = make_windows(scaled_data, labels, self.sequence_length)
         
-        for i in range(self.sequence_length, len(scaled_data)):
-            X.append(scaled_data[i-self.sequence_length:i])
-            
-            # Label: BUY (2) if price up, SELL (0) if price down, HOLD (1) otherwise
-            price_change = (df['close'].iloc[i] - df['close'].iloc[i-1]) / df['close'].iloc[i-1]
+        logger.info(f"Prepared {len(X)} sequences")
+        logger.info(f"  BUY: {np.sum(y == 2)}, HOLD: {np.sum(y == 1)}, SELL: {np.sum(y == 0)}")
+        
+        return X, y
+    
+    @staticmethod
+    def panel_arrays(panel, scalers=None, symbols=None, label_method=None, min_rows=0):
+        """
+        Feature scaled + label per bar untuk setiap symbol di OHLCPanel
+        
+        Args:
+            scalers: optional dict symbol -> fitted scaler yang dipakai ulang
+                (mis. fine-tune model lama); symbol lain di-fit baru
+            symbols: optional subset symbol
+            label_method: 'next_bar', 'horizon' atau 'triple_barrier'
+                (default Config.LABEL_METHOD)
+            min_rows: symbol dengan bar valid lebih sedikit di-skip
+        
+        Returns:
+            dict symbol -> (timestamps int64 ns, scaled (n, F) float32, labels (n,) int8, scaler)
+        """
+        valid = panel.valid_mask(FEATURE_COLS)
+        idx = [panel.fields.index(f) for f in FEATURE_COLS]
+        
+        packed, counts = panel.pack(panel.values[:, :, idx], valid)
+        
+        # Min/max per symbol per feature (NaN di ekor diabaikan)
+        data_min = np.nanmin(packed, axis=1)
+        data_max = np.nanmax(packed, axis=1)
+        fixed = scalers or {}
+        scalers = [
+            fixed.get(symbol) or build_scaler(lo, hi, n_samples=int(n))
+            for symbol, lo, hi, n in zip(panel.symbols, data_min, data_max, counts)
+        ]
+        
+        scale = np.stack([sc.scale_ for sc in scalers]).astype(np.float32)
+        offset = np.stack([sc.min_ for sc in scalers]).astype(np.float32)
+        scaled = packed * scale[:, None, :] + offset[:, None, :]
+        
+        close = packed[:, :, FEATURE_COLS.index('close')].astype(np.float64)
+        atr = packed[:, :, FEATURE_COLS.index('atr_14')]
+        high, _ = panel.pack(panel.field('high'), valid)
+        low, _ = panel.pack(panel.field('low'), valid)
+        timestamps = panel.timestamps.asi8
+        label_method = label_method or config.LABEL_METHOD
+        
+        results = {}
+        for i, symbol in enumerate(panel.symbols):
+            if symbols is not None and symbol not in symbols:
+                continue
             
-            if price_change > 0.001:  # > 0.1% = BUY
-                label = 2
-            elif price_change < -0.001:  # < -0.1% = SELL
-                label = 0
-            else:  # HOLD
-                label = 1
+            n = int(counts[i])
+            if n < min_rows:
+                logger.error(f"{symbol}: Not enough data: {n} rows")
+                continue
             
-            y.append(label)
+            labels = make_labels(
+                label_method, close[i, :n], high[i, :n], low[i, :n], atr[i, :n],
+                horizon=config.LABEL_HORIZON, threshold=config.LABEL_THRESHOLD
+            )
+            results[symbol] = (timestamps[valid[i]], scaled[i, :n], labels, scalers[i])
         
-        X = np.array(X)
-        y = np.array(y)
+        return results
+    
+    @staticmethod
+    def prepare_panel(panel, sequence_length=60, scalers=None, symbols=None, label_method=None):
+        """
+        Prepare data untuk semua symbol di OHLCPanel sekaligus
         
-        logger.info(f"Prepared {len(X)} sequences")
-        logger.info(f"  BUY: {np.sum(y == 2)}, HOLD: {np.sum(y == 1)}, SELL: {np.sum(y == 0)}")
+        Args: lihat panel_arrays
         
-        return X, y
+        Returns:
+            dict symbol -> (X, y, scaler); symbol dengan data kurang di-skip
+        """
+        arrays = TradingLSTM.panel_arrays(
+            panel, scalers=scalers, symbols=symbols, label_method=label_method,
+            min_rows=sequence_length + 10
+        )
+        
+        results = {}
+        for symbol, (_, scaled, labels, scaler) in arrays.items():
+            X, y = make_windows(scaled, labels, sequence_length)
+            results[symbol] = (X, y, scaler)
+            
+            logger.info(f"{symbol}: Prepared {len(X)} sequences")
+            logger.info(f"  BUY: {np.sum(y == 2)}, HOLD: {np.sum(y == 1)}, SELL: {np.sum(y == 0)}")
+        
+        return results
     
-    def train(self, X_train, y_train, X_val, y_val, epochs=100):
-        """Train model"""
+    def train(self, X_train, y_train, X_val, y_val, epochs=100, patience=10):
+        """
+        Train model
+        
+        X_train / X_val boleh keras Sequence (batch + label) dengan y None,
+        mis. batch multi-symbol GlobalLSTM
+        """
+        
+        streamed = y_train is None
         
         if self.model is None:
-            self.build_model((X_train.shape[1], X_train.shape[2]))
+            shape = X_train.input_shape if streamed else X_train.shape[1:]
+            self.build_model((shape[0], shape[1]))
         
         early_stop = EarlyStopping(
             monitor='val_loss', 
-            patience=10, 
+            patience=patience, 
             restore_best_weights=True
         )
+        callbacks = [early_stop]
+        
+        profiler = None
+        if self.performance:
+            from src.models.performance import EpochProfiler
+            
+            if not streamed:
+                # Tanpa cast diam-diam ke float32 di dalam fit()
+                X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+                X_val = np.ascontiguousarray(X_val, dtype=np.float32)
+            profiler = EpochProfiler(len(X_train) if not streamed else X_train.n_samples)
+            callbacks.append(profiler)
+        
+        if streamed:
+            fit_args = {'x': X_train, 'validation_data': X_val}
+        else:
+            fit_args = {
+                'x': X_train, 'y': y_train,
+                'validation_data': (X_val, y_val),
+                'batch_size': self.hparams['batch_size'],
+            }
         
         history = self.model.fit(
-            X_train, y_train,
-            validation_data=(X_val, y_val),
+            **fit_args,
             epochs=epochs,
-            batch_size=32,
-            callbacks=[early_stop],
+            callbacks=callbacks,
             verbose=1
         )
         
+        if profiler is not None:
+            self.profile = profiler.summary()
+        
         return history
     
     def predict(self, X):
@@ -132,9 +311,63 @@ class TradingLSTM:
         logger.info(f"Model saved: {model_path}")
         logger.info(f"Scaler saved: {scaler_path}")
     
+    def to_bundle(self, metadata=None):
+        """ModelBundle (weights + scaler + feature spec) untuk registry"""
+        from src.models.bundle import ModelBundle
+        
+        metadata = dict(metadata or {})
+        metadata.setdefault('sequence_length', self.sequence_length)
+        metadata.setdefault('hparams', self.hparams)
+        metadata.setdefault('label_method', self.label_method)
+        metadata.setdefault('backend', 'lstm')
+        metadata.setdefault('algorithm', 'LSTM')
+        return ModelBundle.from_model(self.model, self.scaler, FEATURE_COLS, metadata)
+    
+    def load_bundle(self, bundle):
+        """Load model and scaler dari ModelBundle"""
+        if bundle.features != FEATURE_COLS:
+            raise ValueError(f"Bundle features {bundle.features} != {FEATURE_COLS}")
+        
+        self.model = bundle.build_model()
+        self.scaler = bundle.build_scaler()
+        self.compile_model()
+        self.sequence_length = bundle.metadata.get('sequence_length', self.sequence_length)
+        self.hparams = {**DEFAULT_HPARAMS, **bundle.metadata.get('hparams', {})}
+        self.label_method = bundle.metadata.get('label_method', 'next_bar')
+        logger.info(f"Model loaded: {bundle.path} ({bundle.version})")
+    
     def load(self, model_path, scaler_path):
         """Load model and scaler"""
         from tensorflow.keras.models import load_model
         self.model = load_model(model_path)
         self.scaler = joblib.load(scaler_path)
         logger.info(f"Model loaded: {model_path}")
+
+
+class LSTMBackend(ModelBackend):
+    """TradingLSTM sebagai model backend"""
+    
+    name = 'lstm'
+    algorithm = 'LSTM'
+    DEFAULT_HPARAMS = DEFAULT_HPARAMS
+    
+    def __init__(self, sequence_length=60, hparams=None, performance=None, label_method=None):
+        super().__init__(sequence_length, hparams, performance, label_method)
+        self.lstm = TradingLSTM(sequence_length, hparams=self.hparams, performance=self.performance,
+                                label_method=self.label_method)
+    
+    def fit(self, X_train, y_train, X_val, y_val, epochs=100) -> int:
+        history = self.lstm.train(X_train, y_train, X_val, y_val, epochs=epochs)
+        self.profile = self.lstm.profile
+        return len(history.history['loss'])
+    
+    def predict(self, X) -> np.ndarray:
+        return self.lstm.predict(X)
+    
+    def evaluate(self, X, y, batch_size: int = 4096):
+        loss, acc = self.lstm.model.evaluate(X, y, batch_size=batch_size, verbose=0)
+        return float(loss), float(acc)
+    
+    def to_bundle(self, metadata=None):
+        self.lstm.scaler = self.scaler
+        return self.lstm.to_bundle(self.bundle_metadata(metadata))
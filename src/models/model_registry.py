@@ -0,0 +1,143 @@
+"""
+Versioned model registry berbasis manifest
+
+    models/registry/manifest.json
+    models/registry/{key}-{hash12}.bundle
+
+Key = "{symbol}_{timeframe}". Manifest mencatat versi current dan riwayat
+versi (hash, file, metrics) per key. Training yang di-shard menulis ke
+salinan registry masing-masing; merge() menggabungkannya kembali.
+"""
+
+import json
+import os
+import shutil
+import logging
+from datetime import datetime
+from typing import Optional
+
+from src.models.bundle import ModelBundle, file_hash
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Publish / load ModelBundle lewat manifest"""
+
+    def __init__(self, root: str, keep: int = 3):
+        self.root = root
+        self.keep = keep
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.manifest = {'models': {}}
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+    @staticmethod
+    def key(symbol: str, timeframe: str = 'H1') -> str:
+        return f"{symbol}_{timeframe}"
+
+    def _save_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def current(self, key: str) -> Optional[dict]:
+        """Entry manifest untuk versi current (None kalau belum ada)"""
+        model = self.manifest['models'].get(key)
+        if not model:
+            return None
+        for entry in model['versions']:
+            if entry['hash'] == model['current']:
+                return entry
+        return None
+
+    def publish(self, key: str, bundle: ModelBundle, weights_dtype: str = 'float32') -> dict:
+        """Simpan bundle sebagai versi current untuk key"""
+        tmp_path = os.path.join(self.root, f"{key}.bundle.new")
+        bundle_hash = bundle.save(tmp_path, weights_dtype=weights_dtype)
+
+        filename = f"{key}-{bundle_hash[:12]}.bundle"
+        path = os.path.join(self.root, filename)
+        os.replace(tmp_path, path)
+        bundle.path = path
+
+        entry = {
+            'hash': bundle_hash,
+            'file': filename,
+            'size': os.path.getsize(path),
+            'weights_dtype': weights_dtype,
+            'created_at': datetime.utcnow().isoformat(),
+            'metrics': bundle.metadata.get('metrics', {}),
+        }
+
+        model = self.manifest['models'].setdefault(key, {'current': None, 'versions': []})
+        model['versions'] = [v for v in model['versions'] if v['hash'] != bundle_hash]
+        model['versions'].append(entry)
+        model['current'] = bundle_hash
+
+        # Retensi: hapus file versi lama
+        for stale in model['versions'][:-self.keep]:
+            stale_path = os.path.join(self.root, stale['file'])
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+        model['versions'] = model['versions'][-self.keep:]
+
+        self._save_manifest()
+        logger.info(f"Published {key}: {bundle.version}")
+        return entry
+
+    def load(self, key: str, verify: bool = False) -> Optional[ModelBundle]:
+        """
+        Load bundle current untuk key (None kalau belum ada)
+
+        Hash tidak dihitung ulang: file sudah diverifikasi saat publish / merge
+        """
+        entry = self.current(key)
+        if entry is None:
+            return None
+        return ModelBundle.load(
+            os.path.join(self.root, entry['file']), expected_hash=entry['hash'], verify=verify
+        )
+
+    def merge(self, other: 'ModelRegistry') -> list:
+        """
+        Ambil key yang versi current-nya lebih baru di registry lain (hasil
+        1 shard training; urutan merge tidak berpengaruh); bundle di-copy,
+        file versi yang sudah dibuang di registry lain ikut dihapus
+
+        Returns:
+            key yang di-update
+        """
+        merged = []
+        for key, model in other.manifest['models'].items():
+            mine = self.manifest['models'].get(key)
+            theirs, current = other.current(key), self.current(key)
+            if theirs is None or (current is not None and theirs['created_at'] <= current['created_at']):
+                continue
+
+            os.makedirs(self.root, exist_ok=True)
+            for entry in model['versions']:
+                path = os.path.join(self.root, entry['file'])
+                if not os.path.exists(path):
+                    shutil.copyfile(os.path.join(other.root, entry['file']), path)
+                    # Verifikasi sekali di sini supaya load() runtime tidak perlu hash ulang
+                    if file_hash(path) != entry['hash']:
+                        os.remove(path)
+                        raise ValueError(f"Bundle hash mismatch: {entry['file']}")
+
+            kept = {v['file'] for v in model['versions']}
+            for stale in (mine or {}).get('versions', []):
+                stale_path = os.path.join(self.root, stale['file'])
+                if stale['file'] not in kept and os.path.exists(stale_path):
+                    os.remove(stale_path)
+
+            self.manifest['models'][key] = model
+            merged.append(key)
+
+        if merged:
+            self._save_manifest()
+        return merged
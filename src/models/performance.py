@@ -0,0 +1,103 @@
+"""
+Training performance mode: thread pool TF + profiling per epoch
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+import logging
+from typing import Optional
+
+from tensorflow.keras.callbacks import Callback
+
+logger = logging.getLogger(__name__)
+
+
+def configure_threads(intra_op: int = 0, inter_op: int = 0):
+    """
+    Atur thread pool TF (0 = default TF)
+
+    Harus dipanggil sebelum op TF pertama dijalankan; setelah itu TF
+    menolak perubahan dan setting lama tetap dipakai.
+    """
+    import tensorflow as tf
+
+    try:
+        if intra_op:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        if inter_op:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError as e:
+        logger.warning(f"Cannot configure TF threads (runtime already initialized): {e}")
+
+    return (
+        tf.config.threading.get_intra_op_parallelism_threads(),
+        tf.config.threading.get_inter_op_parallelism_threads(),
+    )
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory proses ini (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class EpochProfiler(Callback):
+    """Catat waktu, samples/s dan peak RSS setiap epoch"""
+
+    def __init__(self, n_samples: int):
+        super().__init__()
+        self.n_samples = n_samples
+        self.epochs = []
+        self._start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._start
+        record = {
+            'epoch': epoch + 1,
+            'seconds': round(seconds, 3),
+            'samples_per_sec': round(self.n_samples / seconds, 1) if seconds > 0 else None,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        record.update({k: float(v) for k, v in (logs or {}).items()})
+        self.epochs.append(record)
+
+        logger.info(f"Epoch {record['epoch']}: {record['seconds']:.2f}s, "
+                    f"{record['samples_per_sec']} samples/s, peak RSS {record['peak_rss_mb']} MB")
+
+    def summary(self) -> dict:
+        """Ringkasan untuk run report"""
+        if not self.epochs:
+            return {'epochs': []}
+
+        seconds = [e['seconds'] for e in self.epochs]
+        # Epoch pertama termasuk tracing / kompilasi XLA
+        steady = seconds[1:] or seconds
+        return {
+            'n_samples': self.n_samples,
+            'total_seconds': round(sum(seconds), 3),
+            'first_epoch_seconds': seconds[0],
+            'mean_epoch_seconds': round(sum(steady) / len(steady), 3),
+            'samples_per_sec': round(self.n_samples * len(steady) / sum(steady), 1) if sum(steady) > 0 else None,
+            'peak_rss_mb': max(e['peak_rss_mb'] for e in self.epochs),
+            'epochs': self.epochs,
+        }
+
+
+def write_report(path: str, report: dict, settings: Optional[dict] = None):
+    """Tulis run report JSON (atomic)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'settings': settings or {}, 'symbols': report}, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+    logger.info(f"Run report: {path}")
@@ -0,0 +1,228 @@
+"""
+Hyperparameter search TradingLSTM: successive halving paralel
+
+Worker membaca WindowDataset symbol (memmap) yang sama dengan training,
+jadi windows tidak di-pickle / dicopy per trial. Semua trial mulai dengan
+budget epoch kecil; di setiap rung hanya 1/eta trial terbaik (val_loss)
+yang lanjut dengan budget eta kali lebih besar, melanjutkan weights dan
+state optimizer dari checkpoint rung sebelumnya.
+"""
+
+import json
+import math
+import multiprocessing
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SPACE = {
+    'lstm_units': [[64, 32], [128, 64], [64, 64, 32], [128, 64, 32]],
+    'lstm_dropout': [0.1, 0.2, 0.3],
+    'dense_units': [[32], [64, 32]],
+    'dense_dropout': [0.1, 0.2],
+    'learning_rate': [3e-4, 1e-3, 3e-3],
+    'batch_size': [32, 64, 128],
+}
+
+
+def sample_configs(n: int, space: Dict[str, list] = None, seed: int = 42) -> List[dict]:
+    """n kombinasi hparams acak (unik) dari search space"""
+    space = space or SEARCH_SPACE
+    rng = np.random.default_rng(seed)
+    total = math.prod(len(v) for v in space.values())
+
+    configs, seen = [], set()
+    while len(configs) < min(n, total):
+        hp = {k: v[rng.integers(len(v))] for k, v in space.items()}
+        key = json.dumps(hp, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(hp)
+    return configs
+
+
+def _init_worker(threads: int):
+    """Batasi thread TF per worker supaya worker tidak saling rebut core"""
+    from src.models.performance import configure_threads
+
+    configure_threads(threads, 1)
+
+
+def _memmap_batches(X, y, batch_size: int, shuffle: bool, seed: int = 0):
+    """keras Sequence yang membaca batch langsung dari memmap"""
+    from tensorflow.keras.utils import Sequence
+
+    class Batches(Sequence):
+        def __init__(self):
+            super().__init__()
+            self.order = np.arange(len(X))
+            self.rng = np.random.default_rng(seed)
+            self.on_epoch_end()
+
+        def __len__(self):
+            return math.ceil(len(X) / batch_size)
+
+        def __getitem__(self, i):
+            idx = np.sort(self.order[i * batch_size:(i + 1) * batch_size])
+            return np.asarray(X[idx]), np.asarray(y[idx])
+
+        def on_epoch_end(self):
+            if shuffle:
+                self.rng.shuffle(self.order)
+
+    return Batches()
+
+
+def _run_trial(dataset_root: str, symbol: str, test_size: float, val_size: float, checkpoint_dir: str,
+               trial_id: int, hparams: dict, initial_epoch: int, epochs: int) -> dict:
+    """Train 1 trial dari initial_epoch sampai epochs (dijalankan di worker)"""
+    import tensorflow as tf
+
+    from src.models.lstm_model import TradingLSTM
+    from src.models.window_dataset import WindowDataset
+
+    dataset = WindowDataset(dataset_root, symbol)
+    # Val dari bagian train saja; test set train_model.py tidak ikut memilih hparams
+    X_train, X_val, y_train, y_val = dataset.validation_split(test_size=test_size, val_size=val_size)
+
+    lstm = TradingLSTM(sequence_length=dataset.sequence_length, hparams=hparams)
+    lstm.build_model((X_train.shape[1], X_train.shape[2]))
+
+    # Weights + state Adam (moment, iterations): rung berikutnya melanjutkan
+    # optimizer yang sama, bukan mulai dari moment nol
+    optimizer = lstm.model.optimizer
+    optimizer.build(lstm.model.trainable_variables)
+    checkpoint = tf.train.Checkpoint(model=lstm.model, optimizer=optimizer)
+    checkpoint_path = os.path.join(checkpoint_dir, f"trial_{trial_id}")
+    if initial_epoch > 0 and os.path.exists(f"{checkpoint_path}.index"):
+        checkpoint.read(checkpoint_path).assert_consumed()
+
+    batch_size = lstm.hparams['batch_size']
+    history = lstm.model.fit(
+        _memmap_batches(X_train, y_train, batch_size, shuffle=True, seed=trial_id),
+        validation_data=_memmap_batches(X_val, y_val, batch_size, shuffle=False),
+        epochs=epochs,
+        initial_epoch=initial_epoch,
+        verbose=0
+    )
+
+    checkpoint.write(checkpoint_path)
+
+    return {
+        'trial': trial_id,
+        'hparams': hparams,
+        'epochs': epochs,
+        'val_loss': float(np.min(history.history['val_loss'])),
+        'val_accuracy': float(np.max(history.history['val_accuracy'])),
+    }
+
+
+class SuccessiveHalving:
+    """
+    Successive halving di atas ProcessPoolExecutor
+
+    Rung k: trial yang tersisa dilatih sampai min_epochs * eta^k epoch
+    (dibatasi max_epochs), lalu hanya top 1/eta yang lanjut.
+    """
+
+    def __init__(self, n_trials: int = 12, min_epochs: int = 2, max_epochs: int = 30,
+                 eta: int = 3, workers: int = 2, threads_per_worker: Optional[int] = None,
+                 seed: int = 42):
+        self.n_trials = n_trials
+        self.min_epochs = min_epochs
+        self.max_epochs = max_epochs
+        self.eta = eta
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self.seed = seed
+
+    def budgets(self) -> List[int]:
+        """Epoch kumulatif per rung"""
+        budgets, epochs = [], self.min_epochs
+        while epochs < self.max_epochs:
+            budgets.append(epochs)
+            epochs *= self.eta
+        budgets.append(self.max_epochs)
+        return budgets
+
+    def run(self, dataset, work_dir: str, test_size: float = 0.2, val_size: float = 0.2,
+            space: Dict[str, list] = None) -> dict:
+        """
+        Jalankan search di WindowDataset: train / val urut waktu di dalam
+        bagian train (test_size terakhir = test set train_model.py tidak dipakai)
+
+        Returns:
+            dict dengan 'best' (result trial terbaik) dan 'rungs' (semua result)
+        """
+        dataset_root = os.path.dirname(dataset.path)
+        checkpoint_dir = os.path.join(work_dir, "checkpoints")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        alive = dict(enumerate(sample_configs(self.n_trials, space, self.seed)))
+        done_epochs = 0
+        rungs = []
+
+        # spawn: TF tidak aman di-fork setelah diinisialisasi
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=ctx,
+            initializer=_init_worker, initargs=(self.threads_per_worker,)
+        ) as pool:
+            for rung, budget in enumerate(self.budgets()):
+                logger.info(f"Rung {rung}: {len(alive)} trials -> {budget} epochs")
+
+                futures = [
+                    pool.submit(_run_trial, dataset_root, dataset.symbol, test_size, val_size,
+                                checkpoint_dir, trial_id, hp, done_epochs, budget)
+                    for trial_id, hp in alive.items()
+                ]
+
+                results = []
+                for future in as_completed(futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        logger.error(f"Trial failed: {e}")
+
+                if not results:
+                    raise RuntimeError("All trials failed")
+
+                results.sort(key=lambda r: r['val_loss'])
+                rungs.append(results)
+                for r in results:
+                    logger.info(f"  trial {r['trial']}: val_loss={r['val_loss']:.4f} "
+                                f"val_acc={r['val_accuracy']*100:.2f}%")
+
+                done_epochs = budget
+                if budget >= self.max_epochs or len(results) == 1:
+                    break
+
+                keep = max(1, len(results) // self.eta)
+                alive = {r['trial']: r['hparams'] for r in results[:keep]}
+
+        return {'best': rungs[-1][0], 'rungs': rungs}
+
+
+def save_best(tuning_dir: str, symbol: str, result: dict):
+    """Simpan hasil search ke {tuning_dir}/{symbol}.json"""
+    os.makedirs(tuning_dir, exist_ok=True)
+    path = os.path.join(tuning_dir, f"{symbol}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_best_hparams(tuning_dir: str, symbol: str) -> dict:
+    """Hparams terbaik hasil tuning ({} kalau belum pernah di-tune)"""
+    path = os.path.join(tuning_dir, f"{symbol}.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['best']['hparams']
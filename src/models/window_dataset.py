@@ -0,0 +1,349 @@
+"""
+Window dataset per symbol di disk (memory-mapped)
+
+    {root}/{symbol}/features.f32     (n, F) float32, sudah di-scale
+    {root}/{symbol}/labels.i8        (n,) int8, label per bar (INVALID = -1)
+    {root}/{symbol}/timestamps.i64   (n,) int64 ns
+    {root}/{symbol}/windows.i64      (k,) index bar terakhir setiap window valid
+    {root}/{symbol}/meta.json        features, scaler, label method, n_rows
+
+Window ke-j = features[end-seq+1 : end+1] dengan end = windows[j], dibaca
+sebagai strided view dari memmap. Training, evaluasi dan backtest membaca
+byte yang sama tanpa fetch / scale / windowing ulang. Bar baru di-append;
+label ekor yang tadinya INVALID (future belum ada) ditulis ulang.
+meta.json ditulis terakhir dan jadi acuan jumlah row, jadi append yang
+terputus tidak merusak dataset.
+"""
+
+import json
+import math
+import os
+import logging
+from typing import Optional
+
+import numpy as np
+
+from src.utils.config import config
+
+logger = logging.getLogger(__name__)
+
+FILES = {
+    'features': ('features.f32', np.float32),
+    'labels': ('labels.i8', np.int8),
+    'timestamps': ('timestamps.i64', np.int64),
+    'windows': ('windows.i64', np.int64),
+}
+
+
+def scaler_params(scaler) -> dict:
+    return {
+        'data_min': np.asarray(scaler.data_min_, dtype=np.float64).tolist(),
+        'data_max': np.asarray(scaler.data_max_, dtype=np.float64).tolist(),
+        'feature_range': list(scaler.feature_range),
+    }
+
+
+def window_ends(labels: np.ndarray, sequence_length: int) -> np.ndarray:
+    """Index bar terakhir window dengan label valid"""
+    return (np.flatnonzero(np.asarray(labels[sequence_length - 1:]) >= 0) + sequence_length - 1).astype(np.int64)
+
+
+class WindowDataset:
+    """Reader / writer dataset windows 1 symbol"""
+
+    def __init__(self, root: str, symbol: str):
+        self.symbol = symbol
+        self.path = os.path.join(root, symbol)
+        self.meta = self._read_meta()
+        self._cache = {}
+
+    # ---- storage ----
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, FILES[name][0])
+
+    def _read_meta(self) -> Optional[dict]:
+        path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, meta: dict):
+        path = os.path.join(self.path, "meta.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, path)
+        self.meta = meta
+        self._cache = {}
+
+    def _memmap(self, name: str, count: int, mode: str = 'r'):
+        dtype = FILES[name][1]
+        shape = (count, len(self.meta['features'])) if name == 'features' else (count,)
+        if count == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode=mode, shape=shape)
+
+    def _write_windows(self, labels: np.ndarray) -> int:
+        ends = window_ends(labels, self.meta['sequence_length'])
+        tmp_path = f"{self._file('windows')}.tmp"
+        ends.tofile(tmp_path)
+        os.replace(tmp_path, self._file('windows'))
+        return len(ends)
+
+    # ---- reader ----
+
+    @property
+    def exists(self) -> bool:
+        return self.meta is not None
+
+    @property
+    def n_rows(self) -> int:
+        return self.meta['n_rows'] if self.meta else 0
+
+    @property
+    def n_windows(self) -> int:
+        return self.meta['n_windows'] if self.meta else 0
+
+    @property
+    def sequence_length(self) -> int:
+        return self.meta['sequence_length']
+
+    def _array(self, name: str):
+        if name not in self._cache:
+            count = self.n_windows if name == 'windows' else self.n_rows
+            self._cache[name] = self._memmap(name, count)
+        return self._cache[name]
+
+    @property
+    def features(self) -> np.ndarray:
+        return self._array('features')
+
+    @property
+    def labels(self) -> np.ndarray:
+        return self._array('labels')
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._array('timestamps')
+
+    @property
+    def index(self) -> np.ndarray:
+        """Bar terakhir setiap window valid"""
+        return self._array('windows')
+
+    def all_windows(self) -> np.ndarray:
+        """
+        Semua window (n - seq + 1, seq, F) sebagai strided view read-only
+
+        Window ke-k = features[k:k+seq]; tidak ada data yang dicopy.
+        """
+        features = self.features
+        seq = self.sequence_length
+        n, n_features = features.shape
+        return np.lib.stride_tricks.as_strided(
+            features,
+            shape=(max(n - seq + 1, 0), seq, n_features),
+            strides=(features.strides[0], features.strides[0], features.strides[1]),
+            writeable=False
+        )
+
+    def windows(self, start: int = 0, stop: Optional[int] = None):
+        """
+        Window valid ke-start..stop beserta labelnya
+
+        Returns:
+            (X (k, seq, F), y (k,)); X view tanpa copy kalau window-nya berurutan
+        """
+        ends = self.index[start:stop]
+        if len(ends) == 0:
+            return (np.zeros((0, self.sequence_length, len(self.meta['features'])), dtype=np.float32),
+                    np.zeros(0, dtype=np.int64))
+
+        first = int(ends[0]) - self.sequence_length + 1
+        if int(ends[-1]) - int(ends[0]) == len(ends) - 1:
+            X = self.all_windows()[first:first + len(ends)]
+        else:
+            X = self.all_windows()[ends - self.sequence_length + 1]
+
+        y = np.asarray(self.labels[ends], dtype=np.int64)
+        return X, y
+
+    def window_timestamps(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Timestamp bar terakhir (waktu prediksi) setiap window"""
+        return np.asarray(self.timestamps[self.index[start:stop]])
+
+    def split(self, test_size: float = 0.2):
+        """
+        Split train / test urut waktu (sama dengan train_test_split shuffle=False)
+
+        Returns:
+            X_train, X_test, y_train, y_test
+        """
+        n_test = math.ceil(test_size * self.n_windows)
+        n_train = self.n_windows - n_test
+        X_train, y_train = self.windows(0, n_train)
+        X_test, y_test = self.windows(n_train, None)
+        return X_train, X_test, y_train, y_test
+
+    def validation_split(self, test_size: float = 0.2, val_size: float = 0.2):
+        """
+        Split train / val hanya dari bagian train split(test_size), untuk
+        tuning: window test tidak ikut memilih hparams
+
+        Returns:
+            X_train, X_val, y_train, y_val
+        """
+        n_train = self.n_windows - math.ceil(test_size * self.n_windows)
+        n_fit = n_train - math.ceil(val_size * n_train)
+        X_train, y_train = self.windows(0, n_fit)
+        X_val, y_val = self.windows(n_fit, n_train)
+        return X_train, X_val, y_train, y_val
+
+    def build_scaler(self):
+        from src.models.lstm_model import build_scaler
+
+        params = self.meta['scaler']
+        return build_scaler(
+            params['data_min'], params['data_max'],
+            feature_range=tuple(params['feature_range']),
+            n_samples=self.n_rows
+        )
+
+    def compatible(self, features, sequence_length: int, label_method: str, scaler=None) -> bool:
+        """Dataset bisa di-append dengan setting ini (kalau tidak, harus rebuild)"""
+        meta = self.meta
+        if meta is None:
+            return False
+        if (meta['features'] != list(features) or meta['sequence_length'] != sequence_length
+                or meta['label_method'] != label_method
+                or meta.get('label_horizon') != config.LABEL_HORIZON
+                or meta.get('label_threshold') != config.LABEL_THRESHOLD):
+            return False
+        if scaler is None:
+            return True
+
+        # Scaler harus sama persis, kalau tidak bar lama ter-scale beda
+        params = scaler_params(scaler)
+        return all(np.array_equal(meta['scaler'][k], params[k]) for k in params)
+
+    # ---- writer ----
+
+    def build(self, timestamps, features, labels, scaler, feature_names,
+              sequence_length: int, label_method: str):
+        """Tulis dataset baru (menimpa yang lama)"""
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        arrays = {
+            'features': np.ascontiguousarray(features, dtype=np.float32),
+            'labels': np.ascontiguousarray(labels, dtype=np.int8),
+            'timestamps': np.ascontiguousarray(timestamps, dtype=np.int64),
+        }
+        for name, arr in arrays.items():
+            tmp_path = f"{self._file(name)}.tmp"
+            arr.tofile(tmp_path)
+            os.replace(tmp_path, self._file(name))
+
+        self.meta = {
+            'symbol': self.symbol,
+            'features': list(feature_names),
+            'sequence_length': sequence_length,
+            'label_method': label_method,
+            'label_horizon': config.LABEL_HORIZON,
+            'label_threshold': config.LABEL_THRESHOLD,
+            'scaler': scaler_params(scaler),
+            'n_rows': len(arrays['timestamps']),
+        }
+        meta = dict(self.meta, n_windows=self._write_windows(arrays['labels']))
+        self._write_meta(meta)
+
+        logger.info(f"{self.symbol}: Dataset built ({meta['n_rows']} bars, {meta['n_windows']} windows)")
+
+    def append(self, timestamps, features, labels) -> int:
+        """
+        Tambahkan bar baru dari array history lengkap (lama + baru)
+
+        Bar yang sudah ada harus identik (timestamps + features); label
+        bar lama yang berubah (ekor INVALID yang kini punya future)
+        ditulis ulang.
+
+        Returns:
+            jumlah bar baru
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        features = np.asarray(features, dtype=np.float32)
+        labels = np.asarray(labels, dtype=np.int8)
+
+        n = self.n_rows
+        if len(timestamps) < n or not np.array_equal(timestamps[:n], self.timestamps) \
+                or not np.array_equal(features[:n], self.features):
+            raise ValueError(f"{self.symbol}: History changed, dataset must be rebuilt")
+
+        self._cache = {}
+
+        # Label bar lama yang berubah
+        old_labels = self._memmap('labels', n, mode='r+')
+        changed = np.flatnonzero(old_labels != labels[:n])
+        if len(changed):
+            old_labels[changed[0]:] = labels[changed[0]:n]
+            old_labels.flush()
+        del old_labels
+
+        # Append bar baru (potong dulu sisa append yang terputus)
+        new_rows = len(timestamps) - n
+        if new_rows:
+            for name, arr in (('features', features), ('labels', labels), ('timestamps', timestamps)):
+                row_bytes = arr[:1].nbytes
+                with open(self._file(name), 'r+b') as f:
+                    f.truncate(n * row_bytes)
+                    f.seek(n * row_bytes)
+                    f.write(np.ascontiguousarray(arr[n:]).tobytes())
+
+        if new_rows or len(changed):
+            meta = dict(self.meta, n_rows=len(timestamps), n_windows=self._write_windows(labels))
+            self._write_meta(meta)
+
+        logger.info(f"{self.symbol}: Dataset +{new_rows} bars, {len(changed)} labels updated "
+                    f"({self.n_windows} windows)")
+        return new_rows
+
+
+def sync_dataset(root: str, panel, symbol: str, sequence_length: int = 60,
+                 label_method: Optional[str] = None, scaler=None) -> Optional[WindowDataset]:
+    """
+    Samakan dataset symbol dengan panel: append kalau bisa, selain itu rebuild
+
+    Args:
+        scaler: scaler yang harus dipakai (mis. dari bundle yang di-fine-tune);
+            None = fit dari panel
+    """
+    from src.models.lstm_model import FEATURE_COLS, TradingLSTM
+
+    label_method = label_method or config.LABEL_METHOD
+    dataset = WindowDataset(root, symbol)
+
+    arrays = TradingLSTM.panel_arrays(
+        panel,
+        scalers={symbol: scaler} if scaler is not None else None,
+        symbols=[symbol],
+        label_method=label_method,
+        min_rows=sequence_length + 10
+    )
+    if symbol not in arrays:
+        return None
+
+    timestamps, scaled, labels, fitted = arrays[symbol]
+
+    if dataset.compatible(FEATURE_COLS, sequence_length, label_method, fitted):
+        try:
+            dataset.append(timestamps, scaled, labels)
+            return dataset
+        except ValueError as e:
+            logger.info(str(e))
+
+    dataset.build(timestamps, scaled, labels, fitted, FEATURE_COLS, sequence_length, label_method)
+    return dataset
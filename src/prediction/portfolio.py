@@ -0,0 +1,276 @@
+"""
+Post-processing signal semua symbol sekaligus (operasi array, tanpa loop per symbol)
+
+    probabilities (n, 3) -> signal + confidence -> gating MIN_CONFIDENCE
+    -> TP / SL dari ATR (TP_ATR_MULT / SL_ATR_MULT, sama dengan label)
+    -> lot dari risk akun: balance * RISK_PER_TRADE / nilai jarak SL per lot
+    -> cap exposure berkorelasi (korelasi return H1 antar symbol)
+
+Cap exposure, dengan r = direction * risk per posisi (fraksi balance):
+
+    per posisi   (C @ r)_i * direction_i <= MAX_CORRELATED_RISK
+                 EURUSD + GBPUSD + NZDUSD BUY (searah, korelasi tinggi)
+                 masing-masing dikecilkan; posisi yang saling hedge tidak
+    portfolio    sqrt(r' C r) <= MAX_PORTFOLIO_RISK
+
+Nilai 1.0 pergerakan harga per lot = contract size * kurs quote -> akun.
+Kurs diambil dari close symbol lain (USDJPY untuk quote JPY, GBPUSD untuk
+GBP); tanpa kurs, lot tidak bisa dihitung dan signal tidak disimpan.
+Korelasi dan cap hanya mencakup symbol dalam 1 run (1 shard).
+
+Setiap row predictions punya signal_key deterministik (symbol, timeframe,
+bar, model, signal) dengan unique constraint di tabel; write di-replay
+sebagai insert ON CONFLICT DO NOTHING, jadi retry outbox tidak membuat
+signal dobel dan tidak menimpa row yang sudah dieksekusi.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.features.labels import SIGNAL_HORIZON, SL_ATR_MULT, TP_ATR_MULT
+from src.utils.config import config
+
+logger = logging.getLogger(__name__)
+
+SIGNALS = np.array(['SELL', 'HOLD', 'BUY'])
+DIRECTIONS = np.array([-1.0, 0.0, 1.0])
+
+# Kolom unique tabel predictions (conflict key insert idempotent)
+PREDICTION_KEY = 'signal_key'
+
+# Unit per 1 lot standar (base currency / ounce)
+DEFAULT_CONTRACT_SIZE = 100_000
+CONTRACT_SIZES = {'XAU': 100, 'XAG': 5_000}
+
+
+def contract_sizes(symbols: List[str]) -> np.ndarray:
+    return np.array([CONTRACT_SIZES.get(s[:3], DEFAULT_CONTRACT_SIZE) for s in symbols], dtype=np.float64)
+
+
+def conversion_symbols(symbols: List[str], available: Optional[List[str]] = None,
+                       currency: Optional[str] = None) -> List[str]:
+    """
+    Pair yang close-nya dibutuhkan untuk konversi quote -> mata uang akun
+    (di luar symbols); available = pair yang ada datanya (mis. universe)
+    """
+    currency = currency or config.ACCOUNT_CURRENCY
+    needed = []
+    for quote in sorted({s[3:] for s in symbols} - {currency}):
+        pairs = [f"{currency}{quote}", f"{quote}{currency}"]
+        if any(p in symbols for p in pairs):
+            continue
+        if available is not None:
+            pairs = [p for p in pairs if p in available]
+        needed.extend(p for p in pairs if p not in needed)
+    return needed
+
+
+def quote_rates(symbols: List[str], prices: Dict[str, float], currency: Optional[str] = None) -> np.ndarray:
+    """Kurs quote currency -> mata uang akun per symbol (NaN kalau pair konversi tidak ada)"""
+    currency = currency or config.ACCOUNT_CURRENCY
+    rates = np.full(len(symbols), np.nan)
+    for i, symbol in enumerate(symbols):
+        quote = symbol[3:]
+        if quote == currency:
+            rates[i] = 1.0
+        elif prices.get(f"{currency}{quote}"):
+            rates[i] = 1.0 / prices[f"{currency}{quote}"]
+        elif prices.get(f"{quote}{currency}"):
+            rates[i] = prices[f"{quote}{currency}"]
+    return rates
+
+
+def return_correlation(panel, symbols: List[str], bars: Optional[int] = None) -> np.ndarray:
+    """
+    Korelasi log return close N bar terakhir panel (pairwise, bar yang ada di kedua symbol)
+
+    Returns:
+        (n, n), diagonal 1; pasangan tanpa cukup data = 0
+    """
+    bars = bars or config.CORRELATION_BARS
+    close = panel.field('close')[[panel.symbol_index(s) for s in symbols], -(bars + 1):].astype(np.float64)
+    returns = np.diff(np.log(np.where(close > 0, close, np.nan)), axis=1)
+
+    valid = np.isfinite(returns)
+    x = np.where(valid, returns, 0.0)
+    v = valid.astype(np.float64)
+
+    # Statistik pairwise lewat matmul: n_ij, sum_i|j, sum x_i x_j, sum x_i^2|j
+    n = v @ v.T
+    sx = x @ v.T
+    sxy = x @ x.T
+    sxx = (x * x) @ v.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sx.T / n
+        var = sxx - sx * sx / n
+        corr = cov / np.sqrt(var * var.T)
+
+    corr[~np.isfinite(corr) | (n < 30)] = 0.0
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def size_signals(
+    probabilities: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    point_value: np.ndarray,
+    correlation: Optional[np.ndarray] = None,
+    min_confidence: Optional[float] = None,
+    balance: Optional[float] = None,
+    risk: Optional[float] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Signal, TP / SL dan lot untuk n symbol
+
+    Args:
+        probabilities: (n, 3) SELL / HOLD / BUY
+        point_value: nilai 1.0 pergerakan harga per lot (mata uang akun)
+        correlation: (n, n); None = tanpa korelasi (identity)
+
+    Returns:
+        dict array (n,): signal (class), confidence, accepted, entry, tp, sl,
+        lot, risk (fraksi balance setelah cap)
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    atr = np.asarray(atr, dtype=np.float64)
+    min_confidence = config.MIN_CONFIDENCE if min_confidence is None else min_confidence
+    balance = config.ACCOUNT_BALANCE if balance is None else balance
+    risk = config.RISK_PER_TRADE if risk is None else risk
+
+    signal = probabilities.argmax(axis=1)
+    confidence = np.take_along_axis(probabilities, signal[:, None], axis=1)[:, 0]
+    direction = DIRECTIONS[signal]
+    active = direction != 0
+
+    tp = np.where(active, close + direction * atr * TP_ATR_MULT, np.nan)
+    sl = np.where(active, close - direction * atr * SL_ATR_MULT, np.nan)
+
+    # Lot tanpa cap: risk akun / kerugian per lot kalau SL kena
+    loss_per_lot = atr * SL_ATR_MULT * point_value
+    sizable = (active & (confidence >= min_confidence)
+               & np.isfinite(loss_per_lot) & (loss_per_lot > 0) & np.isfinite(close))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lot = np.where(sizable, balance * risk / loss_per_lot, 0.0)
+
+    # Cap exposure berkorelasi (fraksi balance per posisi, bertanda arah)
+    exposure = np.where(sizable, direction * risk, 0.0)
+    if correlation is not None and sizable.any():
+        correlated = (correlation @ exposure) * direction
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = np.where(correlated > config.MAX_CORRELATED_RISK, config.MAX_CORRELATED_RISK / correlated, 1.0)
+        exposure = exposure * scale
+        lot = lot * scale
+
+        total = float(np.sqrt(max(exposure @ correlation @ exposure, 0.0)))
+        if total > config.MAX_PORTFOLIO_RISK:
+            exposure = exposure * (config.MAX_PORTFOLIO_RISK / total)
+            lot = lot * (config.MAX_PORTFOLIO_RISK / total)
+
+    # Bulatkan ke bawah ke LOT_STEP; di bawah MIN_LOT = tidak di-trade
+    lot = np.minimum(np.floor(lot / config.LOT_STEP + 1e-9) * config.LOT_STEP, config.MAX_LOT)
+    accepted = sizable & (lot >= config.MIN_LOT)
+    lot = np.where(accepted, lot, 0.0)
+    with np.errstate(invalid='ignore'):
+        realized = np.where(accepted, lot * loss_per_lot / balance, 0.0)
+
+    return {
+        'signal': signal,
+        'confidence': confidence,
+        'accepted': accepted,
+        'entry': close,
+        'tp': tp,
+        'sl': sl,
+        'lot': lot,
+        'risk': realized,
+    }
+
+
+def signal_key(symbol: str, timeframe: str, bar, model_version: str, signal: str) -> str:
+    """Key idempotent 1 signal: sama untuk run / retry yang memprediksi bar yang sama"""
+    return f"{symbol}|{timeframe}|{pd.Timestamp(bar):%Y-%m-%dT%H:%M}|{model_version}|{signal}"
+
+
+def build_predictions(
+    symbols: List[str],
+    predictors: dict,
+    probabilities: np.ndarray,
+    latest: Dict[str, dict],
+    prices: Optional[Dict[str, float]] = None,
+    correlation: Optional[np.ndarray] = None
+) -> List[dict]:
+    """
+    Prediction dict per symbol (urutan symbols) dari probabilities (n, 3)
+
+    Args:
+        latest: symbol -> feature bar terakhir (close, atr_14, timestamp), dari
+            TradingPredictor.prepare_panel_sequences
+        prices: close symbol lain untuk kurs konversi (default: close latest)
+    """
+    close = np.array([latest[s]['close'] for s in symbols], dtype=np.float64)
+    atr = np.array([latest[s]['atr_14'] for s in symbols], dtype=np.float64)
+    prices = {**{s: float(c) for s, c in zip(symbols, close)}, **(prices or {})}
+    point_value = contract_sizes(symbols) * quote_rates(symbols, prices)
+
+    for symbol in np.asarray(symbols)[~np.isfinite(point_value)]:
+        logger.warning(f"{symbol}: No conversion rate {symbol[3:]} -> {config.ACCOUNT_CURRENCY}, lot not sized")
+
+    probabilities = np.asarray(probabilities, dtype=np.float64).reshape(len(symbols), 3)
+    sized = size_signals(probabilities, close, atr, point_value, correlation)
+
+    now = datetime.utcnow()
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    predicted_at = now.isoformat()
+    valid_until = (now + timedelta(hours=SIGNAL_HORIZON)).isoformat()
+
+    # Bulatkan sekali per kolom, lalu ke list Python (JSON-able)
+    columns = {
+        'signal': SIGNALS[sized['signal']].tolist(),
+        'confidence': np.round(sized['confidence'], 4).tolist(),
+        'accepted': sized['accepted'].tolist(),
+        'entry_price': np.round(close, 5).tolist(),
+        'tp_price': np.round(sized['tp'], 5).tolist(),
+        'sl_price': np.round(sized['sl'], 5).tolist(),
+        'lot_size': np.round(sized['lot'], 2).tolist(),
+        'risk': np.round(sized['risk'], 4).tolist(),
+        'atr': np.round(atr, 5).tolist(),
+        'probabilities': np.round(probabilities, 4).tolist(),
+    }
+
+    predictions = []
+    for i, symbol in enumerate(symbols):
+        probs = columns['probabilities'][i]
+        bar = latest[symbol].get('timestamp', current_hour)
+        predictions.append({
+            "symbol": symbol,
+            "timeframe": "H1",
+            "signal": columns['signal'][i],
+            "confidence": columns['confidence'][i],
+            "entry_price": columns['entry_price'][i],
+            "tp_price": columns['tp_price'][i] if np.isfinite(columns['tp_price'][i]) else None,
+            "sl_price": columns['sl_price'][i] if np.isfinite(columns['sl_price'][i]) else None,
+            "lot_size": columns['lot_size'][i],
+            "risk": columns['risk'][i],
+            "accepted": columns['accepted'][i],
+            "current_price": columns['entry_price'][i],
+            "atr": columns['atr'][i],
+            "predicted_at": predicted_at,
+            "valid_until": valid_until,
+            "model_version": predictors[symbol].model_version,
+            "algorithm": predictors[symbol].algorithm,
+            "probabilities": {"buy": probs[2], "hold": probs[1], "sell": probs[0]},
+            PREDICTION_KEY: signal_key(symbol, "H1", bar, predictors[symbol].model_version, columns['signal'][i]),
+        })
+    return predictions
+
+
+def prediction_rows(predictions: List[dict]) -> List[dict]:
+    """Rows tabel predictions untuk signal yang lolos gating + sizing"""
+    keys = ('symbol', 'timeframe', 'signal', 'confidence', 'entry_price', 'tp_price', 'sl_price',
+            'lot_size', 'valid_until', 'model_version', 'algorithm', PREDICTION_KEY)
+    return [{**{k: p[k] for k in keys}, 'status': 'pending'} for p in predictions if p['accepted']]
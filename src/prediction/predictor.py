@@ -7,23 +7,50 @@ import pandas as pd
 from tensorflow.keras.models import load_model
 import joblib
 import logging
-from datetime import datetime, timedelta
+
+from src.features.registry import MODEL_FEATURES
+from src.models.bundle import file_hash
+from src.prediction.portfolio import build_predictions
+from src.utils.config import config
+from src.utils.profiling import track_allocations
 
 logger = logging.getLogger(__name__)
 
+FEATURE_COLS = list(MODEL_FEATURES)
+
 
 class TradingPredictor:
-    """Generate predictions dari trained LSTM model"""
+    """Generate predictions dari trained model (backend apa pun di bundle)"""
     
-    def __init__(self, symbol: str, model_path: str, scaler_path: str):
+    def __init__(self, symbol: str, model_path: str = None, scaler_path: str = None, bundle=None, model=None):
+        """
+        Args:
+            bundle: ModelBundle per symbol, atau bundle model global
+                (metadata 'symbols'; scaler per symbol)
+            model: model yang sudah di-build dari bundle, untuk dipakai
+                bersama predictor symbol lain (model global)
+        """
         self.symbol = symbol
-        self.sequence_length = 60
+        self.sequence_length = config.SEQUENCE_LENGTH
+        self.symbols = None
+        self.algorithm = "LSTM"
         
         # Load model & scaler
         try:
-            self.model = load_model(model_path)
-            self.scaler = joblib.load(scaler_path)
-            logger.info(f"Model loaded: {symbol}")
+            if bundle is not None:
+                if bundle.features != FEATURE_COLS:
+                    raise ValueError(f"Bundle features {bundle.features} != {FEATURE_COLS}")
+                self.model = model if model is not None else bundle.build_inference_model()
+                self.scaler = bundle.build_scaler(symbol)
+                self.sequence_length = bundle.metadata.get('sequence_length', self.sequence_length)
+                self.symbols = bundle.metadata.get('symbols')
+                self.algorithm = bundle.metadata.get('algorithm', self.algorithm)
+                self.model_version = bundle.version
+            else:
+                self.model = load_model(model_path)
+                self.scaler = joblib.load(scaler_path)
+                self.model_version = file_hash(model_path)[:12]
+            logger.info(f"Model loaded: {symbol} ({self.model_version})")
         except Exception as e:
             logger.error(f"Failed to load model for {symbol}: {e}")
             raise
@@ -31,10 +58,7 @@ class TradingPredictor:
     def prepare_sequence(self, df: pd.DataFrame):
         """Prepare last sequence untuk prediction"""
         
-        feature_cols = [
-            'close', 'rsi_14', 'macd', 'macd_signal', 
-            'ema_20', 'ema_50', 'ema_200', 'atr_14'
-        ]
+        feature_cols = FEATURE_COLS
         
         # Drop NaN
         df = df.dropna(subset=feature_cols)
@@ -57,6 +81,66 @@ class TradingPredictor:
         
         return X, latest
     
+    @staticmethod
+    @track_allocations()
+    def prepare_panel_sequences(panel, predictors: dict, sequence_length=None):
+        """
+        Prepare last sequence untuk semua symbol di OHLCPanel sekaligus
+        
+        Args:
+            panel: OHLCPanel dengan FEATURE_COLS
+            predictors: dict symbol -> TradingPredictor (scaler per symbol)
+            sequence_length: default config.SEQUENCE_LENGTH; predictor dengan
+                bundle sequence_length lain di-skip
+        
+        Returns:
+            (symbols, X (n, sequence_length, features), latest dict per symbol)
+        """
+        sequence_length = sequence_length or config.SEQUENCE_LENGTH
+        symbols = []
+        for s in panel.symbols:
+            if s not in predictors:
+                continue
+            if predictors[s].sequence_length != sequence_length:
+                logger.error(f"{s}: Model sequence_length {predictors[s].sequence_length} "
+                             f"!= {sequence_length}, retrain needed")
+                continue
+            symbols.append(s)
+        rows = [panel.symbol_index(s) for s in symbols]
+        
+        valid = panel.valid_mask(FEATURE_COLS)[rows]
+        idx = [panel.fields.index(f) for f in FEATURE_COLS]
+        packed, counts = panel.pack(panel.values[rows][:, :, idx], valid)
+        
+        for symbol, n in zip(symbols, counts):
+            if n < sequence_length:
+                logger.error(f"{symbol}: Not enough data: {n} rows")
+        
+        keep = counts >= sequence_length
+        symbols = [s for s, k in zip(symbols, keep) if k]
+        packed, counts = packed[keep], counts[keep]
+        # Bar terakhir yang valid per symbol (timestamp signal)
+        last_bar = valid.shape[1] - 1 - np.argmax(valid[keep][:, ::-1], axis=1)
+        
+        if not symbols:
+            return [], None, {}
+        
+        # Ambil sequence_length bar terakhir per symbol
+        positions = counts[:, None] - sequence_length + np.arange(sequence_length)[None, :]
+        data = np.take_along_axis(packed, positions[:, :, None], axis=1)
+        
+        # Scale per symbol dengan scaler masing-masing
+        scale = np.stack([predictors[s].scaler.scale_ for s in symbols])
+        offset = np.stack([predictors[s].scaler.min_ for s in symbols])
+        X = (data * scale[:, None, :] + offset[:, None, :]).astype(np.float32)
+        
+        latest = {
+            s: dict(zip(FEATURE_COLS, data[i, -1].astype(float)), timestamp=panel.timestamps[last_bar[i]])
+            for i, s in enumerate(symbols)
+        }
+        
+        return symbols, X, latest
+    
     def predict(self, df: pd.DataFrame):
         """
         Generate prediction
@@ -70,63 +154,54 @@ class TradingPredictor:
         if X is None:
             return None
         
+        return self.predict_sequence(X, latest)
+    
+    def model_input(self, X):
+        """Input model: model global butuh channel one-hot symbol"""
+        if self.symbols is None:
+            return X
+        from src.models.global_model import add_symbol_channels
+        return add_symbol_channels(X, [self.symbols.index(self.symbol)] * len(X), len(self.symbols))
+    
+    @staticmethod
+    def predict_panel(symbols, predictors: dict, X):
+        """
+        Probabilities untuk semua symbol, 1 forward pass per model
+        (model global = 1 forward pass untuk semua symbol)
+        
+        Returns:
+            dict symbol -> probabilities (3,)
+        """
+        groups = {}
+        for i, symbol in enumerate(symbols):
+            groups.setdefault(id(predictors[symbol].model), []).append(i)
+        
+        probabilities = {}
+        for rows in groups.values():
+            model = predictors[symbols[rows[0]]].model
+            inputs = np.concatenate([predictors[symbols[i]].model_input(X[i:i + 1]) for i in rows])
+            output = model.predict(inputs, verbose=0)
+            for i, probs in zip(rows, output):
+                probabilities[symbols[i]] = probs
+        
+        return probabilities
+    
+    def predict_sequence(self, X, latest, prediction=None):
+        """
+        Generate prediction dari sequence yang sudah di-scale
+        
+        Args:
+            prediction: probabilities yang sudah dihitung (predict_panel)
+        """
+        
         # Predict
-        prediction = self.model.predict(X, verbose=0)[0]
-        
-        # Get class dan confidence
-        predicted_class = np.argmax(prediction)
-        confidence = float(prediction[predicted_class])
-        
-        # Map ke signal
-        signal_map = {0: "SELL", 1: "HOLD", 2: "BUY"}
-        signal = signal_map[predicted_class]
-        
-        # Get prices
-        current_price = float(latest['close'])
-        atr = float(latest['atr_14'])
-        
-        # Calculate TP & SL
-        if signal == "BUY":
-            entry_price = current_price
-            tp_price = current_price + (atr * 2.5)  # Risk:Reward 1:2.5
-            sl_price = current_price - (atr * 1.0)
-        elif signal == "SELL":
-            entry_price = current_price
-            tp_price = current_price - (atr * 2.5)
-            sl_price = current_price + (atr * 1.0)
-        else:  # HOLD
-            entry_price = current_price
-            tp_price = None
-            sl_price = None
-        
-        # Calculate lot size (2% risk)
-        # Simplified - seharusnya pakai account balance
-        lot_size = 0.01
-        
-        result = {
-            "symbol": self.symbol,
-            "timeframe": "H1",
-            "signal": signal,
-            "confidence": round(confidence, 4),
-            "entry_price": round(entry_price, 5),
-            "tp_price": round(tp_price, 5) if tp_price else None,
-            "sl_price": round(sl_price, 5) if sl_price else None,
-            "lot_size": lot_size,
-            "current_price": round(current_price, 5),
-            "atr": round(atr, 5),
-            "predicted_at": datetime.utcnow().isoformat(),
-            "valid_until": (datetime.utcnow() + timedelta(hours=4)).isoformat(),
-            "model_version": "v1.0",
-            "algorithm": "LSTM"
-        }
+        if prediction is None:
+            prediction = self.model.predict(self.model_input(X), verbose=0)[0]
         
-        # Probabilities untuk semua class
-        result["probabilities"] = {
-            "buy": round(float(prediction[2]), 4),
-            "hold": round(float(prediction[1]), 4),
-            "sell": round(float(prediction[0]), 4)
-        }
+        # Post-processing sama dengan batch semua symbol (src/prediction/portfolio.py)
+        result = build_predictions([self.symbol], {self.symbol: self}, np.asarray(prediction)[None],
+                                   {self.symbol: latest})[0]
         
-        logger.info(f"{self.symbol}: {signal} (confidence: {confidence:.2%})")
+        logger.info(f"{self.symbol}: {result['signal']} (confidence: {result['confidence']:.2%})")
         
         return result
@@ -15,19 +15,105 @@ class Config:
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
     
-    # Trading
-    SYMBOLS = os.getenv("SYMBOLS", "EURUSD,GBPUSD,XAUUSD").split(",")
+    # Trading (universe semua stage, lihat src/utils/symbols.py)
+    SYMBOLS = os.getenv(
+        "SYMBOLS", "EURUSD,GBPUSD,XAUUSD,USDJPY,AUDUSD,USDCHF,USDCAD,NZDUSD,EURGBP,EURJPY,GBPJPY"
+    ).split(",")
     SYMBOLS = [s.strip() for s in SYMBOLS]
+    # Spec instrument Dukascopy (src/utils/symbols.py), 'SYMBOL:value,...'. Default aturan:
+    # nama Dukascopy = symbol, divisor 1000 untuk quote JPY, selain itu 100000
+    PRICE_DIVISORS = os.getenv("PRICE_DIVISORS", "")
+    DUKASCOPY_SYMBOLS = os.getenv("DUKASCOPY_SYMBOLS", "")
+    # Sharding: worker ini memproses src.utils.symbols.select_shard(symbols, SHARD_INDEX, SHARD_COUNT)
+    SHARD_INDEX = int(os.getenv("SHARD_INDEX", "0"))
+    SHARD_COUNT = int(os.getenv("SHARD_COUNT", "1"))
     
     # Data
     LOOKBACK_HOURS = int(os.getenv("LOOKBACK_HOURS", "720"))
     TIMEFRAME = "H1"
+    # Override mis. ke server replay lokal (scripts/replay_pipeline.py)
+    DUKASCOPY_BASE_URL = os.getenv("DUKASCOPY_BASE_URL", "https://datafeed.dukascopy.com/datafeed")
+    CALENDAR_DIR = os.getenv("CALENDAR_DIR", "data/calendar")
+    FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", "data/features")
+    DATASET_DIR = os.getenv("DATASET_DIR", "data/datasets")
+    # Bar terakhir yang dibaca untuk prediksi: sequence + warmup EMA 200 (bobot bar awal < 0.01%)
+    PREDICT_HISTORY_BARS = int(os.getenv("PREDICT_HISTORY_BARS", "1000"))
+    SYNC_GAP_LOOKBACK_HOURS = int(os.getenv("SYNC_GAP_LOOKBACK_HOURS", "48"))
+    # Arsip tick lokal (src/data/tick_archive.py), diisi sync / backfill
+    TICK_ARCHIVE = os.getenv("TICK_ARCHIVE", "false").lower() == "true"
+    TICK_ARCHIVE_DIR = os.getenv("TICK_ARCHIVE_DIR", "data/ticks")
+    # Validasi data (src/data/quality.py, scripts/validate_data.py)
+    QUALITY_SPIKE_MULT = float(os.getenv("QUALITY_SPIKE_MULT", "10"))  # x median rolling |return| / range
+    QUALITY_WINDOW = int(os.getenv("QUALITY_WINDOW", "500"))
+    QUALITY_MAX_REPAIR_HOURS = int(os.getenv("QUALITY_MAX_REPAIR_HOURS", "500"))  # download ulang per symbol per run
+    QUALITY_REPORT_PATH = os.getenv("QUALITY_REPORT_PATH", "data/quality_report.json")
+    QUALITY_STATE_DIR = os.getenv("QUALITY_STATE_DIR", "data/quality")  # jam yang sudah pernah di-repair
+    
+    # Outbox: write ke Supabase lewat SQLite lokal + background flusher
+    OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+    OUTBOX_PATH = os.getenv("OUTBOX_PATH", "data/outbox/outbox.db")
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "20"))
+    OUTBOX_DRAIN_SECONDS = float(os.getenv("OUTBOX_DRAIN_SECONDS", "120"))  # flush sisa sebelum exit
+    
+    # Download pipeline (src/data/download_pipeline.py): fetch paralel + decode di process pool
+    DOWNLOAD_IO_WORKERS = int(os.getenv("DOWNLOAD_IO_WORKERS", "4"))
+    DOWNLOAD_DECODE_WORKERS = int(os.getenv("DOWNLOAD_DECODE_WORKERS", str(os.cpu_count() or 1)))  # 0 = di thread I/O
+    DOWNLOAD_QUEUE_SIZE = int(os.getenv("DOWNLOAD_QUEUE_SIZE", "32"))  # payload fetch / menunggu decode
+    DOWNLOAD_REQUEST_DELAY = float(os.getenv("DOWNLOAD_REQUEST_DELAY", "0.25"))  # per thread I/O
+    DOWNLOAD_PIPELINE_MIN_HOURS = int(os.getenv("DOWNLOAD_PIPELINE_MIN_HOURS", "24"))  # di bawah ini serial
+    
+    # Backfill
+    BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "4"))
+    BACKFILL_MANIFEST = os.getenv("BACKFILL_MANIFEST", "data/backfill_manifest.json")
     
     # Model
     SEQUENCE_LENGTH = int(os.getenv("SEQUENCE_LENGTH", "60"))
     BATCH_SIZE = int(os.getenv("BATCH_SIZE", "32"))
     EPOCHS = int(os.getenv("EPOCHS", "100"))
+    MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "models/registry")
+    MODEL_REGISTRY_KEEP = int(os.getenv("MODEL_REGISTRY_KEEP", "3"))
+    MODEL_WEIGHTS_DTYPE = os.getenv("MODEL_WEIGHTS_DTYPE", "float32")  # float16 = setengah ukuran
+    LABEL_METHOD = os.getenv("LABEL_METHOD", "next_bar")  # next_bar | horizon | triple_barrier
+    LABEL_HORIZON = int(os.getenv("LABEL_HORIZON", "4"))  # bar, untuk horizon / triple_barrier
+    LABEL_THRESHOLD = float(os.getenv("LABEL_THRESHOLD", "0.001"))
+    MODEL_BACKEND = os.getenv("MODEL_BACKEND", "lstm")  # lstm | gbm (gradient boosting, CPU cepat)
+    MODEL_SCOPE = os.getenv("MODEL_SCOPE", "per_symbol")  # per_symbol | global (1 model semua symbol)
+    TRAIN_MODE = os.getenv("TRAIN_MODE", "incremental")  # incremental | full
+    FINETUNE_EPOCHS = int(os.getenv("FINETUNE_EPOCHS", "5"))
+    FINETUNE_REPLAY = int(os.getenv("FINETUNE_REPLAY", "500"))
+    FINETUNE_TOLERANCE = float(os.getenv("FINETUNE_TOLERANCE", "0.02"))
+    TRAIN_PERF_MODE = os.getenv("TRAIN_PERF_MODE", "false").lower() == "true"
+    # XLA (hanya di perf mode); default off: recurrent LSTM di CPU jauh lebih lambat dengan XLA
+    TRAIN_JIT_COMPILE = os.getenv("TRAIN_JIT_COMPILE", "false").lower() == "true"
+    TF_INTRA_OP_THREADS = int(os.getenv("TF_INTRA_OP_THREADS", "0"))  # 0 = default TF
+    TF_INTER_OP_THREADS = int(os.getenv("TF_INTER_OP_THREADS", "0"))
+    TRAIN_REPORT_PATH = os.getenv("TRAIN_REPORT_PATH", "models/train_report.json")
+    TUNING_DIR = os.getenv("TUNING_DIR", "models/tuning")
+    TUNE_TRIALS = int(os.getenv("TUNE_TRIALS", "12"))
+    TUNE_WORKERS = int(os.getenv("TUNE_WORKERS", "2"))
+    REPLAY_DIR = os.getenv("REPLAY_DIR", "data/replay")  # rekaman .bi5 untuk replay_pipeline.py
+    # Realtime (candle parsial jam berjalan)
+    REALTIME_INTERVAL_SECONDS = float(os.getenv("REALTIME_INTERVAL_SECONDS", "60"))
+    REALTIME_HISTORY_BARS = int(os.getenv("REALTIME_HISTORY_BARS", "2000"))  # cukup untuk warmup EMA 200
+    REALTIME_RELOAD_MINUTE = int(os.getenv("REALTIME_RELOAD_MINUTE", "10"))  # reload history setelah sync :05
+    # Profiling opt-in (src/utils/profiling.py): PROFILE = "" | sample | cprofile
+    PROFILE = os.getenv("PROFILE", "")
+    PROFILE_MEMORY = os.getenv("PROFILE_MEMORY", "false").lower() == "true"
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+    PROFILE_MEMORY_FRAMES = int(os.getenv("PROFILE_MEMORY_FRAMES", "1"))  # frame traceback tracemalloc
     MIN_CONFIDENCE = float(os.getenv("MIN_CONFIDENCE", "0.70"))  # ← TAMBAHKAN INI
+    # Risk sizing signal (src/prediction/portfolio.py)
+    ACCOUNT_BALANCE = float(os.getenv("ACCOUNT_BALANCE", "10000"))
+    ACCOUNT_CURRENCY = os.getenv("ACCOUNT_CURRENCY", "USD")
+    RISK_PER_TRADE = float(os.getenv("RISK_PER_TRADE", "0.02"))  # fraksi balance kalau SL kena
+    MAX_CORRELATED_RISK = float(os.getenv("MAX_CORRELATED_RISK", "0.04"))  # per posisi, termasuk yang berkorelasi
+    MAX_PORTFOLIO_RISK = float(os.getenv("MAX_PORTFOLIO_RISK", "0.06"))
+    CORRELATION_BARS = int(os.getenv("CORRELATION_BARS", "500"))
+    LOT_STEP = float(os.getenv("LOT_STEP", "0.01"))
+    MIN_LOT = float(os.getenv("MIN_LOT", "0.01"))
+    MAX_LOT = float(os.getenv("MAX_LOT", "10"))
     
     @classmethod
     def validate(cls):
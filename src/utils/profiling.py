@@ -0,0 +1,283 @@
+"""
+Profiling opt-in untuk script pipeline
+
+Aktif lewat env atau flag CLI (flag di-strip dari sys.argv sebelum main()
+mem-parse argumen sendiri):
+
+    PROFILE=sample  python scripts/sync_h1_data.py     # atau --profile sample
+    PROFILE=cprofile python scripts/train_model.py     # atau --profile cprofile
+    PROFILE_MEMORY=true python scripts/generate_predictions.py   # atau --profile-memory
+
+Output di PROFILE_DIR/{script}-{YYYYmmdd-HHMMSS}.*:
+
+    .folded   (sample) stack terlipat "thread;frame;frame count", langsung
+              untuk flamegraph.pl / speedscope / inferno
+    .prof     (cprofile) pstats, untuk snakeviz / flameprof / gprof2dot
+    .txt      top fungsi (cprofile) + top alokasi (memory)
+    .json     ringkasan: wall time, peak RSS, statistik alokasi per fungsi
+              hot (@track_allocations) + diff snapshot tracemalloc call pertama
+
+Tanpa profiling, @track_allocations hanya 1 cek boolean per call.
+
+Fungsi yang jalan di process pool (decode_hour di DownloadPipeline) dicatat
+di worker (worker_init + drain_allocations), dikirim balik bersama hasil
+task, dan digabung per worker di 'workers' summary .json.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Optional
+
+from src.utils.config import config
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cprofile', 'sample')
+
+_memory = {'enabled': False, 'functions': {}, 'workers': {}, 'active': 0}
+_memory_lock = threading.Lock()
+# Kedalaman nested per thread; tracked call di thread lain dihitung _memory['active']
+_depth = threading.local()
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Snapshot tanpa alokasi tracemalloc sendiri"""
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Sampling profiler: stack semua thread setiap interval detik -> folded stacks"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> 'StackSampler':
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_folded(self, path: str):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def allocations_enabled() -> bool:
+    return _memory['enabled']
+
+
+def _new_stats() -> dict:
+    return {'calls': 0, 'seconds': 0.0, 'net_kb': 0.0, 'peak_kb': 0.0, 'first_call_top': None}
+
+
+def track_allocations(name: Optional[str] = None) -> Callable:
+    """
+    Decorator fungsi hot: kalau memory profiling aktif, catat calls, waktu,
+    net + peak alokasi (tracemalloc) dan diff snapshot untuk call pertama
+
+    tracemalloc global per process: peak hanya di-reset kalau tidak ada
+    tracked call lain yang sedang jalan (thread mana pun), jadi call yang
+    overlap dengan thread lain ikut menghitung alokasi thread itu (peak
+    bisa lebih besar, tidak pernah lebih kecil)
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _memory['enabled']:
+                return func(*args, **kwargs)
+
+            depth = getattr(_depth, 'value', 0)
+            with _memory_lock:
+                stats = _memory['functions'].setdefault(label, _new_stats())
+                first = stats['first_call_top'] is None and depth == 0 and _memory['active'] == 0
+            # Snapshot sebelum current: memori snapshot tidak ikut net / peak
+            before = _snapshot() if first else None
+            with _memory_lock:
+                current, _ = tracemalloc.get_traced_memory()
+                # Nested / thread lain sedang jalan: jangan reset peak mereka
+                if _memory['active'] == 0:
+                    tracemalloc.reset_peak()
+                _memory['active'] += 1
+            _depth.value = depth + 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                _depth.value = depth
+                with _memory_lock:
+                    _memory['active'] -= 1
+                    after, peak = tracemalloc.get_traced_memory()
+                    stats['calls'] += 1
+                    stats['seconds'] += elapsed
+                    stats['net_kb'] += (after - current) / 1024
+                    stats['peak_kb'] = max(stats['peak_kb'], (peak - current) / 1024)
+                if before is not None:
+                    diff = _snapshot().compare_to(before, 'lineno')
+                    stats['first_call_top'] = [str(d) for d in diff[:10]]
+
+        return wrapper
+    return decorator
+
+
+def worker_init(memory: bool, frames: int = 1):
+    """Initializer process pool: aktifkan @track_allocations di worker"""
+    if memory:
+        tracemalloc.start(frames)
+        _memory.update(enabled=True, functions={}, workers={}, active=0)
+
+
+def drain_allocations() -> dict:
+    """Statistik @track_allocations worker sejak drain terakhir (lalu di-reset)"""
+    with _memory_lock:
+        functions, _memory['functions'] = _memory['functions'], {}
+    return functions
+
+
+def merge_worker_allocations(worker: str, functions: dict):
+    """Gabungkan hasil drain_allocations worker ke summary process utama"""
+    if not functions or not _memory['enabled']:
+        return
+    with _memory_lock:
+        totals = _memory['workers'].setdefault(worker, {})
+        for label, stats in functions.items():
+            total = totals.setdefault(label, _new_stats())
+            for key in ('calls', 'seconds', 'net_kb'):
+                total[key] += stats[key]
+            total['peak_kb'] = max(total['peak_kb'], stats['peak_kb'])
+            total['first_call_top'] = total['first_call_top'] or stats['first_call_top']
+
+
+def _pop_flags(argv: list) -> tuple:
+    """Ambil --profile MODE / --profile=MODE / --profile-memory dari argv"""
+    mode, memory, rest = None, False, [argv[0]]
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == '--profile':
+            mode = next(args, None)
+        elif arg.startswith('--profile='):
+            mode = arg.split('=', 1)[1]
+        elif arg == '--profile-memory':
+            memory = True
+        else:
+            rest.append(arg)
+    return mode, memory, rest
+
+
+def _rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def profile_main(name: str) -> Callable:
+    """Decorator main() script: profiling sesuai PROFILE / PROFILE_MEMORY / flag CLI"""
+    def decorator(main):
+        @functools.wraps(main)
+        def wrapper(*args, **kwargs):
+            mode, memory, sys.argv[:] = _pop_flags(sys.argv)
+            mode = mode or config.PROFILE or None
+            memory = memory or config.PROFILE_MEMORY
+            if mode is None and not memory:
+                return main(*args, **kwargs)
+            if mode is not None and mode not in MODES:
+                raise SystemExit(f"--profile harus salah satu dari {MODES}, bukan {mode!r}")
+
+            os.makedirs(config.PROFILE_DIR, exist_ok=True)
+            base = os.path.join(config.PROFILE_DIR, f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}")
+            logger.info(f"Profiling {name}: mode={mode}, memory={memory} -> {base}.*")
+
+            if memory:
+                tracemalloc.start(config.PROFILE_MEMORY_FRAMES)
+                _memory.update(enabled=True, functions={}, workers={}, active=0)
+            sampler = StackSampler(config.PROFILE_SAMPLE_INTERVAL).start() if mode == 'sample' else None
+            profiler = cProfile.Profile() if mode == 'cprofile' else None
+
+            start = time.perf_counter()
+            try:
+                if profiler is not None:
+                    return profiler.runcall(main, *args, **kwargs)
+                return main(*args, **kwargs)
+            finally:
+                wall = time.perf_counter() - start
+                summary = {'script': name, 'mode': mode, 'memory': memory, 'argv': sys.argv[1:],
+                           'wall_seconds': round(wall, 3), 'peak_rss_mb': _rss_mb(), 'files': []}
+                text = []
+
+                if sampler is not None:
+                    sampler.stop()
+                    sampler.write_folded(f"{base}.folded")
+                    summary['samples'] = sampler.samples
+                    summary['files'].append(f"{base}.folded")
+
+                if profiler is not None:
+                    profiler.dump_stats(f"{base}.prof")
+                    summary['files'].append(f"{base}.prof")
+                    with open(f"{base}.txt", 'w') as f:
+                        pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(40)
+                    text.append(f"{base}.txt")
+
+                if memory:
+                    top = _snapshot().statistics('lineno')[:30]
+                    summary['functions'] = _memory['functions']
+                    summary['workers'] = _memory['workers']
+                    summary['traced_peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                    _memory['enabled'] = False
+                    tracemalloc.stop()
+                    with open(f"{base}.txt", 'a') as f:
+                        f.write("\nTop allocations (live at exit)\n")
+                        f.writelines(f"{stat}\n" for stat in top)
+                    text.append(f"{base}.txt")
+
+                summary['files'].extend(sorted(set(text)))
+                with open(f"{base}.json", 'w') as f:
+                    json.dump(summary, f, indent=2, default=str)
+                logger.info(f"Profile: {base}.json ({wall:.1f}s)")
+
+        return wrapper
+    return decorator
@@ -0,0 +1,128 @@
+"""
+Symbol universe + deterministic sharding
+
+Universe = config.SYMBOLS (env SYMBOLS, default semua 11 pairs). Setiap
+stage bisa dijalankan di N worker / runner, masing-masing hanya symbol di
+shard-nya:
+
+    python scripts/sync_h1_data.py --shard 0/4
+    SHARD_INDEX=0 SHARD_COUNT=4 python scripts/sync_h1_data.py
+
+Pembagian deterministik tanpa koordinasi: symbol diurutkan menurut hash
+stabil namanya (sha1, bukan hash() Python yang di-salt per process) lalu
+dibagi round-robin, jadi semua runner dengan universe + SHARD_COUNT sama
+mendapat pembagian yang sama dan ukuran shard selisih maksimal 1 symbol
+(hash modulo murni bisa 9/2 untuk 11 symbol di 2 shard). Tambah pair =
+tambah SHARD_COUNT, bukan tambah wall-clock.
+
+Instrument Dukascopy diturunkan dari nama symbol (dukascopy_symbol,
+price_divisor), jadi symbol baru cukup ditambah ke SYMBOLS; pengecualian
+ditulis di PRICE_DIVISORS / DUKASCOPY_SYMBOLS.
+"""
+
+import argparse
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.config import config
+
+DEFAULT_SYMBOLS = [
+    'EURUSD', 'GBPUSD', 'XAUUSD',
+    'USDJPY', 'AUDUSD', 'USDCHF',
+    'USDCAD', 'NZDUSD', 'EURGBP',
+    'EURJPY', 'GBPJPY'
+]
+
+
+def parse_symbols(value: Optional[str]) -> List[str]:
+    """'EURUSD, gbpusd,,EURUSD' -> ['EURUSD', 'GBPUSD'] (urutan dipertahankan)"""
+    symbols = []
+    for s in (value or '').split(','):
+        s = s.strip().upper()
+        if s and s not in symbols:
+            symbols.append(s)
+    return symbols
+
+
+def parse_table(value: Optional[str]) -> Dict[str, str]:
+    """'XAUUSD:1000, xagusd:1000' -> {'XAUUSD': '1000', 'XAGUSD': '1000'}"""
+    table = {}
+    for item in (value or '').split(','):
+        if item.strip():
+            key, _, val = item.partition(':')
+            if not val.strip():
+                raise ValueError(f"Expected 'SYMBOL:value', got {item.strip()!r}")
+            table[key.strip().upper()] = val.strip()
+    return table
+
+
+def _check_symbol(symbol: str):
+    if not re.fullmatch(r'[A-Z0-9]{3,}', symbol):
+        raise ValueError(f"Invalid symbol {symbol!r}")
+
+
+def dukascopy_symbol(symbol: str) -> str:
+    """Nama instrument di datafeed Dukascopy (default = symbol)"""
+    _check_symbol(symbol)
+    return parse_table(config.DUKASCOPY_SYMBOLS).get(symbol, symbol)
+
+
+def price_divisor(symbol: str) -> int:
+    """Pembagi harga integer tick Dukascopy (point per 1.0 harga)"""
+    _check_symbol(symbol)
+    override = parse_table(config.PRICE_DIVISORS).get(symbol)
+    if override is not None:
+        return int(override)
+    return 1000 if 'JPY' in symbol else 100000
+
+
+def universe() -> List[str]:
+    """Semua symbol yang diproses pipeline"""
+    return parse_symbols(",".join(config.SYMBOLS)) or list(DEFAULT_SYMBOLS)
+
+
+def _hash_key(symbol: str) -> bytes:
+    return hashlib.sha1(symbol.upper().encode()).digest()
+
+
+def select_shard(symbols: Iterable[str], index: int = 0, count: int = 1) -> List[str]:
+    """Symbol milik shard index/count (urutan input dipertahankan)"""
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {index}/{count}")
+    symbols = list(symbols)
+    if count == 1:
+        return symbols
+    ranked = sorted(symbols, key=_hash_key)
+    mine = set(ranked[index::count])
+    return [s for s in symbols if s in mine]
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """'1/4' -> (1, 4); dipakai sebagai argparse type"""
+    try:
+        index, count = (int(x) for x in value.split('/'))
+        select_shard([], index, count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard harus 'index/count' dengan 0 <= index < count, bukan {value!r}")
+    return index, count
+
+
+def add_symbol_args(parser: argparse.ArgumentParser):
+    """--symbols + --shard (default dari SYMBOLS / SHARD_INDEX / SHARD_COUNT)"""
+    parser.add_argument("--symbols", help="Comma-separated, default: universe (env SYMBOLS)")
+    parser.add_argument("--shard", type=parse_shard, default=(config.SHARD_INDEX, config.SHARD_COUNT),
+                        help="index/count, mis. 0/4 (default: env SHARD_INDEX / SHARD_COUNT)")
+
+
+def resolve_symbols(args: argparse.Namespace, shard: bool = True) -> List[str]:
+    """Symbol untuk run ini dari args add_symbol_args"""
+    symbols = parse_symbols(args.symbols) or universe()
+    if not shard:
+        return symbols
+    return select_shard(symbols, *args.shard)
+
+
+def shard_label(args: argparse.Namespace) -> str:
+    index, count = args.shard
+    return f"{index}/{count}" if count > 1 else "-"
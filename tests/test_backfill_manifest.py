@@ -0,0 +1,59 @@
+"""CheckpointManifest: range partial per unit digabung, remaining = sisa semua range"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from src.data.backfill import CheckpointManifest
+
+UID = 'EURUSD|2024-03'
+
+
+def day(d: int, h: int = 0) -> datetime:
+    return datetime(2024, 3, d, h)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return CheckpointManifest(str(tmp_path / "manifest.json"))
+
+
+def test_disjoint_ranges_kept(manifest, tmp_path):
+    manifest.mark_range(UID, day(20), day(25), 10)
+    manifest.mark_range(UID, day(3), day(5), 5)
+
+    assert manifest.remaining(UID, day(1), day(31, 23)) == [
+        (day(1), day(2, 23)), (day(5, 1), day(19, 23)), (day(25, 1), day(31, 23))
+    ]
+    # Tersimpan dan terbaca ulang
+    reopened = CheckpointManifest(str(tmp_path / "manifest.json"))
+    assert reopened.remaining(UID, day(4), day(21)) == [(day(5, 1), day(19, 23))]
+
+
+def test_overlapping_and_adjacent_merge(manifest):
+    manifest.mark_range(UID, day(3), day(5), 1)
+    manifest.mark_range(UID, day(10), day(12), 1)
+    manifest.mark_range(UID, day(5, 1), day(10, 5), 1)  # bersambung kiri, overlap kanan
+
+    assert manifest.partial[UID]['ranges'] == [[day(3).isoformat(), day(12).isoformat()]]
+    assert manifest.partial[UID]['rows'] == 3
+
+
+def test_full_month_completes(manifest):
+    manifest.mark_range(UID, day(16), day(31, 23), 1)
+    manifest.mark_range(UID, day(1), day(15, 23), 1)
+
+    assert manifest.is_done(UID) and UID not in manifest.partial
+    assert manifest.remaining(UID, day(1), day(31, 23)) == []
+
+
+def test_old_format_upgraded(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({'completed': {}, 'partial': {
+        UID: {'start': day(1).isoformat(), 'end': day(10).isoformat(), 'rows': 4}
+    }}))
+
+    manifest = CheckpointManifest(str(path))
+    manifest.mark_range(UID, day(20), day(21), 1)
+    assert manifest.remaining(UID, day(1), day(31, 23)) == [(day(10, 1), day(19, 23)), (day(21, 1), day(31, 23))]
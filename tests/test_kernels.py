@@ -0,0 +1,90 @@
+"""Parity indicator kernels (src/features/kernels.py) vs library `ta`"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ta = pytest.importorskip("ta")
+
+from src.features import kernels
+
+BARS = 2000
+RTOL = 1e-4
+
+
+@pytest.fixture(scope="module")
+def ohlc():
+    """Random walk fixed (seed), float32 seperti panel"""
+    rng = np.random.default_rng(7)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 1e-3, BARS)))
+    spread = np.abs(rng.normal(0, 5e-4, (2, BARS)))
+    return (
+        close.astype(np.float32),
+        (close * (1 + spread[0])).astype(np.float32),
+        (close * (1 - spread[1])).astype(np.float32),
+    )
+
+
+def series(x: np.ndarray) -> pd.Series:
+    return pd.Series(x.astype(np.float64))
+
+
+def assert_parity(got: np.ndarray, expected: pd.Series):
+    expected = expected.to_numpy()
+    assert got.dtype == np.float32
+    np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))
+    valid = ~np.isnan(expected)
+    scale = np.abs(expected[valid]).max()
+    np.testing.assert_allclose(got[valid], expected[valid], rtol=0, atol=RTOL * scale)
+
+
+@pytest.mark.parametrize("window", [20, 50, 200])
+def test_ema(ohlc, window):
+    close, _, _ = ohlc
+    expected = ta.trend.EMAIndicator(series(close), window=window).ema_indicator()
+    assert_parity(kernels.ema(close, window), expected)
+
+
+def test_rsi(ohlc):
+    close, _, _ = ohlc
+    expected = ta.momentum.RSIIndicator(series(close), window=14).rsi()
+    assert_parity(kernels.rsi(close, 14), expected)
+
+
+def test_macd(ohlc):
+    close, _, _ = ohlc
+    reference = ta.trend.MACD(series(close))
+    line, signal, histogram = kernels.macd(close)
+    assert_parity(line, reference.macd())
+    assert_parity(signal, reference.macd_signal())
+    assert_parity(histogram, reference.macd_diff())
+
+
+def test_bollinger(ohlc):
+    close, _, _ = ohlc
+    reference = ta.volatility.BollingerBands(series(close))
+    upper, middle, lower = kernels.bollinger(close)
+    assert_parity(upper, reference.bollinger_hband())
+    assert_parity(middle, reference.bollinger_mavg())
+    assert_parity(lower, reference.bollinger_lband())
+
+
+def test_atr(ohlc):
+    close, high, low = ohlc
+    expected = ta.volatility.AverageTrueRange(series(high), series(low), series(close), window=14)
+    assert_parity(kernels.atr(high, low, close, 14), expected.average_true_range())
+
+
+def test_compute_indicators_batch_matches_single(ohlc):
+    """2D (symbols, bars) = per symbol; row pendek dengan NaN di ekor (padding panel) tidak bocor"""
+    close, high, low = ohlc
+    short = BARS // 2
+    stacked = [np.stack([x, np.r_[x[:short], np.full(BARS - short, np.nan, np.float32)]]) for x in (close, high, low)]
+
+    batch = kernels.compute_indicators(*stacked)
+    full = kernels.compute_indicators(close, high, low)
+    head = kernels.compute_indicators(close[:short], high[:short], low[:short])
+
+    for name, values in batch.items():
+        np.testing.assert_array_equal(values[0], full[name])
+        np.testing.assert_array_equal(values[1, :short], head[name])
@@ -0,0 +1,90 @@
+"""Label training (src/features/labels.py) vs implementasi loop per bar"""
+
+import numpy as np
+import pytest
+
+from src.features import labels
+from src.features.labels import BUY, HOLD, INVALID, SELL
+
+
+@pytest.fixture(scope="module")
+def bars():
+    rng = np.random.default_rng(3)
+    n = 3000
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 2e-3, n)))
+    high = close * (1 + np.abs(rng.normal(0, 1e-3, n)))
+    low = close * (1 - np.abs(rng.normal(0, 1e-3, n)))
+    atr = np.full(n, 2e-3)
+    atr[:13] = np.nan
+    return close, high, low, atr
+
+
+def reference_triple_barrier(close, high, low, atr, horizon, tp_mult, sl_mult):
+    """Loop per bar: aturan yang sama dengan docstring triple_barrier_labels"""
+    n = len(close)
+    out = np.full(n, INVALID, dtype=np.int8)
+    for t in range(n - horizon):
+        if not (np.isfinite(atr[t]) and atr[t] > 0):
+            continue
+
+        def first(hits):
+            return next((k for k, hit in enumerate(hits) if hit), horizon)
+
+        hw, lw = high[t + 1:t + 1 + horizon], low[t + 1:t + 1 + horizon]
+        buy = first(hw >= close[t] + tp_mult * atr[t]) < first(lw <= close[t] - sl_mult * atr[t])
+        sell = first(lw <= close[t] - tp_mult * atr[t]) < first(hw >= close[t] + sl_mult * atr[t])
+        out[t] = BUY if buy and not sell else SELL if sell and not buy else HOLD
+    return out
+
+
+def test_forward_returns(bars):
+    close = bars[0]
+    out = labels.forward_returns(close, horizons=(1, 4))
+
+    np.testing.assert_allclose(out[:-1, 0], close[1:] / close[:-1] - 1)
+    np.testing.assert_allclose(out[:-4, 1], close[4:] / close[:-4] - 1)
+    assert np.isnan(out[-4:, 1]).all()
+
+
+def test_return_labels_threshold():
+    out = labels.return_labels(np.array([0.002, -0.002, 0.0005, np.nan]), threshold=0.001)
+    assert out.tolist() == [BUY, SELL, HOLD, INVALID]
+
+
+@pytest.mark.parametrize('horizon', [1, 4, 12])
+def test_triple_barrier_matches_loop(bars, horizon):
+    expected = reference_triple_barrier(*bars, horizon, labels.TP_ATR_MULT, labels.SL_ATR_MULT)
+    out = labels.triple_barrier_labels(*bars, horizon=horizon)
+
+    np.testing.assert_array_equal(out, expected)
+    assert (out[:13] == INVALID).all()
+    assert (out[-horizon:] == INVALID).all()
+    assert {BUY, SELL, HOLD} <= set(out.tolist())
+
+
+def test_triple_barrier_chunking(bars):
+    np.testing.assert_array_equal(
+        labels.triple_barrier_labels(*bars, chunk_size=7),
+        labels.triple_barrier_labels(*bars)
+    )
+
+
+def test_triple_barrier_short_series(bars):
+    close, high, low, atr = (x[:3] for x in bars)
+    assert (labels.triple_barrier_labels(close, high, low, atr, horizon=4) == INVALID).all()
+
+
+def test_make_labels(bars):
+    close, high, low, atr = bars
+    np.testing.assert_array_equal(
+        labels.make_labels('next_bar', close),
+        labels.horizon_labels(close, (1,))[:, 0]
+    )
+    np.testing.assert_array_equal(
+        labels.make_labels('triple_barrier', close, high, low, atr),
+        labels.triple_barrier_labels(close, high, low, atr)
+    )
+    with pytest.raises(ValueError):
+        labels.make_labels('triple_barrier', close)
+    with pytest.raises(ValueError):
+        labels.make_labels('unknown', close)
@@ -0,0 +1,126 @@
+"""Outbox: replay idempotent, update di tempat, entry kedaluwarsa dibuang"""
+
+import time
+
+import pytest
+
+from src.data.outbox import Outbox
+
+
+class FakeQuery:
+    def __init__(self, client, table, op, rows, **kwargs):
+        self.client, self.call = client, {'table': table, 'op': op, 'rows': rows, **kwargs}
+
+    def eq(self, column, value):
+        self.call.setdefault('match', {})[column] = value
+        return self
+
+    def execute(self):
+        if self.client.fail:
+            raise ConnectionError("database down")
+        self.client.calls.append(self.call)
+        return self
+
+
+class FakeTable:
+    def __init__(self, client, name):
+        self.client, self.name = client, name
+
+    def insert(self, rows):
+        return FakeQuery(self.client, self.name, 'insert', rows)
+
+    def upsert(self, rows, on_conflict, ignore_duplicates=False):
+        return FakeQuery(self.client, self.name, 'upsert', rows,
+                         on_conflict=on_conflict, ignore_duplicates=ignore_duplicates)
+
+    def update(self, values):
+        return FakeQuery(self.client, self.name, 'update', values)
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.db"), FakeClient())
+    yield box
+    box.client = None
+    box.close()
+
+
+def prediction(symbol, key):
+    return {'symbol': symbol, 'signal': 'BUY', 'signal_key': key}
+
+
+def test_idempotent_insert_ignores_duplicates(outbox):
+    outbox.insert('predictions', [prediction('EURUSD', 'a'), prediction('GBPUSD', 'b')], on_conflict='signal_key')
+    outbox.insert('predictions', [prediction('EURUSD', 'a')], on_conflict='signal_key')
+
+    assert outbox.flush() == 3
+    (call,) = outbox.client.calls
+    assert call['op'] == 'upsert' and call['ignore_duplicates'] and call['on_conflict'] == 'signal_key'
+    assert [row['signal_key'] for row in call['rows']] == ['a', 'b']
+
+
+def test_plain_insert_unchanged(outbox):
+    outbox.insert('system_logs', {'message': 'x'})
+    outbox.flush()
+    assert outbox.client.calls[0]['op'] == 'insert'
+
+
+def test_expired_entries_dropped(outbox):
+    outbox.insert('predictions', [prediction('EURUSD', 'old')], on_conflict='signal_key',
+                  expires_at=time.time() - 1)
+    outbox.insert('predictions', [prediction('EURUSD', 'new')], on_conflict='signal_key',
+                  expires_at=time.time() + 3600)
+
+    outbox.flush()
+    assert [row['signal_key'] for call in outbox.client.calls for row in call['rows']] == ['new']
+    assert outbox.pending() == 0
+
+
+def test_failed_entry_expires_before_retry(outbox, monkeypatch):
+    outbox.client.fail = True
+    outbox.insert('predictions', [prediction('EURUSD', 'a')], on_conflict='signal_key',
+                  expires_at=time.time() + 60)
+    assert outbox.flush() == 0 and outbox.pending() == 1
+
+    # Run berikutnya (outbox dari cache) setelah valid_until lewat: tidak dikirim terlambat
+    outbox.client.fail = False
+    monkeypatch.setattr(time, 'time', lambda real=time.time: real() + 120)
+    outbox.flush()
+    assert outbox.client.calls == [] and outbox.pending() == 0
+
+
+def test_update_replaced_in_place(outbox):
+    outbox.update('ohlc_data', {'rsi_14': 1.0}, {'id': 7})
+    outbox.insert('system_logs', {'message': 'x'})
+    outbox.update('ohlc_data', {'rsi_14': 2.0}, {'id': 7})
+
+    outbox.flush()
+    assert [c['op'] for c in outbox.client.calls] == ['update', 'insert']
+    assert outbox.client.calls[0]['rows'] == {'rsi_14': 2.0}
+
+
+def test_old_schema_migrated(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, op TEXT NOT NULL, "
+                 "on_conflict TEXT, match TEXT, payload TEXT NOT NULL, n_rows INTEGER NOT NULL, "
+                 "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+                 "last_error TEXT, created_at REAL NOT NULL)")
+    conn.execute("INSERT INTO outbox (tbl, op, payload, n_rows, created_at) VALUES ('t', 'insert', '[{}]', 1, 0)")
+    conn.commit()
+    conn.close()
+
+    box = Outbox(path, FakeClient())
+    assert box.flush() == 1
+    box.close()
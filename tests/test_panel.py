@@ -0,0 +1,77 @@
+"""Round-trip OHLCPanel from_frames / pack / unpack / to_frame"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.panel import OHLCPanel
+
+
+def frame(start: str, hours: int, seed: int, drop=()) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range(start, periods=hours, freq='h', tz='UTC')
+    close = 1 + rng.random(hours)
+    df = pd.DataFrame({
+        'timestamp': ts,
+        'open': close, 'high': close + 0.1, 'low': close - 0.1, 'close': close,
+        'volume': rng.integers(1, 100, hours),
+    })
+    return df.drop(index=list(drop)).reset_index(drop=True)
+
+
+@pytest.fixture
+def panel():
+    return OHLCPanel.from_frames({
+        'EURUSD': frame('2024-01-01', 48, seed=1, drop=(5, 6, 30)),
+        'GBPUSD': frame('2024-01-01 12:00', 40, seed=2),
+        'EMPTY': pd.DataFrame(),
+    })
+
+
+def test_from_frames_aligns_union(panel):
+    assert panel.symbols == ['EURUSD', 'GBPUSD']
+    assert panel.timestamps.tz is None
+    # Jam 05-06 hilang di kedua symbol, jadi tidak masuk index
+    assert len(panel.timestamps) == 50
+    assert panel.values.shape == (2, 50, len(OHLCPanel.BASE_FIELDS))
+    assert panel.mask.sum(axis=1).tolist() == [45, 40]
+    assert np.isnan(panel.field('close')[~panel.mask]).all()
+
+
+def test_to_frame_roundtrip(panel):
+    source = frame('2024-01-01', 48, seed=1, drop=(5, 6, 30))
+    out = panel.to_frame('EURUSD')
+
+    assert out['timestamp'].tolist() == source['timestamp'].dt.tz_convert(None).tolist()
+    for field in OHLCPanel.BASE_FIELDS:
+        np.testing.assert_array_equal(out[field].to_numpy(), source[field].to_numpy(np.float32))
+
+
+@pytest.mark.parametrize('fields', [['close'], ['open', 'close'], OHLCPanel.BASE_FIELDS])
+def test_pack_unpack_roundtrip(panel, fields):
+    # 1 field: array 2D (symbols, bars); lebih dari 1: 3D
+    arr = panel.field(fields[0]) if len(fields) == 1 else panel.values[:, :, [panel.fields.index(f) for f in fields]]
+    packed, counts = OHLCPanel.pack(arr, panel.mask)
+
+    assert counts.tolist() == [45, 40]
+    assert packed.shape[:2] == (2, 45)
+    assert not np.isnan(packed[0]).any()
+    assert np.isnan(packed[1, 40:]).all()
+
+    np.testing.assert_array_equal(OHLCPanel.unpack(packed, panel.mask), arr)
+
+
+def test_pack_preserves_order(panel):
+    packed, counts = OHLCPanel.pack(panel.field('close'), panel.mask)
+    for i in range(len(panel.symbols)):
+        np.testing.assert_array_equal(packed[i, :counts[i]], panel.field('close')[i, panel.mask[i]])
+
+
+def test_add_fields_and_valid_mask(panel):
+    rsi = np.where(np.arange(len(panel.timestamps)) < 10, np.nan, 50.0)[None, :].repeat(2, axis=0)
+    panel.add_fields({'rsi_14': rsi, 'close': panel.field('close') * 2})
+
+    assert panel.fields[-1] == 'rsi_14'
+    valid = panel.valid_mask(['close', 'rsi_14'])
+    assert not valid[:, :10].any()
+    np.testing.assert_array_equal(valid[:, 10:], panel.mask[:, 10:])
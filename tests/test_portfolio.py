@@ -0,0 +1,131 @@
+"""Sizing signal: lot per quote currency, cap exposure berkorelasi, korelasi return"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.panel import OHLCPanel
+from src.prediction.portfolio import (build_predictions, contract_sizes, conversion_symbols, prediction_rows,
+                                      quote_rates, return_correlation, size_signals)
+from src.utils.config import config
+
+BUY = [0.1, 0.1, 0.8]
+SELL = [0.8, 0.1, 0.1]
+
+
+@pytest.fixture(autouse=True)
+def account(monkeypatch):
+    # Risk 200 per trade kalau SL (1 ATR) kena
+    for name, value in {'ACCOUNT_BALANCE': 10_000.0, 'ACCOUNT_CURRENCY': 'USD', 'RISK_PER_TRADE': 0.02,
+                        'MIN_CONFIDENCE': 0.5, 'MAX_CORRELATED_RISK': 0.04, 'MAX_PORTFOLIO_RISK': 0.06,
+                        'LOT_STEP': 0.01, 'MIN_LOT': 0.01, 'MAX_LOT': 10.0}.items():
+        monkeypatch.setattr(config, name, value)
+
+
+def sized(symbols, close, atr, prices=None, probabilities=None, correlation=None):
+    prices = {**dict(zip(symbols, close)), **(prices or {})}
+    point_value = contract_sizes(symbols) * quote_rates(symbols, prices)
+    probabilities = probabilities or [BUY] * len(symbols)
+    return size_signals(probabilities, close, atr, point_value, correlation)
+
+
+def test_lot_per_quote_currency():
+    # EURUSD: 0.001 * 100k = 100/lot; EURJPY via USDJPY: 0.2 * 100k / 150 = 133.3/lot;
+    # XAUUSD: contract 100 oz, 2.0 * 100 = 200/lot
+    out = sized(['EURUSD', 'EURJPY', 'XAUUSD'], [1.1, 160.0, 2000.0], [0.001, 0.2, 2.0], prices={'USDJPY': 150.0})
+
+    assert out['lot'] == pytest.approx([2.0, 1.5, 1.0])
+    assert out['risk'] == pytest.approx([0.02, 0.02, 0.02])
+    assert out['accepted'].all()
+    assert out['sl'] == pytest.approx([1.099, 159.8, 1998.0])
+
+
+def test_missing_conversion_rate_not_sized():
+    out = sized(['EURUSD', 'EURCHF'], [1.1, 0.95], [0.001, 0.001], probabilities=[BUY, SELL])
+
+    assert out['accepted'].tolist() == [True, False]
+    assert out['lot'].tolist() == [pytest.approx(2.0), 0.0] and out['risk'][1] == 0.0
+    # Signal + TP / SL tetap ada, hanya lot yang tidak bisa dihitung
+    assert out['signal'][1] == 0 and np.isfinite(out['tp'][1])
+
+
+def test_correlated_positions_capped_per_position():
+    corr = np.full((3, 3), 0.9)
+    np.fill_diagonal(corr, 1.0)
+    out = sized(['EURUSD', 'GBPUSD', 'NZDUSD'], [1.1, 1.3, 0.6], [0.001] * 3, correlation=corr)
+
+    # (C @ r)_i = 0.02 * 2.8 = 0.056 > 0.04 -> semua dikecilkan 0.04 / 0.056
+    scale = 0.04 / 0.056
+    assert out['lot'] == pytest.approx([np.floor(200 * scale) / 100] * 3)
+    assert (corr @ out['risk']).max() <= 0.04 + 1e-9
+
+
+def test_hedged_positions_not_capped():
+    corr = np.array([[1.0, -0.9], [-0.9, 1.0]])
+    out = sized(['EURUSD', 'USDCHF'], [1.1, 0.9], [0.001, 0.0009], prices={'USDCHF': 0.9}, correlation=corr)
+
+    assert out['lot'] == pytest.approx([2.0, 2.0])
+
+
+def test_portfolio_risk_cap(monkeypatch):
+    monkeypatch.setattr(config, 'MAX_CORRELATED_RISK', 1.0)
+    monkeypatch.setattr(config, 'MAX_PORTFOLIO_RISK', 0.03)
+    out = sized(['EURUSD', 'GBPUSD', 'XAUUSD'], [1.1, 1.3, 2000.0], [0.001, 0.001, 2.0],
+                probabilities=[BUY, SELL, BUY], correlation=np.eye(3))
+
+    # sqrt(3) * 0.02 = 0.0346 > 0.03 -> semua dikecilkan 0.03 / 0.0346
+    scale = 0.03 / (0.02 * np.sqrt(3))
+    assert out['lot'] == pytest.approx([np.floor(200 * scale) / 100, np.floor(200 * scale) / 100,
+                                        np.floor(100 * scale) / 100])
+    assert np.sqrt(out['risk'] @ out['risk']) <= 0.03
+
+
+def test_build_predictions_uses_conversion_price():
+    predictors = {s: SimpleNamespace(model_version='v1', algorithm='LSTM') for s in ('EURJPY', 'EURCHF')}
+    latest = {
+        'EURJPY': {'close': 160.0, 'atr_14': 0.2, 'timestamp': pd.Timestamp('2024-03-01 10:00')},
+        'EURCHF': {'close': 0.95, 'atr_14': 0.001, 'timestamp': pd.Timestamp('2024-03-01 10:00')},
+    }
+    predictions = build_predictions(['EURJPY', 'EURCHF'], predictors, [BUY, BUY], latest,
+                                    prices={'USDJPY': 150.0})
+
+    assert [p['lot_size'] for p in predictions] == [1.5, 0.0]
+    assert [r['symbol'] for r in prediction_rows(predictions)] == ['EURJPY']
+    assert predictions[0]['signal_key'] == 'EURJPY|H1|2024-03-01T10:00|v1|BUY'
+
+
+def test_conversion_symbols():
+    symbols = ['EURJPY', 'XAUUSD', 'EURGBP']
+    assert conversion_symbols(symbols, available=['GBPUSD', 'USDJPY', 'EURUSD']) == ['GBPUSD', 'USDJPY']
+    assert conversion_symbols(symbols) == ['USDGBP', 'GBPUSD', 'USDJPY', 'JPYUSD']
+    # Pair konversi sudah ikut di run
+    assert conversion_symbols(symbols + ['USDJPY'], available=['GBPUSD']) == ['GBPUSD']
+
+
+def test_return_correlation_with_missing_bars():
+    rng = np.random.default_rng(3)
+    ts = pd.date_range('2024-01-01', periods=120, freq='h')
+    common = rng.normal(0, 1e-3, 120)
+    closes = {
+        'EURUSD': np.exp(np.cumsum(common + rng.normal(0, 5e-4, 120))),
+        'GBPUSD': np.exp(np.cumsum(common + rng.normal(0, 5e-4, 120))),
+        'USDJPY': np.exp(np.cumsum(rng.normal(0, 1e-3, 120))),
+    }
+    drop = {'EURUSD': [10, 50, 51], 'GBPUSD': [70, 100], 'USDJPY': list(range(0, 100))}
+    frames = {s: pd.DataFrame({'timestamp': ts, 'open': c, 'high': c, 'low': c, 'close': c, 'volume': 1})
+                 .drop(index=drop[s]).reset_index(drop=True)
+              for s, c in closes.items()}
+    panel = OHLCPanel.from_frames(frames)
+    symbols = ['EURUSD', 'GBPUSD', 'USDJPY']
+
+    corr = return_correlation(panel, symbols, bars=100)
+
+    close = pd.DataFrame(panel.field('close')[[panel.symbol_index(s) for s in symbols], -101:].T, columns=symbols)
+    expected = np.log(close).diff().corr().to_numpy()
+    assert corr[0, 1] == pytest.approx(expected[0, 1]) and corr[0, 1] > 0.5
+    # USDJPY < 30 return bersama -> 0, diagonal tetap 1
+    assert corr[0, 2] == corr[2, 1] == 0.0
+    np.testing.assert_array_equal(np.diag(corr), 1.0)
+    np.testing.assert_allclose(corr, corr.T)
@@ -0,0 +1,61 @@
+"""@track_allocations: nested / multi-thread dan statistik worker process pool"""
+
+import threading
+import tracemalloc
+
+import pytest
+
+from src.utils import profiling
+from src.utils.profiling import drain_allocations, merge_worker_allocations, track_allocations
+
+
+@pytest.fixture
+def memory():
+    tracemalloc.start()
+    profiling._memory.update(enabled=True, functions={}, workers={}, active=0)
+    yield profiling._memory
+    profiling._memory['enabled'] = False
+    tracemalloc.stop()
+
+
+@track_allocations('inner')
+def inner():
+    return bytearray(1 << 20)
+
+
+@track_allocations('outer')
+def outer(barrier=None):
+    if barrier is not None:
+        barrier.wait()
+    keep = [inner() for _ in range(2)]
+    return len(keep)
+
+
+def test_nested_calls_across_threads(memory):
+    barrier = threading.Barrier(4)
+    threads = [threading.Thread(target=outer, args=(barrier,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert memory['functions']['outer']['calls'] == 4
+    assert memory['functions']['inner']['calls'] == 8
+    assert memory['active'] == 0
+    # Peak outer mencakup 2 x 1 MB inner-nya sendiri
+    assert memory['functions']['outer']['peak_kb'] >= 2 * 1024
+    assert memory['functions']['outer']['first_call_top']
+
+
+def test_worker_stats_merged(memory):
+    outer()
+    functions = drain_allocations()
+    assert memory['functions'] == {} and functions['inner']['calls'] == 2
+
+    merge_worker_allocations('decode-1', functions)
+    merge_worker_allocations('decode-1', functions)
+    merge_worker_allocations('decode-2', {'inner': functions['inner']})
+
+    assert memory['workers']['decode-1']['outer']['calls'] == 2
+    assert memory['workers']['decode-1']['inner']['calls'] == 4
+    assert set(memory['workers']) == {'decode-1', 'decode-2'}
@@ -0,0 +1,121 @@
+"""validate_ohlc di frame buatan: tiap issue, gap, spike, dan rencana repair"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.quality import ISSUES, RepairLog, validate_ohlc
+
+START = pd.Timestamp('2024-03-04')  # Senin
+N = 120
+
+
+def hour(i: int) -> pd.Timestamp:
+    return START + pd.Timedelta(hours=i)
+
+
+def make_frame() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 1e-4, N)))
+    close[90:] *= 1.05  # level shift permanen: bukan spike
+    open_ = np.r_[close[0], close[:-1]]
+    open_[90] = close[90]
+    df = pd.DataFrame({
+        'id': np.arange(N),
+        'timestamp': [hour(i) for i in range(N)],
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.uniform(1e-5, 1e-4, N),
+        'low': np.minimum(open_, close) - rng.uniform(1e-5, 1e-4, N),
+        'close': close,
+        'volume': rng.integers(1, 100, N),
+    })
+
+    df.loc[30, 'high'] = df.loc[30, 'close'] - 1e-4    # invalid: high < close
+    df.loc[40, 'volume'] = 0                            # zero_volume
+    df.loc[60, 'close'] *= 1.05                         # close melompat lalu balik
+    df.loc[60, 'high'] = df.loc[60, 'close'] + 1e-5
+    df.loc[80, 'high'] += 0.01                          # wick
+
+    df = df.drop(index=[100, 101, 102])                 # gap 3 jam
+    extra = pd.DataFrame([
+        {**df.loc[20].to_dict(), 'id': 1000},           # duplikat jam 20, ditulis belakangan
+        {**df.loc[10].to_dict(), 'id': 1001, 'timestamp': hour(10) + pd.Timedelta(minutes=30)},
+    ])
+    return pd.concat([df, extra], ignore_index=True)
+
+
+class ClosedAt:
+    def __init__(self, *closed):
+        self.closed = set(closed)
+
+    def is_open(self, dt) -> bool:
+        return pd.Timestamp(dt) not in self.closed
+
+
+@pytest.fixture(scope="module")
+def report():
+    return validate_ohlc(make_frame(), 'EURUSD', window=100)
+
+
+def flagged_ids(report, name):
+    return report.ids[report.issues[name]].tolist()
+
+
+def test_each_issue_mask(report):
+    assert set(report.issues) == set(ISSUES)
+    assert all(len(mask) == report.rows == N - 3 + 2 for mask in report.issues.values())
+
+    assert flagged_ids(report, 'out_of_order') == [1000, 1001]
+    # Baris terakhir per timestamp dipertahankan
+    assert flagged_ids(report, 'duplicate') == [20]
+    assert flagged_ids(report, 'off_grid') == [1001]
+    assert flagged_ids(report, 'invalid') == [30]
+    assert flagged_ids(report, 'zero_volume') == [40]
+    assert not report.ok
+
+
+def test_spike_rule(report):
+    # 60: naik lalu balik arah; 80: wick; 90: level shift tanpa balik arah tidak di-flag
+    assert flagged_ids(report, 'spike') == [60, 80]
+
+
+def test_spike_mult_threshold():
+    assert validate_ohlc(make_frame(), 'EURUSD', window=100, spike_mult=1e6).issues['spike'].sum() == 0
+
+
+def test_gap_expansion(report):
+    assert report.missing.tolist() == [hour(100), hour(101), hour(102)]
+    gaps = report.gaps()
+    assert (gaps['start'].iloc[0], gaps['end'].iloc[0], gaps['hours'].iloc[0]) == (hour(100), hour(102), 3)
+
+    # Jam tutup menurut calendar bukan gap
+    closed = validate_ohlc(make_frame(), 'EURUSD', calendar=ClosedAt(hour(101)), window=100)
+    assert closed.missing.tolist() == [hour(100), hour(102)]
+    assert closed.gaps()['hours'].tolist() == [1, 1]
+
+
+def test_delete_ids_and_repair_hours(report):
+    assert sorted(report.delete_ids()) == [20, 1001]
+    assert report.repair_hours().tolist() == [
+        hour(10), hour(30), hour(40), hour(60), hour(80), hour(100), hour(101), hour(102)
+    ]
+
+    no_ids = validate_ohlc(make_frame().drop(columns=['id']), 'EURUSD', window=100)
+    assert no_ids.delete_ids() == []
+
+
+def test_clean_frame_ok():
+    frame = make_frame().iloc[:20]
+    assert validate_ohlc(frame, 'EURUSD', window=100).ok
+
+
+def test_repair_log_pending(tmp_path):
+    hours = pd.DatetimeIndex([hour(i) for i in range(5)])
+    log = RepairLog.for_symbol('EURUSD', str(tmp_path))
+    log.record(repaired=hours[:2], unavailable=hours[3:4])
+    assert log.pending(hours).tolist() == [hour(2), hour(4)]
+
+    log.save()
+    reopened = RepairLog.for_symbol('EURUSD', str(tmp_path))
+    assert reopened.pending(hours).tolist() == [hour(2), hour(4)]
+    assert RepairLog().pending(hours).equals(hours)
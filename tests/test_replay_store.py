@@ -0,0 +1,49 @@
+"""MemoryStore (replay) berperilaku seperti tabel ohlc_data: upsert, id stabil, update by id"""
+
+import numpy as np
+import pandas as pd
+
+from src.data.replay import MemoryStore
+
+
+def bars(start: str, hours: int, close: float = 1.0) -> pd.DataFrame:
+    ts = pd.date_range(start, periods=hours, freq='h')
+    return pd.DataFrame({'timestamp': ts, 'open': close, 'high': close, 'low': close,
+                         'close': close, 'volume': 1})
+
+
+def test_upsert_keeps_ids_and_indicators():
+    store = MemoryStore()
+    store.upload_ohlc(bars('2024-03-01', 3), 'EURUSD')
+    first = store.get_ohlc('EURUSD', columns=('id', 'timestamp', 'close'))
+    store.update_rows('ohlc_data', {'rsi_14': 55.0, 'ema_20': None}, {'id': int(first['id'].iloc[1])})
+
+    # Jam terakhir ditulis ulang + 1 jam baru
+    store.upload_ohlc(bars('2024-03-01 02:00', 2, close=2.0), 'EURUSD')
+    df = store.get_ohlc('EURUSD', columns=('id', 'timestamp', 'close', 'rsi_14', 'atr_14'))
+
+    assert df['id'].tolist()[:3] == first['id'].tolist()
+    assert df['id'].is_unique and len(df) == 4
+    assert df['close'].tolist() == [1.0, 1.0, 2.0, 2.0]
+    assert df['rsi_14'].iloc[1] == 55.0 and np.isnan(df['rsi_14'].iloc[0])
+    assert df['atr_14'].isna().all()
+
+
+def test_timestamp_queries():
+    store = MemoryStore()
+    assert store.get_latest_timestamp('EURUSD') is None
+    store.upload_ohlc(bars('2024-03-01', 5), 'EURUSD')
+
+    assert store.get_latest_timestamp('EURUSD') == pd.Timestamp('2024-03-01 04:00')
+    assert store.get_timestamps('EURUSD', pd.Timestamp('2024-03-01 01:00'), pd.Timestamp('2024-03-01 02:00')) == [
+        '2024-03-01 01:00:00', '2024-03-01 02:00:00'
+    ]
+
+
+def test_idempotent_insert():
+    store = MemoryStore()
+    rows = [{'signal_key': 'a', 'signal': 'BUY'}, {'signal_key': 'a', 'signal': 'SELL'}]
+    store.insert_rows('predictions', rows, on_conflict='signal_key')
+    store.insert_rows('predictions', rows[:1], on_conflict='signal_key')
+
+    assert [r['signal'] for r in store.tables['predictions']] == ['BUY']
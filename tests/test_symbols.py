@@ -0,0 +1,39 @@
+"""Universe, sharding dan spec instrument Dukascopy dari nama symbol"""
+
+import pytest
+
+from src.data.dukascopy_downloader import DukascopyH1Downloader
+from src.utils import symbols
+from src.utils.config import config
+
+
+def test_instrument_rule():
+    assert symbols.price_divisor('EURUSD') == 100000
+    assert symbols.price_divisor('CHFJPY') == 1000
+    assert symbols.dukascopy_symbol('AUDNZD') == 'AUDNZD'
+
+
+def test_instrument_table_overrides(monkeypatch):
+    monkeypatch.setattr(config, 'PRICE_DIVISORS', 'XAUUSD:1000, us500:100')
+    monkeypatch.setattr(config, 'DUKASCOPY_SYMBOLS', 'US500:USA500IDXUSD')
+
+    assert symbols.price_divisor('XAUUSD') == 1000
+    assert symbols.price_divisor('US500') == 100
+    assert symbols.dukascopy_symbol('US500') == 'USA500IDXUSD'
+
+
+def test_downloader_accepts_new_pair():
+    downloader = DukascopyH1Downloader('EURNZD')
+    assert (downloader.dukascopy_symbol, downloader.price_divisor) == ('EURNZD', 100000)
+
+    with pytest.raises(ValueError):
+        DukascopyH1Downloader('eur/usd')
+
+
+def test_shards_partition_universe():
+    universe = symbols.DEFAULT_SYMBOLS + ['EURNZD', 'CHFJPY']
+    shards = [symbols.select_shard(universe, i, 4) for i in range(4)]
+
+    assert sorted(s for shard in shards for s in shard) == sorted(universe)
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
+    assert shards == [symbols.select_shard(universe, i, 4) for i in range(4)]
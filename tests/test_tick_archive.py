@@ -0,0 +1,120 @@
+"""Round-trip TickArchive: encode / decode chunk dan range scan"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.data.dukascopy_downloader import TICK_DTYPE
+from src.data.tick_archive import TickArchive, decode_chunk, encode_chunk, hourly_spread
+
+# Melewati batas bulan supaya scan membaca lebih dari 1 file
+START = datetime(2024, 1, 31, 20)
+HOURS = 8
+
+
+def make_ticks(seed: int, count: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(count, dtype=TICK_DTYPE)
+    ticks['time'] = np.sort(rng.integers(0, 3_600_000, count))
+    ticks['ask'] = 110_000 + np.cumsum(rng.integers(-5, 6, count))
+    ticks['bid'] = ticks['ask'] - rng.integers(0, 20, count)
+    ticks['ask_vol'] = rng.integers(0, 5_000, count)
+    ticks['bid_vol'] = rng.integers(0, 5_000, count)
+    return ticks
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = TickArchive(str(tmp_path))
+    hours = {}
+    for h in range(HOURS):
+        if h == 3:
+            continue  # jam tanpa tick
+        hour_start = START + timedelta(hours=h)
+        hours[hour_start] = make_ticks(h, 50 + 10 * h)
+        archive.write_hour('EURUSD', hour_start, hours[hour_start])
+    return archive, hours
+
+
+def expected(hours, start=None, end=None):
+    parts = []
+    for hour_start, ticks in sorted(hours.items()):
+        ms = np.datetime64(hour_start, 'ms') + ticks['time'].astype(np.int64).astype('timedelta64[ms]')
+        keep = np.ones(len(ticks), dtype=bool)
+        if start is not None:
+            keep &= ms >= np.datetime64(start, 'ms')
+        if end is not None:
+            keep &= ms < np.datetime64(end, 'ms')
+        parts.append((ms[keep], ticks[keep]))
+    ticks = np.concatenate([p[1] for p in parts])
+    return np.concatenate([p[0] for p in parts]), ticks
+
+
+def test_chunk_roundtrip():
+    ticks = make_ticks(0, 1000)
+    out = decode_chunk(encode_chunk(ticks), len(ticks))
+    for j, name in enumerate(TICK_DTYPE.names):
+        np.testing.assert_array_equal(out[j], ticks[name].astype(np.int64))
+
+
+def test_chunk_smaller_than_raw():
+    ticks = make_ticks(0, 2000)
+    assert len(encode_chunk(ticks)) < ticks.nbytes / 2
+
+
+@pytest.mark.parametrize('bounds', [
+    (None, None),
+    (START + timedelta(hours=2, minutes=30), START + timedelta(hours=6, minutes=15)),
+    (START + timedelta(hours=3), START + timedelta(hours=4)),
+])
+def test_scan_matches_written(archive, bounds):
+    archive, hours = archive
+    timestamps, ticks = expected(hours, *bounds)
+    out = archive.scan('EURUSD', *bounds)
+
+    np.testing.assert_array_equal(out['timestamp'], timestamps)
+    for name in ('ask', 'bid', 'ask_vol', 'bid_vol'):
+        np.testing.assert_array_equal(out[name], ticks[name])
+
+
+def test_rewrite_hour_keeps_latest(archive):
+    archive, hours = archive
+    hour_start = START + timedelta(hours=1)
+    replacement = make_ticks(99, 7)
+    archive.write_hour('EURUSD', hour_start, replacement)
+
+    assert len(archive.hours('EURUSD')) == HOURS - 1
+    np.testing.assert_array_equal(archive.read_hour('EURUSD', hour_start)['ask'], replacement['ask'])
+    assert not archive.has_hour('EURUSD', START + timedelta(hours=3))
+
+
+def test_index_ignores_truncated_record(archive, tmp_path):
+    archive, hours = archive
+    with open(tmp_path / 'EURUSD' / '2024-02.idx', 'ab') as f:
+        f.write(b'\x01' * 10)
+
+    reopened = TickArchive(str(tmp_path))
+    assert len(reopened.scan('EURUSD')['timestamp']) == sum(len(t) for t in hours.values())
+
+
+def test_corrupt_chunk_raises(archive, tmp_path):
+    archive, _ = archive
+    with open(tmp_path / 'EURUSD' / '2024-01.ticks', 'r+b') as f:
+        f.seek(5)
+        f.write(b'\xff\xff')
+
+    with pytest.raises(IOError):
+        TickArchive(str(tmp_path)).scan('EURUSD')
+
+
+def test_hourly_spread(archive):
+    archive, hours = archive
+    stats = hourly_spread(archive.scan('EURUSD'), price_divisor=100_000)
+
+    assert list(stats.index) == sorted(hours)
+    for hour_start, ticks in hours.items():
+        spread = (ticks['ask'].astype(np.int64) - ticks['bid']) / 100_000
+        assert stats.loc[hour_start, 'ticks'] == len(ticks)
+        assert stats.loc[hour_start, 'spread_max'] == pytest.approx(spread.max())
+        assert stats.loc[hour_start, 'spread_mean'] == pytest.approx(spread.mean())
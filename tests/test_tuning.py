@@ -0,0 +1,43 @@
+"""Successive halving: rung berikutnya melanjutkan weights + state optimizer"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.models import tuning
+from src.models.window_dataset import WindowDataset
+
+tf = pytest.importorskip("tensorflow")
+MinMaxScaler = pytest.importorskip("sklearn.preprocessing").MinMaxScaler
+
+HPARAMS = {'lstm_units': [8, 4], 'lstm_dropout': 0.1, 'dense_units': [4], 'dense_dropout': 0.1,
+           'learning_rate': 1e-3, 'batch_size': 32}
+
+
+@pytest.fixture(scope="module")
+def dataset_root(tmp_path_factory):
+    root = tmp_path_factory.mktemp("datasets")
+    rng = np.random.default_rng(0)
+    n = 300
+    timestamps = (np.arange(n, dtype=np.int64) + 1_700_000_000) * 3_600_000_000_000
+    features = rng.random((n, 4)).astype(np.float32)
+    labels = rng.integers(0, 3, n).astype(np.int8)
+    WindowDataset(str(root), 'EURUSD').build(timestamps, features, labels, MinMaxScaler().fit(features),
+                                             ['a', 'b', 'c', 'd'], 8, 'next_bar')
+    return str(root)
+
+
+def iterations(checkpoint_dir):
+    reader = tf.train.load_checkpoint(os.path.join(checkpoint_dir, "trial_0"))
+    return int(reader.get_tensor('optimizer/_iterations/.ATTRIBUTES/VARIABLE_VALUE'))
+
+
+def test_rung_resumes_optimizer_state(dataset_root, tmp_path):
+    tuning._run_trial(dataset_root, 'EURUSD', 0.2, 0.2, str(tmp_path), 0, HPARAMS, 0, 1)
+    steps_per_epoch = iterations(tmp_path)
+
+    result = tuning._run_trial(dataset_root, 'EURUSD', 0.2, 0.2, str(tmp_path), 0, HPARAMS, 1, 3)
+
+    assert result['epochs'] == 3
+    assert iterations(tmp_path) == 3 * steps_per_epoch
@@ -0,0 +1,93 @@
+"""WindowDataset: build + append harus sama dengan build ulang dari history lengkap"""
+
+import numpy as np
+import pytest
+
+from src.models.window_dataset import WindowDataset, window_ends
+
+MinMaxScaler = pytest.importorskip("sklearn.preprocessing").MinMaxScaler
+
+SEQ = 8
+N = 200
+HORIZON = 4
+
+
+@pytest.fixture(scope="module")
+def history():
+    """Features + label dengan ekor INVALID sepanjang HORIZON (future belum ada)"""
+    rng = np.random.default_rng(5)
+    timestamps = (np.arange(N, dtype=np.int64) + 1_700_000_000) * 3_600_000_000_000
+    features = rng.random((N, 3)).astype(np.float32)
+    labels = rng.integers(0, 3, N).astype(np.int8)
+    labels[:3] = -1
+    scaler = MinMaxScaler().fit(features)
+    return timestamps, features, labels, scaler
+
+
+def prefix(history, n):
+    timestamps, features, labels, _ = history
+    head = labels[:n].copy()
+    head[n - HORIZON:] = -1
+    return timestamps[:n], features[:n], head
+
+
+def build(root, history, n):
+    dataset = WindowDataset(str(root), 'EURUSD')
+    dataset.build(*prefix(history, n), history[3], ['a', 'b', 'c'], SEQ, 'next_bar')
+    return dataset
+
+
+def assert_same(a: WindowDataset, b: WindowDataset):
+    assert a.n_rows == b.n_rows and a.n_windows == b.n_windows
+    for name in ('features', 'labels', 'timestamps', 'index'):
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+
+
+def test_append_matches_rebuild(tmp_path, history):
+    dataset = build(tmp_path / "append", history, 120)
+    for n in (150, 150, N):
+        dataset.append(*prefix(history, n))
+
+    reopened = WindowDataset(str(tmp_path / "append"), 'EURUSD')
+    assert_same(reopened, build(tmp_path / "full", history, N))
+
+
+def test_append_after_interrupted_write(tmp_path, history):
+    dataset = build(tmp_path / "ds", history, 120)
+
+    # Append terputus: bytes sudah ditulis tapi meta.json belum
+    with open(dataset._file('features'), 'ab') as f:
+        f.write(b'\x00' * 7)
+
+    assert dataset.append(*prefix(history, N)) == N - 120
+    assert_same(WindowDataset(str(tmp_path / "ds"), 'EURUSD'), build(tmp_path / "full", history, N))
+
+
+def test_append_rejects_changed_history(tmp_path, history):
+    dataset = build(tmp_path / "ds", history, 120)
+    timestamps, features, labels = prefix(history, N)
+    features = features.copy()
+    features[10, 0] += 1
+
+    with pytest.raises(ValueError):
+        dataset.append(timestamps, features, labels)
+
+
+def test_windows_are_feature_slices(tmp_path, history):
+    dataset = build(tmp_path / "ds", history, N)
+    _, features, labels = prefix(history, N)
+    ends = window_ends(labels, SEQ)
+
+    X, y = dataset.windows()
+    np.testing.assert_array_equal(X, np.stack([features[e - SEQ + 1:e + 1] for e in ends]))
+    np.testing.assert_array_equal(y, labels[ends])
+
+
+def test_validation_split_within_train(tmp_path, history):
+    dataset = build(tmp_path / "ds", history, N)
+    X_train, _, _, _ = dataset.split(test_size=0.2)
+    X_fit, X_val, _, _ = dataset.validation_split(test_size=0.2, val_size=0.25)
+
+    # Window validasi = ekor bagian train, tidak menyentuh test
+    assert len(X_fit) + len(X_val) == len(X_train)
+    np.testing.assert_array_equal(np.concatenate([X_fit, X_val]), X_train)